@@ -0,0 +1,215 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+
+import orjson
+
+from app.api.deps import decode_token
+from app.core.config import settings
+from app.core.telemetry import Histogram
+
+
+class Overloaded(Exception):
+    def __init__(self, status: int, reason: str, retry_after: float, detail: str):
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+class TokenBuckets:
+    """Per-caller token buckets: ``rate`` tokens/s up to ``burst``."""
+
+    def __init__(self, rate: float, burst: float, max_callers: int = settings.ADMISSION_MAX_CALLERS):
+        self.rate = rate
+        self.burst = burst
+        self.max_callers = max_callers
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, caller: str) -> float:
+        """Spend a token; returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        tokens, stamp = self._buckets.pop(caller, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - stamp) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[caller] = (tokens, now)
+        if len(self._buckets) > self.max_callers:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class Gate:
+    """Concurrency limit with a bounded wait queue, plus optional rate limits.
+
+    Up to ``concurrency`` requests run; the next ``queue`` wait (FIFO) for
+    at most ``queue_timeout`` seconds. Anything beyond is shed at once, so a
+    burst costs the caller a fast 503 rather than everyone else's latency.
+    """
+
+    def __init__(self, prefix: str, concurrency: int, queue: int, queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+                 rate: float = 0, burst: float = 1):
+        self.prefix = prefix
+        self.concurrency = int(concurrency)
+        self.queue = int(queue)
+        self.queue_timeout = queue_timeout
+        self.buckets = TokenBuckets(rate, max(burst, 1)) if rate > 0 else None
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed: dict[str, int] = {"rate_limited": 0, "queue_full": 0, "queue_timeout": 0}
+        self.wait = Histogram()
+
+    def _reject(self, reason: str, status: int, retry_after: float, detail: str) -> Overloaded:
+        self.shed[reason] += 1
+        return Overloaded(status, reason, retry_after, detail)
+
+    async def acquire(self, caller: str):
+        if self.buckets is not None:
+            wait = self.buckets.take(caller)
+            if wait:
+                raise self._reject("rate_limited", 429, wait, "Too many requests, please slow down.")
+        if self.waiting or self._slots.locked():
+            if self.waiting >= self.queue:
+                raise self._reject("queue_full", 503, self.queue_timeout, "Server is busy, please retry.")
+            self.waiting += 1
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject("queue_timeout", 503, self.queue_timeout, "Server is busy, please retry.")
+            finally:
+                self.waiting -= 1
+            self.wait.observe(time.perf_counter() - started)
+        else:
+            await self._slots.acquire()
+            self.wait.observe(0.0)
+        self.active += 1
+        self.admitted += 1
+
+    def release(self):
+        self.active -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "queue": self.queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "wait_p99_seconds": self.wait.quantile(0.99),
+        }
+
+
+class AdmissionController:
+    def __init__(self, limits: dict[str, dict[str, float]], enabled: bool = True):
+        self.enabled = enabled
+        # Longest prefix first so a specific route can override its parent
+        self.gates = [Gate(prefix, **limit) for prefix, limit in sorted(limits.items(), key=lambda item: -len(item[0]))]
+
+    def gate(self, path: str) -> Gate | None:
+        for gate in self.gates:
+            if path.startswith(gate.prefix):
+                return gate
+        return None
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "routes": {gate.prefix: gate.stats() for gate in self.gates}}
+
+    def prometheus(self) -> dict:
+        """Series for ``render_prometheus(labelled=...)``."""
+        return {
+            "admission_active": ("gauge", [({"route": g.prefix}, g.active) for g in self.gates]),
+            "admission_queue_depth": ("gauge", [({"route": g.prefix}, g.waiting) for g in self.gates]),
+            "admission_admitted_total": ("counter", [({"route": g.prefix}, g.admitted) for g in self.gates]),
+            "admission_shed_total": ("counter", [
+                ({"route": g.prefix, "reason": reason}, n) for g in self.gates for reason, n in g.shed.items()
+            ]),
+            "admission_wait_seconds": ("histogram", [({"route": g.prefix}, g.wait) for g in self.gates]),
+        }
+
+
+admission = AdmissionController(settings.ADMISSION_LIMITS, settings.ADMISSION_CONTROL)
+
+
+def _client_address(scope, trusted: frozenset[str]) -> str | None:
+    """The peer address, or the client a trusted proxy forwarded for.
+
+    X-Forwarded-For is read right to left, skipping hops that are trusted
+    proxies themselves; entries further left are client-supplied and ignored.
+    """
+    client = scope.get("client")
+    address = client[0] if client else None
+    if address is None or not ("*" in trusted or address in trusted):
+        return address
+    hops = [
+        hop.strip()
+        for name, value in scope["headers"] if name == b"x-forwarded-for"
+        for hop in value.decode("latin-1").split(",") if hop.strip()
+    ]
+    for hop in reversed(hops):
+        address = hop
+        if not ("*" in trusted or hop in trusted):
+            break
+    return address
+
+
+def _caller(scope, trusted_proxies: frozenset[str] = frozenset(settings.ADMISSION_TRUSTED_PROXIES)) -> str:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            user_id = decode_token(token) if scheme.lower() == "bearer" and token else None
+            if user_id is not None:
+                return f"user:{user_id}"
+            break
+    address = _client_address(scope, trusted_proxies)
+    return f"addr:{address}" if address else "addr:unknown"
+
+
+async def _shed(send, error: Overloaded):
+    body = orjson.dumps({"detail": error.detail})
+    await send({
+        "type": "http.response.start",
+        "status": error.status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(error.retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying ``admission`` gates by path prefix.
+
+    Shed requests are answered before the body is read or a DB session is
+    opened. A gate's slot is held until the response (streamed or not) has
+    been sent.
+    """
+
+    def __init__(self, app, controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.controller.enabled:
+            return await self.app(scope, receive, send)
+        gate = self.controller.gate(scope["path"])
+        if gate is None:
+            return await self.app(scope, receive, send)
+        try:
+            await gate.acquire(_caller(scope))
+        except Overloaded as error:
+            return await _shed(send, error)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
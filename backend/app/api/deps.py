@@ -1,37 +1,99 @@
+import secrets
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from jose import jwt, JWTError
+from app.core.auth_cache import UserSnapshot, auth_cache
 from app.core.config import settings
+from app.db.replicas import recent_writers, replicas
 from app.db.session import SessionLocal
 from app.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
+internal_bearer = HTTPBearer(auto_error=False)
 
-async def get_db():
-    async with SessionLocal() as session:
-        yield session
-
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    credentials_exception = HTTPException(
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token(token: str) -> int | None:
+    user_id = auth_cache.get_token(token)
+    if user_id is not None:
+        return user_id
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        user_id = int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        return None
+    auth_cache.put_token(token, user_id, payload.get("exp"))
+    return user_id
+
+def get_token_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    user_id = decode_token(token)
+    if user_id is None:
+        raise credentials_exception()
+    return user_id
+
+def require_operator(credentials: HTTPAuthorizationCredentials | None = Depends(internal_bearer)) -> None:
+    """Gate for /internal/*: the ``INTERNAL_TOKEN`` shared secret, not a user login."""
+    if not settings.INTERNAL_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(credentials.credentials.encode(), settings.INTERNAL_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
-    result = await db.execute(select(User).filter(User.id == int(user_id)))
+def get_optional_user_id(token: str | None = Depends(optional_oauth2_scheme)) -> int | None:
+    """Caller's id for routing decisions only; authorization still goes through get_token_user_id."""
+    return decode_token(token) if token else None
+
+async def get_db(user_id: int | None = Depends(get_optional_user_id)):
+    """Primary session, for anything that writes. A commit pins the caller's reads to the primary."""
+    async with SessionLocal() as session:
+        session.info["user_id"] = user_id
+        yield session
+
+def read_sessionmaker(user_id: int | None):
+    """Replica session factory, or the primary's if the caller wrote recently."""
+    return SessionLocal if recent_writers.pinned(user_id) else replicas.pick()
+
+async def get_read_db(user_id: int | None = Depends(get_optional_user_id)):
+    """Replica session for read-only handlers."""
+    async with read_sessionmaker(user_id)() as session:
+        yield session
+
+async def get_current_user_snapshot(
+    user_id: int = Depends(get_token_user_id),
+    db: AsyncSession = Depends(get_read_db),
+) -> UserSnapshot:
+    """Read-only view of the current user, served from cache when possible."""
+    snapshot = auth_cache.get_user(user_id)
+    if snapshot is not None:
+        return snapshot
+    result = await db.execute(select(User).filter(User.id == user_id))
+    user = result.scalars().first()
+    if user is None:
+        raise credentials_exception()
+    return auth_cache.put_user(user)
+
+async def get_current_user_id(snapshot: UserSnapshot = Depends(get_current_user_snapshot)) -> int:
+    """For handlers that only need the id; no ORM load on a cache hit."""
+    return snapshot.id
+
+async def get_current_user(
+    user_id: int = Depends(get_token_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Attached ``User`` instance, for handlers that modify the profile."""
+    result = await db.execute(select(User).filter(User.id == user_id))
     user = result.scalars().first()
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
     return user
@@ -0,0 +1,32 @@
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+
+async def _json_array(result, chunk: int):
+    keys = list(result.keys())
+    yield b"["
+    sep = b""
+    async for rows in result.partitions(chunk):
+        # Encode a chunk as one array and drop its brackets to splice it in
+        body = orjson.dumps([dict(zip(keys, row)) for row in rows])[1:-1]
+        yield sep + body
+        sep = b","
+    yield b"]"
+
+
+async def stream_rows(db: AsyncSession, query: Select, chunk: int = settings.JSON_STREAM_CHUNK_ROWS) -> StreamingResponse:
+    """A JSON array of objects keyed by the selected column labels, encoded
+    ``chunk`` rows at a time as the cursor yields them.
+
+    Bypasses ``response_model`` validation, so select exactly the response
+    fields. orjson writes naive datetimes and floats the same way Pydantic
+    does, so the body matches the validated path. The query runs before
+    returning, so its errors still become an error status. The session must
+    outlive the response, as a ``get_db``/``get_read_db`` session does.
+    """
+    result = await db.stream(query.execution_options(yield_per=chunk))
+    return StreamingResponse(_json_array(result, chunk), media_type="application/json")
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import users, ingest, auth, metrics, sessions
+from app.api.v1.endpoints import users, ingest, auth, metrics, sessions, recommendations, jobs, dashboard, pediatric
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -7,3 +7,7 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(ingest.router, prefix="/ingest", tags=["ingestion"])
 api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 api_router.include_router(sessions.router, prefix="/sessions", tags=["sessions"])
+api_router.include_router(recommendations.router, prefix="/recommendations", tags=["recommendations"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(pediatric.router, prefix="/pediatric", tags=["pediatric"])
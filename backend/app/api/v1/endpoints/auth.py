@@ -1,3 +1,4 @@
+import logging
 from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -7,16 +8,25 @@ from sqlalchemy.future import select
 from app.core import security
 from app.core.config import settings
 from app.api.deps import get_db
+from app.db.replicas import recent_writers
 from app.models import User
 from pydantic import BaseModel, EmailStr
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class UserCreate(BaseModel):
     email: EmailStr
     password: str
     full_name: str | None = None
 
+def hashing_overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is temporarily overloaded, please retry.",
+        headers={"Retry-After": "1"},
+    )
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -25,19 +35,21 @@ class Token(BaseModel):
 
 @router.post("/register", response_model=Token)
 async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
-    print(f"[DEBUG REGISTER] Attempting to register: email={user_in.email}, full_name={user_in.full_name}")
+    logger.debug("register attempt", extra={"email": user_in.email})
     result = await db.execute(select(User).filter(User.email == user_in.email))
     existing = result.scalars().first()
     if existing:
-        print(f"[DEBUG REGISTER] User already exists: id={existing.id}")
+        logger.info("register rejected: email in use", extra={"user_id": existing.id})
         raise HTTPException(
             status_code=400,
             detail="The user with this username already exists in the system.",
         )
     
-    hashed = security.get_password_hash(user_in.password)
-    print(f"[DEBUG REGISTER] Password hashed successfully, length={len(hashed)}")
-    
+    try:
+        hashed = await security.hash_password_async(user_in.password)
+    except security.HashingOverloaded:
+        raise hashing_overloaded()
+
     user = User(
         email=user_in.email,
         full_name=user_in.full_name,
@@ -47,13 +59,15 @@ async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
     db.add(user)
     await db.commit()
     await db.refresh(user)
-    print(f"[DEBUG REGISTER] User created: id={user.id}, email={user.email}, is_onboarded={user.is_onboarded}")
+    # No token on this request for get_db to pin by, and the first
+    # authenticated call must not look the user up on a lagging replica
+    recent_writers.mark(user.id)
+    logger.info("user registered", extra={"user_id": user.id})
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
         user.id, expires_delta=access_token_expires
     )
-    print(f"[DEBUG REGISTER] Token created successfully")
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -63,35 +77,41 @@ async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
 
 @router.post("/login", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
-    print(f"[DEBUG LOGIN] Attempting login: username={form_data.username}")
+    logger.debug("login attempt", extra={"email": form_data.username})
     result = await db.execute(select(User).filter(User.email == form_data.username))
     user = result.scalars().first()
     
     if not user:
-        print(f"[DEBUG LOGIN] No user found with email: {form_data.username}")
+        logger.info("login failed: unknown email")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    print(f"[DEBUG LOGIN] User found: id={user.id}, email={user.email}")
-    password_valid = security.verify_password(form_data.password, user.hashed_password)
-    print(f"[DEBUG LOGIN] Password verification result: {password_valid}")
-    
+    try:
+        password_valid, new_hash = await security.verify_password_async(form_data.password, user.hashed_password)
+    except security.HashingOverloaded:
+        raise hashing_overloaded()
+
     if not password_valid:
-        print(f"[DEBUG LOGIN] Password mismatch for user: {user.email}")
+        logger.info("login failed: wrong password", extra={"user_id": user.id})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if new_hash:
+        # Stored hash used an outdated cost; upgrade it now that we know the password
+        user.hashed_password = new_hash
+        await db.commit()
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
         user.id, expires_delta=access_token_expires
     )
-    print(f"[DEBUG LOGIN] Login successful for user: {user.email}, is_onboarded={user.is_onboarded}")
+    logger.info("login succeeded", extra={"user_id": user.id, "rehashed": bool(new_hash)})
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.future import select
+from pydantic import BaseModel
+from app.api.deps import get_current_user_snapshot, read_sessionmaker
+from app.api.v1.endpoints.metrics import MetricTrendOut
+from app.api.v1.endpoints.sessions import SessionOut
+from app.api.v1.endpoints.users import UserProfile
+from app.core.auth_cache import UserSnapshot
+from app.core.config import settings
+from app.models import MetricTrend, TeleSession
+from app.services.metabolic import summarize
+from app.services.metric_history import bucketed_series
+
+router = APIRouter()
+
+class DashboardSeries(BaseModel):
+    """Bucketed history as parallel arrays, one entry per non-empty bucket."""
+    start: list[datetime]
+    mean: list[float]
+    min: list[float]
+    max: list[float]
+    count: list[int]
+
+class DashboardMetric(MetricTrendOut):
+    series: DashboardSeries
+
+class Dashboard(BaseModel):
+    user: UserProfile
+    metrics: list[DashboardMetric]
+    sessions: list[SessionOut]
+    reminders: list[SessionOut]
+
+async def _trends(factory, user_id: int) -> list[dict]:
+    async with factory() as db:
+        rows = (await db.execute(
+            select(MetricTrend).filter(MetricTrend.owner_id == user_id).order_by(MetricTrend.metric_type)
+        )).scalars().all()
+        return [summarize(row) for row in rows]
+
+async def _sessions(factory, user_id: int, now: datetime) -> list[SessionOut]:
+    async with factory() as db:
+        rows = (await db.execute(
+            select(TeleSession)
+            .filter(TeleSession.owner_id == user_id, TeleSession.scheduled_at >= now)
+            .order_by(TeleSession.scheduled_at.asc())
+        )).scalars().all()
+        return [SessionOut.model_validate(row) for row in rows]
+
+async def _series(factory, user_id: int, metric_type: str, since: datetime, until: datetime) -> dict:
+    async with factory() as db:
+        buckets = await bucketed_series(db, user_id, metric_type, since, settings.DASHBOARD_MAX_POINTS, until)
+    return {key: [b[key] for b in buckets] for key in ("start", "mean", "min", "max", "count")}
+
+def _etag(user: UserSnapshot, trends: list[dict], sessions: list[SessionOut]) -> str:
+    # Every accepted reading moves its trend row and sessions are only ever
+    # added, so these plus a clock tick cover everything the payload shows
+    version = [
+        asdict(user),
+        trends,
+        [(s.id, s.scheduled_at) for s in sessions],
+        int(time.time() // settings.DASHBOARD_ETAG_SECONDS),
+    ]
+    digest = hashlib.blake2b(json.dumps(version, default=str).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+@router.get("/", response_model=Dashboard)
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    current_user: UserSnapshot = Depends(get_current_user_snapshot),
+):
+    """Profile, latest value and downsampled history per metric, and upcoming
+    sessions in one response. Send the ``ETag`` back as ``If-None-Match`` to
+    get a 304 when nothing changed; the series queries are then skipped."""
+    # One factory so every query sees the same replica (or the primary when pinned)
+    factory = read_sessionmaker(current_user.id)
+    now = datetime.utcnow()
+    trends, sessions = await asyncio.gather(_trends(factory, current_user.id), _sessions(factory, current_user.id, now))
+    etag = _etag(current_user, trends, sessions)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    since = now - timedelta(days=settings.DASHBOARD_HISTORY_DAYS)
+    series = await asyncio.gather(*(_series(factory, current_user.id, t["metric_type"], since, now) for t in trends))
+    response.headers.update(headers)
+    in_24h = now + timedelta(hours=24)
+    return {
+        "user": current_user,
+        "metrics": [{**t, "series": s} for t, s in zip(trends, series)],
+        "sessions": sessions,
+        "reminders": [s for s in sessions if s.scheduled_at <= in_24h],
+    }
@@ -1,6 +1,15 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+import os
+from fastapi import APIRouter, Depends, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_db, get_current_user_id
+from app.api.v1.endpoints.jobs import JobQueued
+from app.core.config import settings
+from app.services import job_handlers  # noqa: F401  registers the ingest_pdf job
 from app.services.ingestion import IngestionService
+from app.services.jobs import JobQueue
+from app.services.metric_ingest import MetricIngestionService
 from pydantic import BaseModel
+from datetime import datetime
 
 router = APIRouter()
 
@@ -8,17 +17,36 @@ class MetricInput(BaseModel):
     type: str
     value: float
     unit: str
-    user_id: int
+    timestamp: datetime | None = None
 
-@router.post("/pdf")
-async def extract_pdf(file: UploadFile = File(...)):
+@router.post("/pdf", response_model=JobQueued, status_code=202)
+async def extract_pdf(
+    file: UploadFile = File(...),
+    current_user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Spool the upload and queue its ingestion; poll ``status_url`` for progress and the report."""
+    os.makedirs(settings.JOB_SPOOL_DIR, exist_ok=True)
+    path = await IngestionService.spool_upload(file, settings.JOB_SPOOL_DIR)
     try:
-        content = await IngestionService.process_pdf(file)
-        return {"filename": file.filename, "extracted_text": content[:100] + "..."} # Preview
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        job = await JobQueue.enqueue(db, "ingest_pdf", {"path": os.path.abspath(path), "filename": file.filename},
+                                     owner_id=current_user_id)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return {"job_id": job.id, "status": job.status, "status_url": f"{settings.API_V1_STR}/jobs/{job.id}"}
 
 @router.post("/metric")
-async def ingest_metric(metric: MetricInput):
-    # In a real app, save to DB here
-    return {"status": "received", "data": metric}
+async def ingest_metric(
+    metric: MetricInput,
+    current_user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    reading = {
+        "metric_type": metric.type,
+        "value": metric.value,
+        "unit": metric.unit,
+        "timestamp": (metric.timestamp or datetime.utcnow()).isoformat(),
+    }
+    result = await MetricIngestionService.write_batch(db, current_user_id, [reading])
+    return {"status": "stored" if result.accepted else "rejected", "data": metric, **result.as_dict()}
@@ -0,0 +1,59 @@
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db, get_current_user_id
+from app.services.jobs import JobQueue
+
+router = APIRouter()
+
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    progress: float
+    message: str | None
+    attempts: int
+    max_attempts: int
+    result: Any = None
+    error: str | None
+    created_at: datetime | None
+    started_at: datetime | None
+    finished_at: datetime | None
+
+
+class JobQueued(BaseModel):
+    job_id: int
+    status: str
+    status_url: str
+
+
+def job_out(job) -> JobOut:
+    return JobOut(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        progress=job.progress,
+        message=job.message,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        result=json.loads(job.result) if job.result else None,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job(job_id: int, current_user_id: int = Depends(get_current_user_id), db: AsyncSession = Depends(get_db)):
+    # Someone else's job is indistinguishable from a missing one
+    job = await JobQueue.get(db, job_id, owner_id=current_user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_out(job)
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, Query
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from app.api.deps import get_db, get_current_user
-from app.models import Metric, User
+from typing import Literal
+from app.api.deps import get_db, get_read_db, get_current_user_id
+from app.api.responses import stream_rows
+from app.models import Metric
+from app.services.metabolic import MetabolicService
+from app.services.metric_history import bucketed_series, lttb_series, raw_page
+from app.services.metric_ingest import MetricIngestionService, batched, ndjson_batches
 
 router = APIRouter()
 
@@ -23,38 +29,138 @@ class MetricOut(BaseModel):
     class Config:
         from_attributes = True
 
+class MetricBucket(BaseModel):
+    start: datetime
+    min: float
+    max: float
+    mean: float
+    count: int
+
+class MetricPoint(BaseModel):
+    timestamp: datetime
+    value: float
+
+class MetricPage(BaseModel):
+    items: list[MetricOut]
+    next_cursor: str | None = None
+
+class MetricTrendOut(BaseModel):
+    metric_type: str
+    count: int
+    mean: float | None = None
+    std: float | None = None
+    min: float | None = None
+    max: float | None = None
+    window_mean: float | None = None
+    window_std: float | None = None
+    slope_per_day: float | None = None
+    last_value: float | None = None
+    last_timestamp: datetime | None = None
+    trend: str | None = None  # only for metric types with thresholds (glucose)
+
+class BatchCounts(BaseModel):
+    received: int
+    accepted: int
+    duplicates: int
+    rejected: int
+    reasons: dict[str, int]
+
+class BatchIngestResult(BatchCounts):
+    batches: list[BatchCounts]
+
 @router.post("/", response_model=MetricOut)
 async def create_metric(
     metric_in: MetricCreate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     metric = Metric(
         metric_type=metric_in.metric_type,
         value=metric_in.value,
         unit=metric_in.unit,
-        owner_id=current_user.id,
+        timestamp=datetime.utcnow(),
+        owner_id=current_user_id,
     )
     db.add(metric)
+    await MetabolicService.record(db, current_user_id, metric.metric_type, [metric.timestamp], [metric.value])
     await db.commit()
     await db.refresh(metric)
     return metric
 
-@router.get("/history", response_model=list[MetricOut])
+@router.get("/history", response_model=list[MetricOut] | list[MetricBucket] | list[MetricPoint])
 async def get_metric_history(
     metric_type: str = Query(..., description="Type of metric: glucose, weight, bp"),
     days: int = Query(30, description="Number of days of history"),
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    max_points: int | None = Query(None, ge=3, le=5000, description="Downsample to at most this many points"),
+    resolution: Literal["buckets", "lttb"] = Query(
+        "buckets", description="With max_points: SQL min/max/mean/count buckets, or an LTTB-selected raw series"
+    ),
+    current_user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
 ):
     since = datetime.utcnow() - timedelta(days=days)
-    result = await db.execute(
-        select(Metric)
+    if max_points is not None:
+        if resolution == "lttb":
+            return await lttb_series(db, current_user_id, metric_type, since, max_points)
+        return await bucketed_series(db, current_user_id, metric_type, since, max_points)
+    return await stream_rows(
+        db,
+        select(Metric.id, Metric.metric_type, Metric.value, Metric.unit, Metric.timestamp)
         .filter(
-            Metric.owner_id == current_user.id,
+            Metric.owner_id == current_user_id,
             Metric.metric_type == metric_type,
             Metric.timestamp >= since,
         )
         .order_by(Metric.timestamp.asc())
     )
-    return result.scalars().all()
+
+@router.get("/trend", response_model=MetricTrendOut)
+async def get_metric_trend(
+    metric_type: str = Query(..., description="Type of metric: glucose, weight, bp"),
+    current_user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Running statistics maintained on write; a single-row lookup."""
+    trend = await MetabolicService.get_trend(db, current_user_id, metric_type)
+    if trend is None:
+        return {"metric_type": metric_type, "count": 0, "trend": MetabolicService.classify(metric_type, None)}
+    return trend
+
+@router.get("/export", response_model=MetricPage)
+async def export_metrics(
+    metric_type: str = Query(..., description="Type of metric: glucose, weight, bp"),
+    days: int = Query(365, description="Number of days of history"),
+    limit: int = Query(1000, ge=1, le=10000),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    current_user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Raw readings paged by keyset on (timestamp, id)."""
+    since = datetime.utcnow() - timedelta(days=days)
+    try:
+        rows, next_cursor = await raw_page(db, current_user_id, metric_type, since, limit, cursor)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+    return {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
+
+@router.post("/batch", response_model=BatchIngestResult)
+async def create_metrics_batch(
+    request: Request,
+    current_user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Bulk readings as a JSON array, or NDJSON (``application/x-ndjson``)
+    streamed in the request body. Each reading needs metric_type, value, unit
+    and an ISO-8601 timestamp; (metric_type, timestamp) repeats are skipped."""
+    if "ndjson" in request.headers.get("content-type", ""):
+        readings = ndjson_batches(request.stream())
+    else:
+        try:
+            payload = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Body must be a JSON array of readings")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=422, detail="Body must be a JSON array of readings")
+        readings = batched(payload)
+    batches, total = await MetricIngestionService.write_stream(db, current_user_id, readings)
+    return {**total.as_dict(), "batches": [b.as_dict() for b in batches]}
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field, field_validator
+from app.api.deps import get_current_user_id
+from app.services.pediatric import PediatricService, normalise_sex
+
+router = APIRouter()
+
+class GrowthCheck(BaseModel):
+    age_months: float = Field(..., ge=0)
+    weight_kg: float = Field(..., gt=0)
+    gender: str
+
+    # A ValueError here is a 422, not a 500 from the z-score lookup
+    _gender = field_validator("gender")(normalise_sex)
+
+class GrowthCheckOut(BaseModel):
+    status: str  # Normal growth, Below/Above expected range, Outside reference range
+
+@router.post("/growth-check", response_model=GrowthCheckOut)
+async def growth_check(check: GrowthCheck, current_user_id: int = Depends(get_current_user_id)):
+    return {"status": PediatricService.check_growth(check.age_months, check.weight_kg, check.gender)}
@@ -0,0 +1,82 @@
+import json
+import logging
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user_snapshot, get_read_db
+from app.core.auth_cache import UserSnapshot
+from app.db.session import SessionLocal
+from app.services.synthesis import get_synthesis, patient_context
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+class RecommendationRequest(BaseModel):
+    question: str = Field(..., min_length=1, max_length=2000)
+    personalise: bool = True  # include profile and glucose trend in the prompt
+
+class Source(BaseModel):
+    id: int
+    content: str
+    score: float
+
+class RecommendationOut(BaseModel):
+    answer: str
+    sources: list[Source]
+    cached: str | None
+    ttft_ms: float
+    total_ms: float
+
+def _events(request: RecommendationRequest, user: UserSnapshot, db: AsyncSession) -> AsyncIterator[dict]:
+    patient = patient_context(db, user) if request.personalise else None
+    return get_synthesis().stream_recommendation(request.question, patient)
+
+def _sse(event: dict) -> str:
+    name = event.pop("event")
+    return f"event: {name}\ndata: {json.dumps(event, default=str)}\n\n"
+
+@router.post("/", response_model=RecommendationOut)
+async def recommend(
+    request: RecommendationRequest,
+    current_user: UserSnapshot = Depends(get_current_user_snapshot),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """The whole answer at once; use ``/stream`` to show tokens as they arrive."""
+    parts, sources, done = [], [], {}
+    async for event in _events(request, current_user, db):
+        if event["event"] == "token":
+            parts.append(event["text"])
+        elif event["event"] == "sources":
+            sources = event["sources"]
+        else:
+            done = event
+    return {"answer": "".join(parts), "sources": sources, **{k: done[k] for k in ("cached", "ttft_ms", "total_ms")}}
+
+@router.post("/stream")
+async def recommend_stream(
+    request: RecommendationRequest,
+    current_user: UserSnapshot = Depends(get_current_user_snapshot),
+):
+    """Server-sent events: ``sources``, one ``token`` per model chunk, then
+    ``done`` with ``ttft_ms`` and ``total_ms``."""
+    async def body():
+        # The session must outlive the handler, so it belongs to the stream rather than a dependency
+        async with SessionLocal() as db:
+            async for event in _events(request, current_user, db):
+                if event["event"] == "done":
+                    logger.info("recommendation streamed", extra={
+                        "user_id": current_user.id, "cached": event["cached"],
+                        "ttft_ms": event["ttft_ms"], "total_ms": event["total_ms"],
+                    })
+                yield _sse(event)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        # Stop proxies from buffering the stream and defeating time-to-first-token
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,10 +1,16 @@
+import asyncio
+import json
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from app.api.deps import get_db, get_current_user
-from app.models import TeleSession, User
+from app.api.deps import get_db, get_read_db, get_current_user_id
+from app.api.responses import stream_rows
+from app.core.config import settings
+from app.models import TeleSession
+from app.services.reminders import UpcomingSession, reminder_scheduler
 
 router = APIRouter()
 
@@ -26,50 +32,86 @@ class SessionOut(BaseModel):
 @router.post("/", response_model=SessionOut)
 async def create_session(
     session_in: SessionCreate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
 ):
     session = TeleSession(
         title=session_in.title,
         scheduled_at=session_in.scheduled_at,
         notes=session_in.notes,
-        owner_id=current_user.id,
+        owner_id=current_user_id,
     )
     db.add(session)
     await db.commit()
     await db.refresh(session)
+    reminder_scheduler.add(UpcomingSession.from_row(session))
     return session
 
 @router.get("/", response_model=list[SessionOut])
 async def get_upcoming_sessions(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(
-        select(TeleSession)
+    return await stream_rows(
+        db,
+        select(TeleSession.id, TeleSession.title, TeleSession.scheduled_at, TeleSession.notes, TeleSession.created_at)
         .filter(
-            TeleSession.owner_id == current_user.id,
+            TeleSession.owner_id == current_user_id,
             TeleSession.scheduled_at >= datetime.utcnow(),
         )
         .order_by(TeleSession.scheduled_at.asc())
     )
-    return result.scalars().all()
 
 @router.get("/reminders", response_model=list[SessionOut])
 async def get_session_reminders(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Returns sessions within the next 24 hours for notification scheduling."""
+    """Returns sessions within the next 24 hours for notification scheduling.
+
+    Served from the reminder scheduler's memory when it is running; prefer
+    ``/reminders/stream`` over polling this."""
+    if reminder_scheduler.running and reminder_scheduler.horizon >= 24 * 3600:
+        return reminder_scheduler.upcoming(current_user_id)
     now = datetime.utcnow()
     in_24h = now + timedelta(hours=24)
     result = await db.execute(
         select(TeleSession)
         .filter(
-            TeleSession.owner_id == current_user.id,
+            TeleSession.owner_id == current_user_id,
             TeleSession.scheduled_at >= now,
             TeleSession.scheduled_at <= in_24h,
         )
         .order_by(TeleSession.scheduled_at.asc())
     )
     return result.scalars().all()
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.get("/reminders/stream")
+async def stream_session_reminders(current_user_id: int = Depends(get_current_user_id)):
+    """Server-sent events: a ``snapshot`` of the next 24 hours on connect,
+    then one ``reminder`` per lead time (``REMINDER_LEADS_MINUTES``) as it
+    falls due. Comment lines keep idle connections open."""
+    queue = reminder_scheduler.subscribe(current_user_id)
+
+    async def body():
+        try:
+            snapshot = [SessionOut.model_validate(s).model_dump(mode="json") for s in reminder_scheduler.upcoming(current_user_id)]
+            yield _sse("snapshot", snapshot)
+            while True:
+                try:
+                    reminder = await asyncio.wait_for(queue.get(), timeout=settings.REMINDER_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse("reminder", reminder)
+        finally:
+            reminder_scheduler.unsubscribe(current_user_id, queue)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from datetime import datetime
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, get_current_user_snapshot
+from app.core.auth_cache import UserSnapshot, auth_cache
 from app.models import User
 
 router = APIRouter()
@@ -27,7 +28,7 @@ class OnboardingData(BaseModel):
     conditions: str | None = None  # JSON string e.g. '["hypertension","diabetes"]'
 
 @router.get("/me", response_model=UserProfile)
-async def read_current_user(current_user: User = Depends(get_current_user)):
+async def read_current_user(current_user: UserSnapshot = Depends(get_current_user_snapshot)):
     return current_user
 
 @router.put("/onboard", response_model=UserProfile)
@@ -43,4 +44,6 @@ async def onboard_user(
     current_user.is_onboarded = True
     await db.commit()
     await db.refresh(current_user)
+    # Replace the cached snapshot so the next /me reflects the new profile
+    auth_cache.put_user(current_user)
     return current_user
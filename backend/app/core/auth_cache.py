@@ -0,0 +1,82 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Immutable copy of the profile columns of a ``User``, safe to share
+    between requests without a session."""
+    id: int
+    email: str
+    full_name: str | None
+    age: int | None
+    pre_pregnancy_weight: float | None
+    lmp_date: datetime | None
+    conditions: str | None
+    is_onboarded: bool
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            age=user.age,
+            pre_pregnancy_weight=user.pre_pregnancy_weight,
+            lmp_date=user.lmp_date,
+            conditions=user.conditions,
+            is_onboarded=bool(user.is_onboarded),
+        )
+
+
+class AuthCache:
+    """Decoded-token and user-snapshot caches for ``get_current_user``.
+
+    Tokens map to the user id they carry and never outlive their own ``exp``.
+    Snapshots are dropped whenever the profile changes in this process and
+    otherwise expire after ``ttl`` seconds, which bounds staleness across
+    workers.
+    """
+
+    def __init__(self, maxsize: int = settings.AUTH_CACHE_SIZE, ttl: float = settings.AUTH_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self.tokens = TTLCache(maxsize, ttl)
+        self.users = TTLCache(maxsize, ttl)
+        self.requests = 0
+
+    def get_token(self, token: str) -> int | None:
+        self.requests += 1
+        return self.tokens.get(token)
+
+    def put_token(self, token: str, user_id: int, exp: float | None):
+        ttl = self.ttl if exp is None else min(self.ttl, exp - time.time())
+        if ttl > 0:
+            self.tokens.set(token, user_id, ttl=ttl)
+
+    def get_user(self, user_id: int) -> UserSnapshot | None:
+        return self.users.get(user_id)
+
+    def put_user(self, user) -> UserSnapshot:
+        snapshot = UserSnapshot.from_user(user)
+        self.users.set(snapshot.id, snapshot)
+        return snapshot
+
+    def invalidate_user(self, user_id: int):
+        self.users.pop(user_id)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "tokens": self.tokens.stats.as_dict(),
+            "users": self.users.stats.as_dict(),
+            # Every snapshot hit is a SELECT on users that didn't happen
+            "db_queries_saved": self.users.stats.hits,
+            "db_queries_saved_per_request": round(self.users.stats.hits / self.requests, 4) if self.requests else 0.0,
+        }
+
+
+auth_cache = AuthCache()
@@ -9,8 +9,140 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "app"
     DATABASE_URL: str | None = None
+    AUTO_MIGRATE: bool = False  # apply pending migrations at startup (dev convenience)
+    # Connection pool
+    DB_ECHO: bool = False  # log every SQL statement through the logging queue (debugging only)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 256  # asyncpg prepared statements per connection
+    # Read replicas (each gets its own pool sized like the primary's)
+    DATABASE_REPLICA_URLS: list[str] = []  # empty = all reads on the primary
+    REPLICA_HEALTH_INTERVAL: float = 5  # seconds between health checks
+    REPLICA_HEALTH_TIMEOUT: float = 2
+    REPLICA_MAX_LAG_SECONDS: float = 10  # Postgres standbys further behind are skipped; 0 disables the check
+    READ_YOUR_WRITES_SECONDS: float = 5  # a user's reads go to the primary this long after their own write; 0 disables
     SECRET_KEY: str = "SUPER_SECRET_KEY_CHANGE_IN_PROD"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7 # 1 week
+    INTERNAL_TOKEN: str | None = None  # bearer token for /internal/*; unset answers them with 404
+    # Decoded-token / user-snapshot cache used by get_current_user
+    AUTH_CACHE_SIZE: int = 10_000
+    AUTH_CACHE_TTL_SECONDS: float = 60
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4  # 0 hashes inline on the event loop
+    PASSWORD_HASH_MAX_PENDING: int = 64  # running + queued before login/register return 503
+    # PDF ingestion
+    INGEST_WORKERS: int = 2
+    INGEST_PAGE_BATCH: int = 8  # pages per process-pool task
+    INGEST_INSERT_BATCH: int = 256  # chunk rows per INSERT
+    CHUNK_TOKENS: int = 400
+    CHUNK_OVERLAP_TOKENS: int = 50
+    UPLOAD_SPOOL_DIR: str | None = None  # defaults to the system temp dir
+    # Bulk metric ingestion
+    METRIC_BATCH_SIZE: int = 5000  # readings validated and inserted together
+    METRIC_MAX_AGE_DAYS: int = 366 * 2  # older readings are rejected
+    TREND_HALF_LIFE_HOURS: float = 72  # decay of the rolling-window trend statistics
+    # Infant growth screening
+    WHO_LMS_PATH: str | None = None  # CSV of the WHO expanded daily LMS tables; defaults to the bundled monthly anchors
+    GROWTH_Z_CUTOFF: float = 2.0  # |z| beyond this is flagged
+    # Journal screening
+    MENTAL_LEXICON_PATH: str | None = None  # defaults to the bundled app/data/mental_lexicon.csv
+    MENTAL_MONITOR_SCORE: float = 1.0  # summed term weight that flags an entry for follow-up
+    NEGATION_WINDOW: int = 3  # tokens after a negation cue that it applies to
+    URGENT_NEGATION_WINDOW: int = 2  # the same for urgent (self-harm) terms: at most one word in between
+    MENTAL_SCREEN_WORKERS: int = 2  # process pool for batch screening; 0 screens inline
+    MENTAL_SCREEN_CHUNK: int = 500  # entries per process-pool task
+    # Background jobs
+    JOB_RUN_IN_APP: bool = True  # run workers inside the API process; False when using scripts/run_workers.py
+    JOB_ASYNC_WORKERS: int = 2  # concurrent I/O-bound jobs (ingestion, trend rebuilds)
+    JOB_PROCESS_WORKERS: int = 1  # CPU-bound jobs, each in its own process
+    JOB_POLL_SECONDS: float = 1.0  # idle workers re-check the queue this often
+    JOB_LEASE_SECONDS: float = 300  # a running job not heartbeated for this long is retried elsewhere
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 10  # doubled on each further attempt
+    JOB_PROGRESS_INTERVAL: float = 0.5  # minimum seconds between progress writes
+    JOB_SPOOL_DIR: str = "data/job_spool"  # uploads waiting for their job; must be shared with worker hosts
+    # Embeddings
+    OPENAI_API_KEY: str | None = None
+    EMBEDDING_BACKEND: str = "openai"  # "openai" or "hashing" (offline)
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DIM: int = 1536
+    EMBEDDING_BATCH_SIZE: int = 256  # texts per embedding API call
+    EMBEDDING_CACHE_PATH: str | None = "data/embedding_cache.sqlite3"  # None disables the cache
+    # Retrieval
+    RETRIEVAL_BACKEND: str = "pgvector"  # "pgvector" or "local"
+    VECTOR_INDEX_KIND: str = "hnsw"  # "hnsw" or "ivfflat"
+    HNSW_M: int = 16
+    HNSW_EF_CONSTRUCTION: int = 64
+    HNSW_EF_SEARCH: int = 40
+    IVFFLAT_LISTS: int = 100
+    IVFFLAT_PROBES: int = 10
+    LOCAL_INDEX_DIR: str = "data/vector_index"
+    LOCAL_INDEX_NLIST: int = 256
+    LOCAL_INDEX_NPROBE: int = 16
+    # Compact first-pass vectors; full-precision embeddings are kept for re-ranking
+    EMBEDDING_STORAGE: str = "float32"  # "float32", "float16" (halfvec on pgvector) or "int8" (local index only)
+    EMBEDDING_REDUCED_DIM: int | None = None  # first pass on this many dimensions
+    EMBEDDING_REDUCTION: str = "pca"  # local index: "pca" or "truncate" (Matryoshka prefix); pgvector always truncates
+    RERANK_CANDIDATES: int = 4  # with compact vectors, k * this many first-pass hits are re-scored exactly
+    HYBRID_RETRIEVAL: bool = True  # fuse BM25 with vector search
+    HYBRID_CANDIDATES: int = 20  # hits taken from each retriever before fusion
+    RRF_K: int = 60
+    BM25_K1: float = 1.2
+    BM25_B: float = 0.75
+    # Recommendation answer cache
+    QUERY_CACHE_SIZE: int = 1024
+    QUERY_CACHE_TTL_SECONDS: float = 60 * 60
+    SEMANTIC_CACHE_SIZE: int = 1024
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95  # min cosine similarity to reuse an answer
+    CORPUS_POLL_SECONDS: float = 5  # how stale the BM25 index and answer cache may be after another process ingests
+    # Session reminders
+    REMINDER_LEADS_MINUTES: list[float] = [24 * 60, 60]  # same notices as the mobile app: "tomorrow", "starting soon"
+    REMINDER_HORIZON_HOURS: float = 48  # upcoming sessions this far ahead are held in memory
+    REMINDER_REFRESH_SECONDS: float = 60  # horizon reload; also picks up sessions created by other workers
+    REMINDER_QUEUE_SIZE: int = 100  # undelivered reminders buffered per connected client
+    REMINDER_HEARTBEAT_SECONDS: float = 15
+    # List responses
+    JSON_STREAM_CHUNK_ROWS: int = 1000  # rows fetched and encoded per chunk of a streamed array
+    # Admission control for expensive routes
+    ADMISSION_CONTROL: bool = True
+    # Path prefix -> concurrent requests, waiters beyond those (more get 503), and a per-caller
+    # token bucket refilled at ``rate``/s up to ``burst`` (empty gives 429). Callers are keyed
+    # by user id from the bearer token, else by client address (login and register always are,
+    # so behind a proxy set ADMISSION_TRUSTED_PROXIES). Omit rate for no rate limit.
+    ADMISSION_LIMITS: dict[str, dict[str, float]] = {
+        "/api/v1/auth": {"concurrency": 4, "queue": 32, "rate": 2, "burst": 20},
+        "/api/v1/ingest/pdf": {"concurrency": 2, "queue": 4, "rate": 0.2, "burst": 5},
+        "/api/v1/recommendations": {"concurrency": 8, "queue": 16, "rate": 0.5, "burst": 5},
+    }
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2  # longest a request waits for a slot before 503
+    # Peers whose X-Forwarded-For names the client ("*" = any, only if nothing else can reach the
+    # app); otherwise every caller behind the proxy shares one bucket. Not needed with uvicorn --proxy-headers.
+    ADMISSION_TRUSTED_PROXIES: list[str] = []
+    ADMISSION_MAX_CALLERS: int = 100_000  # token buckets kept per route, least recently seen dropped
+    # Dashboard
+    DASHBOARD_HISTORY_DAYS: int = 30
+    DASHBOARD_MAX_POINTS: int = 60  # buckets per metric series
+    DASHBOARD_ETAG_SECONDS: int = 60  # an unchanged dashboard still revalidates this often, so windows slide
+    # Recommendation generation
+    LLM_BACKEND: str = "openai"  # "openai" or "fake" (offline, deterministic)
+    LLM_MODEL: str = "gpt-4o-mini"
+    FAKE_LLM_FIRST_TOKEN_MS: float = 300
+    FAKE_LLM_TOKEN_MS: float = 15
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10_000  # records buffered for the writer thread; overflow is dropped
+    LOG_SAMPLE_RATES: dict[str, float] = {"DEBUG": 0.1}  # fraction kept per level below WARNING
+    LOG_RATE_LIMIT: int = 200  # max sub-WARNING records per logger per second; 0 = unlimited
+    # Request profiling
+    PROFILE_SAMPLE_RATE: float = 0.0  # fraction of requests profiled; 0 disables
+    PROFILE_SLOW_MS: float = 500  # only profiles of requests at least this slow are kept
+    PROFILER: str = "cprofile"  # "cprofile" or "pyinstrument"
+    PROFILE_DIR: str = "data/profiles"
 
     model_config = {"case_sensitive": True, "env_file": ".env"}
 
@@ -0,0 +1,144 @@
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.config import settings
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Thins out chatty records before they reach the queue.
+
+    Records at WARNING and above always pass. Below that, each level is kept
+    with the probability given in ``rates`` and every logger is capped at
+    ``per_second`` records per second (0 disables the cap).
+    """
+
+    def __init__(self, rates: dict[str, float], per_second: int = 0):
+        super().__init__()
+        self.rates = {logging.getLevelName(level.upper()): rate for level, rate in rates.items()}
+        self.per_second = per_second
+        self._windows: dict[str, list] = {}  # logger -> [window_start, count]
+        self.sampled_out = 0
+        self.rate_limited = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.levelno, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return False
+        if self.per_second:
+            now = time.monotonic()
+            window = self._windows.get(record.name)
+            if window is None or now - window[0] >= 1.0:
+                window = self._windows[record.name] = [now, 0]
+            if window[1] >= self.per_second:
+                self.rate_limited += 1
+                return False
+            window[1] += 1
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Formats on the calling thread, then drops the record rather than wait
+    if the writer thread has fallen behind."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Pipeline:
+    def __init__(self):
+        self.handler: NonBlockingQueueHandler | None = None
+        self.sampler: SamplingFilter | None = None
+        self.listener: QueueListener | None = None
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict:
+        if self.handler is None:
+            return {"running": False}
+        return {
+            "running": True,
+            "queued": self.handler.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "sampled_out": self.sampler.sampled_out,
+            "rate_limited": self.sampler.rate_limited,
+        }
+
+
+pipeline = _Pipeline()
+
+
+def configure_logging(sink: logging.Handler | None = None) -> _Pipeline:
+    """Route the root logger through a bounded queue to a background writer.
+
+    Request code only pays for formatting and a ``put_nowait``; the (possibly
+    slow) ``sink`` — stdout by default — is written from the listener thread.
+    """
+    with pipeline._lock:
+        if pipeline.listener is not None:
+            return pipeline
+        if sink is None:
+            sink = logging.StreamHandler(sys.stdout)
+        # Records arrive already formatted by the queue handler
+        sink.setFormatter(logging.Formatter("%(message)s"))
+        q: queue.Queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+        handler = NonBlockingQueueHandler(q)
+        handler.setFormatter(JsonFormatter() if settings.LOG_JSON else logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s: %(message)s"
+        ))
+        sampler = SamplingFilter(settings.LOG_SAMPLE_RATES, settings.LOG_RATE_LIMIT)
+        handler.addFilter(sampler)
+        root = logging.getLogger()
+        for existing in root.handlers[:]:
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(settings.LOG_LEVEL)
+        # SQL echo goes through the same queue instead of SQLAlchemy's own stdout handler
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if settings.DB_ECHO else logging.WARNING)
+        listener = QueueListener(q, sink)
+        listener.start()
+        pipeline.handler, pipeline.sampler, pipeline.listener = handler, sampler, listener
+    return pipeline
+
+
+def shutdown_logging():
+    """Flush what is queued and stop the writer thread."""
+    with pipeline._lock:
+        if pipeline.listener is None:
+            return
+        pipeline.listener.stop()
+        logging.getLogger().removeHandler(pipeline.handler)
+        pipeline.handler = pipeline.sampler = pipeline.listener = None
@@ -0,0 +1,239 @@
+import asyncio
+import contextvars
+import cProfile
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.telemetry import Histogram
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+_current: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar("request_stats", default=None)
+
+
+@dataclass
+class RouteStats:
+    latency: Histogram = field(default_factory=Histogram)
+    queries: Histogram = field(default_factory=lambda: Histogram(QUERY_COUNT_BUCKETS))
+    db_seconds: float = 0.0
+    handler_seconds: float = 0.0
+    statuses: dict[str, int] = field(default_factory=dict)
+
+
+class Registry:
+    def __init__(self):
+        self.routes: dict[tuple[str, str], RouteStats] = {}
+        self.loop_lag = Histogram()
+        self.profiles_written = 0
+        self._lock = threading.Lock()
+
+    def route(self, method: str, path: str) -> RouteStats:
+        key = (method, path)
+        stats = self.routes.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self.routes.setdefault(key, RouteStats())
+        return stats
+
+
+registry = Registry()
+
+
+def track_queries(engine):
+    """Count statements and DB time against whichever request issued them.
+
+    SQLAlchemy runs cursor hooks in a greenlet that inherits the request
+    task's context, so the contextvar resolves to that request's stats.
+    """
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info["request_query_start"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += time.perf_counter() - conn.info.pop("request_query_start", time.perf_counter())
+
+
+class _Profiler:
+    """Sampled profile of one request; at most one runs at a time because
+    cProfile hooks the whole thread. pyinstrument (if installed and selected)
+    follows the request's task across awaits instead."""
+    active = False
+
+    def __init__(self):
+        _Profiler.active = True
+        self.kind = settings.PROFILER
+        if self.kind == "pyinstrument":
+            from pyinstrument import Profiler
+            self._profiler = Profiler(async_mode="enabled")
+            self._profiler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self):
+        if self.kind == "pyinstrument":
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+        _Profiler.active = False
+
+    def dump(self, method: str, path: str, elapsed: float):
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        slug = path.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        name = os.path.join(settings.PROFILE_DIR, f"{int(time.time() * 1000)}-{method}-{slug}-{int(elapsed * 1000)}ms")
+        if self.kind == "pyinstrument":
+            with open(name + ".html", "w") as f:
+                f.write(self._profiler.output_html())
+        else:
+            self._profiler.dump_stats(name + ".prof")
+        registry.profiles_written += 1
+
+
+def _route_template(scope) -> str:
+    """Full path template of the matched route, e.g. ``/api/v1/metrics/history``.
+
+    Depending on the FastAPI version, ``scope["route"].path`` is either the
+    full template or only the part below the including router's prefix; in
+    the latter case the prefix is recovered from the concrete request path.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return "unmatched"
+    segments = scope["path"].split("/")
+    depth = template.count("/")
+    if len(segments) <= depth:
+        return template
+    return "/".join(segments[:-depth]) + template
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware recording latency, status, SQL count and DB time
+    per route template (``/api/v1/metrics/history``, not the raw URL)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        profiler = None
+        if settings.PROFILE_SAMPLE_RATE and not _Profiler.active and random.random() < settings.PROFILE_SAMPLE_RATE:
+            profiler = _Profiler()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            if profiler is not None:
+                profiler.stop()
+            path = _route_template(scope)
+            route_stats = registry.route(scope["method"], path)
+            route_stats.latency.observe(elapsed)
+            route_stats.queries.observe(stats.queries)
+            route_stats.db_seconds += stats.db_seconds
+            route_stats.handler_seconds += elapsed - stats.db_seconds
+            status_class = f"{status['code'] // 100}xx"
+            route_stats.statuses[status_class] = route_stats.statuses.get(status_class, 0) + 1
+            if profiler is not None and elapsed * 1000 >= settings.PROFILE_SLOW_MS:
+                profiler.dump(scope["method"], path, elapsed)
+
+
+async def monitor_loop_lag(interval: float = 0.5):
+    """Measure how late the event loop wakes a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        registry.loop_lag.observe(max(0.0, loop.time() - expected))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, hist: Histogram, **labels) -> list[str]:
+    lines = []
+    for bound, count in hist.cumulative():
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f"{name}_bucket{_labels(**labels, le=le)} {count}")
+    lines.append(f"{name}_sum{_labels(**labels) if labels else ''} {hist.sum}")
+    lines.append(f"{name}_count{_labels(**labels) if labels else ''} {hist.count}")
+    return lines
+
+
+def render_prometheus(gauges: dict[str, float] | None = None, histograms: dict[str, Histogram] | None = None,
+                      labelled: dict[str, tuple[str, list[tuple[dict, object]]]] | None = None) -> str:
+    """Prometheus text exposition (format 0.0.4) of everything recorded here.
+
+    ``labelled`` maps a metric name to its type and ``(labels, value)``
+    series; values are ``Histogram`` instances for type "histogram".
+    """
+    lines = [
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    routes = sorted(registry.routes.items())
+    for (method, path), stats in routes:
+        lines += _histogram_lines("http_request_duration_seconds", stats.latency, method=method, route=path)
+    lines.append("# TYPE http_request_db_queries histogram")
+    for (method, path), stats in routes:
+        lines += _histogram_lines("http_request_db_queries", stats.queries, method=method, route=path)
+    lines.append("# TYPE http_request_db_seconds_total counter")
+    for (method, path), stats in routes:
+        lines.append(f"http_request_db_seconds_total{_labels(method=method, route=path)} {stats.db_seconds}")
+    lines.append("# TYPE http_request_handler_seconds_total counter")
+    for (method, path), stats in routes:
+        lines.append(f"http_request_handler_seconds_total{_labels(method=method, route=path)} {stats.handler_seconds}")
+    lines.append("# TYPE http_responses_total counter")
+    for (method, path), stats in routes:
+        for status_class, n in sorted(stats.statuses.items()):
+            lines.append(f"http_responses_total{_labels(method=method, route=path, status=status_class)} {n}")
+    lines.append("# TYPE event_loop_lag_seconds histogram")
+    lines += _histogram_lines("event_loop_lag_seconds", registry.loop_lag)
+    lines.append("# TYPE slow_request_profiles_total counter")
+    lines.append(f"slow_request_profiles_total {registry.profiles_written}")
+    for name, hist in (histograms or {}).items():
+        lines.append(f"# TYPE {name} histogram")
+        lines += _histogram_lines(name, hist)
+    for name, value in (gauges or {}).items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    for name, (kind, series) in (labelled or {}).items():
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in series:
+            if kind == "histogram":
+                lines += _histogram_lines(name, value, **labels)
+            else:
+                lines.append(f"{name}{_labels(**labels)} {value}")
+    return "\n".join(lines) + "\n"
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Union
 from jose import jwt
@@ -25,5 +27,79 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(
         password.encode("utf-8"),
-        bcrypt.gensalt(),
+        bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS),
     ).decode("utf-8")
+
+def needs_rehash(hashed_password: str) -> bool:
+    # bcrypt hashes look like $2b$<cost>$<salt+digest>
+    try:
+        prefix, cost = hashed_password.split("$")[1:3]
+        return prefix != "2b" or int(cost) != settings.BCRYPT_ROUNDS
+    except ValueError:
+        return True
+
+
+class HashingOverloaded(Exception):
+    """Raised when the password hashing queue is full; callers should shed the request."""
+
+
+class PasswordHashPool:
+    """Runs bcrypt off the event loop on a fixed number of threads.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism.
+    At most ``max_pending`` calls may be running or queued; beyond that new
+    calls fail fast with ``HashingOverloaded`` instead of piling up latency.
+    With ``workers=0`` hashing runs inline, as it did before the pool existed.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="bcrypt") if workers else None
+
+    async def run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HashingOverloaded()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+hash_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+async def hash_password_async(password: str) -> str:
+    return await hash_pool.run(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Check a password off the event loop.
+
+    Returns ``(valid, new_hash)`` where ``new_hash`` is set when the password
+    matched but the stored hash uses outdated cost parameters.
+    """
+    def check() -> tuple[bool, str | None]:
+        if not verify_password(plain_password, hashed_password):
+            return False, None
+        return True, get_password_hash(plain_password) if needs_rehash(hashed_password) else None
+    return await hash_pool.run(check)
@@ -0,0 +1,10 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def insert_ignore(db: AsyncSession, model, index_elements: list[str]):
+    """INSERT ... ON CONFLICT (index_elements) DO NOTHING for the session's dialect."""
+    insert = _INSERTS[db.bind.dialect.name]
+    return insert(model).on_conflict_do_nothing(index_elements=index_elements)
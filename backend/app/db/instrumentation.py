@@ -0,0 +1,110 @@
+import threading
+import time
+import weakref
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.telemetry import Histogram
+
+_MAX_STATEMENTS = 500  # distinct statements tracked before lumping into "other"
+_engine_stats: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class PoolStats:
+    def __init__(self):
+        self.wait = Histogram()
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.statements: dict[str, list] = {}  # sql -> [count, total_seconds, max_seconds]
+        self._lock = threading.Lock()
+
+    def record_statement(self, statement: str, elapsed: float):
+        with self._lock:
+            entry = self.statements.get(statement)
+            if entry is None:
+                if len(self.statements) >= _MAX_STATEMENTS:
+                    statement = "other"
+                entry = self.statements.setdefault(statement, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+
+    def top_statements(self, n: int = 20) -> list[dict]:
+        with self._lock:
+            items = sorted(self.statements.items(), key=lambda kv: kv[1][1], reverse=True)[:n]
+        return [
+            {"statement": sql, "count": c, "total_ms": round(total * 1000, 3),
+             "mean_ms": round(total / c * 1000, 3), "max_ms": round(peak * 1000, 3)}
+            for sql, (c, total, peak) in items
+        ]
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that times every checkout and counts overflow/timeouts."""
+
+    stats: PoolStats
+
+    def connect(self):
+        started = time.perf_counter()
+        overflow_before = self.overflow()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        self.stats.wait.observe(time.perf_counter() - started)
+        self.stats.checkouts += 1
+        if self.overflow() > overflow_before and self.overflow() > 0:
+            self.stats.overflow_events += 1
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def instrument_engine(engine, stats: PoolStats | None = None) -> PoolStats:
+    """Attach per-statement timing to ``engine`` and share ``stats`` with its pool."""
+    stats = stats or PoolStats()
+    _engine_stats[engine.sync_engine] = stats
+    pool = engine.sync_engine.pool
+    if isinstance(pool, InstrumentedPool):
+        pool.stats = stats
+
+    # The start time rides on the statement's execution context, so a failed
+    # statement (no after_cursor_execute) leaves nothing behind to mis-pair
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_start", None)
+        if started is not None:
+            stats.record_statement(statement, time.perf_counter() - started)
+
+    return stats
+
+
+def get_pool_stats(engine) -> PoolStats:
+    return _engine_stats[engine.sync_engine]
+
+
+def pool_snapshot(engine) -> dict:
+    stats = get_pool_stats(engine)
+    pool = engine.sync_engine.pool
+    live = {}
+    if hasattr(pool, "checkedout"):
+        live = {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()}
+    return {
+        **live,
+        "checkouts": stats.checkouts,
+        "overflow_events": stats.overflow_events,
+        "timeouts": stats.timeouts,
+        "wait_seconds": stats.wait.as_dict(),
+        "statements": stats.top_statements(),
+    }
@@ -0,0 +1,283 @@
+"""Versioned schema migrations.
+
+Each ``Migration`` is applied once, in order, and recorded in the
+``schema_version`` table. The baseline is frozen to the schema the app
+shipped with before versioning; everything since is an explicit step. Steps
+are still idempotent (``IF NOT EXISTS``, ``checkfirst``, ``AddColumn``'s
+column check) so a partially applied migration can be re-run, and tables
+created by a later migration from the current model already have columns a
+still later one adds.
+
+Index builds run outside a transaction with ``CREATE INDEX CONCURRENTLY`` on
+Postgres so they don't block writes on a live table.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text, inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app import models
+
+_LOCK_ID = 727_001  # arbitrary key for pg_advisory_lock
+
+
+@dataclass
+class Sql:
+    statement: str
+    dialects: tuple[str, ...] | None = None  # None = every dialect
+
+
+@dataclass
+class RunSync:
+    fn: Callable  # called with a sync Connection inside the migration transaction
+
+
+@dataclass
+class BuildIndex:
+    index: Index
+
+
+@dataclass
+class AddColumn:
+    column: Column  # a model column; added only if its table lacks it
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    steps: list = field(default_factory=list)
+
+
+# The schema as it was before migrations existed. Never edit these: later
+# changes go in a new migration so legacy and fresh databases converge.
+_baseline = MetaData()
+Table(
+    "users", _baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String, unique=True, index=True),
+    Column("full_name", String, index=True),
+    Column("hashed_password", String),
+    Column("age", Integer, nullable=True),
+    Column("pre_pregnancy_weight", Float, nullable=True),
+    Column("lmp_date", DateTime, nullable=True),
+    Column("conditions", Text, nullable=True),
+    Column("is_onboarded", Boolean),
+)
+Table(
+    "metrics", _baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("metric_type", String, index=True),
+    Column("value", Float),
+    Column("unit", String),
+    Column("timestamp", DateTime),
+    Column("owner_id", Integer, ForeignKey("users.id")),
+)
+Table(
+    "tele_sessions", _baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String),
+    Column("scheduled_at", DateTime),
+    Column("notes", Text, nullable=True),
+    Column("created_at", DateTime),
+    Column("owner_id", Integer, ForeignKey("users.id")),
+)
+Table(
+    "documents", _baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("content", Text),
+    Column("embedding", Vector(1536)),
+    Column("metadata_json", Text),
+)
+
+
+def _create_baseline(conn):
+    _baseline.create_all(conn, checkfirst=True)
+
+
+def _add_column(conn, column: Column):
+    table = column.table.name
+    if column.name in {c["name"] for c in inspect(conn).get_columns(table)}:
+        return
+    ddl = f"ALTER TABLE {table} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"
+    for fk in column.foreign_keys:
+        ddl += f" REFERENCES {fk.column.table.name} ({fk.column.name})"
+    conn.execute(text(ddl))
+
+
+def _index(table, name: str) -> Index:
+    return next(i for i in table.__table__.indexes if i.name == name)
+
+
+MIGRATIONS = [
+    Migration(1, "baseline schema", [
+        Sql("CREATE EXTENSION IF NOT EXISTS vector", dialects=("postgresql",)),
+        RunSync(_create_baseline),
+    ]),
+    Migration(2, "composite indexes for history and reminder queries", [
+        # The index is unique; keep the first copy of each re-sent reading
+        Sql(
+            "DELETE FROM metrics WHERE EXISTS (SELECT 1 FROM metrics d "
+            "WHERE d.owner_id = metrics.owner_id AND d.metric_type = metrics.metric_type "
+            "AND d.timestamp = metrics.timestamp AND d.id < metrics.id)"
+        ),
+        BuildIndex(_index(models.Metric, "ix_metrics_owner_type_ts")),
+        BuildIndex(_index(models.TeleSession, "ix_tele_sessions_owner_scheduled")),
+    ]),
+    # Existing users' state is filled by scripts/rebuild_trends.py
+    Migration(3, "incremental metric trend state", [
+        RunSync(lambda conn: models.MetricTrend.__table__.create(conn, checkfirst=True)),
+    ]),
+    Migration(4, "scheduled_at index for the reminder scheduler's horizon scan", [
+        BuildIndex(_index(models.TeleSession, "ix_tele_sessions_scheduled")),
+    ]),
+    Migration(5, "durable background job queue", [
+        RunSync(lambda conn: models.Job.__table__.create(conn, checkfirst=True)),
+    ]),
+    # Chunks stored before this have no hash; NULLs don't collide in the
+    # unique index, they just never dedup against new ingests
+    Migration(6, "content hash for chunk dedup", [
+        AddColumn(models.ReactedDocument.__table__.c.content_hash),
+        BuildIndex(_index(models.ReactedDocument, "ix_documents_content_hash")),
+    ]),
+    Migration(7, "job owners", [
+        AddColumn(models.Job.__table__.c.owner_id),
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+async def _ensure_version_table(conn: AsyncConnection):
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, description VARCHAR NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+async def current_version(engine: AsyncEngine) -> int:
+    async with engine.begin() as conn:
+        await _ensure_version_table(conn)
+        return (await conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version"))).scalar_one()
+
+
+async def _build_index(engine: AsyncEngine, index: Index):
+    cols = ", ".join(c.name for c in index.columns)
+    unique = "UNIQUE " if index.unique else ""
+    table = index.table.name
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        if engine.dialect.name == "postgresql":
+            # An interrupted concurrent build leaves an INVALID index behind
+            # that IF NOT EXISTS would happily skip; drop it and rebuild.
+            invalid = (await conn.execute(text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ), {"name": index.name})).first()
+            if invalid:
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+            await conn.execute(text(f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {index.name} ON {table} ({cols})"))
+        else:
+            await conn.execute(text(f"CREATE {unique}INDEX IF NOT EXISTS {index.name} ON {table} ({cols})"))
+
+
+async def _apply(engine: AsyncEngine, migration: Migration):
+    dialect = engine.dialect.name
+    for step in migration.steps:
+        if isinstance(step, BuildIndex):
+            await _build_index(engine, step.index)
+            continue
+        async with engine.begin() as conn:
+            if isinstance(step, Sql):
+                if step.dialects is None or dialect in step.dialects:
+                    await conn.execute(text(step.statement))
+            elif isinstance(step, AddColumn):
+                await conn.run_sync(_add_column, step.column)
+            else:
+                await conn.run_sync(step.fn)
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)"),
+            {"v": migration.version, "d": migration.description, "t": datetime.utcnow()},
+        )
+
+
+async def migrate(engine: AsyncEngine, target: int = LATEST_VERSION) -> list[int]:
+    """Apply pending migrations up to ``target``; returns the versions applied."""
+    applied = []
+    async with engine.connect() as lock_conn:
+        if engine.dialect.name == "postgresql":
+            # Serialise concurrent migrators (e.g. several app replicas)
+            await lock_conn.execute(text(f"SELECT pg_advisory_lock({_LOCK_ID})"))
+        try:
+            version = await current_version(engine)
+            for migration in MIGRATIONS:
+                if version < migration.version <= target:
+                    await _apply(engine, migration)
+                    applied.append(migration.version)
+        finally:
+            if engine.dialect.name == "postgresql":
+                await lock_conn.execute(text(f"SELECT pg_advisory_unlock({_LOCK_ID})"))
+    return applied
+
+
+async def verify_schema(engine: AsyncEngine) -> int:
+    version = await current_version(engine)
+    if version < LATEST_VERSION:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {version}, code expects {LATEST_VERSION}. "
+            "Run `python scripts/migrate.py` to apply pending migrations."
+        )
+    return version
+
+
+# Hot queries whose plans must use an index; parameters are placeholders.
+HOT_QUERIES = {
+    "metric_history": (
+        "SELECT id, value, timestamp FROM metrics "
+        "WHERE owner_id = :owner AND metric_type = :type AND timestamp >= :since ORDER BY timestamp",
+        {"owner": 1, "type": "glucose", "since": datetime(2000, 1, 1)},
+    ),
+    "session_reminders": (
+        "SELECT id, title, scheduled_at FROM tele_sessions "
+        "WHERE owner_id = :owner AND scheduled_at >= :start AND scheduled_at <= :end ORDER BY scheduled_at",
+        {"owner": 1, "start": datetime(2000, 1, 1), "end": datetime(2000, 1, 2)},
+    ),
+    "reminder_horizon": (
+        "SELECT id, owner_id, title, scheduled_at FROM tele_sessions "
+        "WHERE scheduled_at > :start AND scheduled_at <= :end",
+        {"start": datetime(2000, 1, 1), "end": datetime(2000, 1, 3)},
+    ),
+    "job_claim": (
+        "SELECT id FROM jobs WHERE status = 'queued' AND run_after <= :now ORDER BY priority DESC, id LIMIT 1",
+        {"now": datetime(2000, 1, 1)},
+    ),
+}
+
+
+async def explain_hot_queries(engine: AsyncEngine) -> dict[str, tuple[bool, str]]:
+    """EXPLAIN each hot query; returns ``name -> (uses_index, plan_text)``.
+
+    On Postgres sequential scans are disabled for the check so a tiny table
+    doesn't mask a missing index.
+    """
+    results = {}
+    async with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+            prefix = "EXPLAIN "
+        else:
+            prefix = "EXPLAIN QUERY PLAN "
+        for name, (sql, params) in HOT_QUERIES.items():
+            rows = (await conn.execute(text(prefix + sql), params)).all()
+            plan = "\n".join(str(row[-1]) for row in rows)
+            uses_index = "Index" in plan or "USING INDEX" in plan or "USING COVERING INDEX" in plan
+            results[name] = (uses_index and "Seq Scan" not in plan, plan)
+    return results
@@ -0,0 +1,157 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.instrumentation import pool_snapshot
+from app.db.session import SessionLocal, TrackingSession, build_engine
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.engine = build_engine(url)
+        self.sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine, class_=AsyncSession)
+        self.name = self.engine.url.render_as_string(hide_password=True)
+        self.healthy = True
+        self.lag: float | None = None
+        self.reads = 0
+        self.failures = 0
+
+
+class ReplicaSet:
+    """Read replicas chosen round-robin among those passing health checks.
+
+    Every ``health_interval`` seconds each replica must answer ``SELECT 1``
+    within ``timeout``; on Postgres its replay lag must also be under
+    ``max_lag``. Unhealthy replicas are skipped until they pass again, and
+    with none healthy (or none configured) reads fall back to the primary.
+    """
+
+    def __init__(self, urls: list[str], health_interval: float = settings.REPLICA_HEALTH_INTERVAL,
+                 timeout: float = settings.REPLICA_HEALTH_TIMEOUT, max_lag: float = settings.REPLICA_MAX_LAG_SECONDS):
+        self.replicas = [Replica(url) for url in urls]
+        self.health_interval = health_interval
+        self.timeout = timeout
+        self.max_lag = max_lag
+        self._turn = itertools.count()
+        self._task: asyncio.Task | None = None
+        self.primary_reads = 0
+
+    def pick(self) -> sessionmaker:
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            self.primary_reads += 1
+            return SessionLocal
+        replica = healthy[next(self._turn) % len(healthy)]
+        replica.reads += 1
+        return replica.sessionmaker
+
+    async def _probe(self, replica: Replica) -> bool:
+        async with replica.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            if replica.engine.dialect.name == "postgresql" and self.max_lag > 0:
+                # NULL when not a standby; an idle primary also makes this grow, so it's only a bound
+                replica.lag = (await conn.execute(text(
+                    "SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+                ))).scalar()
+                return replica.lag is None or replica.lag <= self.max_lag
+        return True
+
+    async def check(self):
+        for replica in self.replicas:
+            try:
+                ok = await asyncio.wait_for(self._probe(replica), timeout=self.timeout)
+            except Exception as e:
+                ok = False
+                logger.debug("replica probe failed", extra={"replica": replica.name, "error": str(e)})
+            if ok != replica.healthy:
+                logger.warning("replica %s", "recovered" if ok else "marked unhealthy", extra={"replica": replica.name})
+            if not ok:
+                replica.failures += 1
+            replica.healthy = ok
+
+    async def _run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.health_interval)
+
+    def start(self):
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> dict:
+        return {
+            "primary_reads": self.primary_reads,
+            "pinned_reads": recent_writers.pinned_reads,
+            "replicas": [
+                {"name": r.name, "healthy": r.healthy, "lag_seconds": r.lag, "reads": r.reads,
+                 "failed_checks": r.failures, "pool": pool_snapshot(r.engine)}
+                for r in self.replicas
+            ],
+        }
+
+
+class RecentWriters:
+    """Users who committed a write in the last ``window`` seconds.
+
+    Their reads go to the primary so they see their own writes despite
+    replica lag. The record is per process: with several API workers behind
+    a load balancer, sticky routing (or a lag well under ``window``) is
+    what makes the guarantee hold.
+    """
+
+    def __init__(self, window: float = settings.READ_YOUR_WRITES_SECONDS, max_users: int = 100_000):
+        self.window = window
+        self.max_users = max_users
+        self._writes: OrderedDict[int, float] = OrderedDict()
+        self.pinned_reads = 0
+
+    def mark(self, user_id: int):
+        if self.window <= 0:
+            return
+        self._writes[user_id] = time.monotonic()
+        self._writes.move_to_end(user_id)
+        cutoff = time.monotonic() - self.window
+        # Oldest first, so stop at the first entry still inside the window
+        while self._writes and (len(self._writes) > self.max_users or next(iter(self._writes.values())) < cutoff):
+            self._writes.popitem(last=False)
+
+    def pinned(self, user_id: int | None) -> bool:
+        if user_id is None or self.window <= 0:
+            return False
+        wrote_at = self._writes.get(user_id)
+        if wrote_at is not None and time.monotonic() - wrote_at < self.window:
+            self.pinned_reads += 1
+            return True
+        return False
+
+
+replicas = ReplicaSet(settings.DATABASE_REPLICA_URLS)
+recent_writers = RecentWriters()
+
+
+@event.listens_for(TrackingSession, "after_commit")
+def _pin_writer(session: Session):
+    # Runs at the commit itself, so the pin is in place before the response goes out
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        recent_writers.mark(user_id)
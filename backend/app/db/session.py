@@ -1,6 +1,37 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.db.instrumentation import InstrumentedPool, instrument_engine
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+def build_engine(url: str, **overrides):
+    """Async engine with pool sizing and statement caching taken from Settings.
+
+    ``overrides`` replace individual ``create_async_engine`` arguments, e.g.
+    to compare pool configurations in a benchmark.
+    """
+    url = make_url(url)
+    options = {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() == "asyncpg":
+        # SQLAlchemy's per-connection prepared statement cache, plus asyncpg's own
+        url = url.update_query_dict({"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)})
+        options["connect_args"] = {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    options.update(overrides)
+    engine = create_async_engine(url, **options)
+    instrument_engine(engine)
+    return engine
+
+class TrackingSession(Session):
+    """Primary-session class; a commit pins ``info["user_id"]``'s reads to the primary (see replicas)."""
+
+
+engine = build_engine(settings.DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession,
+                            sync_session_class=TrackingSession)
@@ -1,24 +1,52 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from app.api.admission import AdmissionMiddleware, admission
+from app.api.deps import require_operator
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.auth_cache import auth_cache
+from app.core.log import configure_logging, pipeline as log_pipeline, shutdown_logging
+from app.core.security import hash_pool
 from app.db.session import engine
-from app.db.base_class import Base
-
-from sqlalchemy import text
+from app.core.observability import RequestMetricsMiddleware, monitor_loop_lag, render_prometheus, track_queries
+from app.db.instrumentation import get_pool_stats, pool_snapshot
+from app.db.replicas import recent_writers, replicas
+from app.db.migrations import migrate, verify_schema
+from app.services import job_handlers  # noqa: F401  registers job kinds before workers start
+from app.services.ingestion import IngestionService
+from app.services.jobs import job_workers
+from app.services.mental import MentalHealthService
+from app.services.query_cache import query_cache
+from app.services.reminders import reminder_scheduler
+from app.services.synthesis import generation_stats
 
 # Import all models so Base.metadata registers them
 import app.models  # noqa: F401
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Recreate all tables on startup (dev mode - use Alembic in production)
-    async with engine.begin() as conn:
-        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+    configure_logging()
+    # Schema changes go through scripts/migrate.py; startup only checks the version
+    if settings.AUTO_MIGRATE:
+        await migrate(engine)
+    await verify_schema(engine)
+    lag_monitor = asyncio.create_task(monitor_loop_lag())
+    replicas.start()
+    reminder_scheduler.start()
+    if settings.JOB_RUN_IN_APP:
+        job_workers.start()
     yield
+    await job_workers.stop()
+    await reminder_scheduler.stop()
+    await replicas.stop()
+    lag_monitor.cancel()
+    IngestionService.shutdown()
+    MentalHealthService.shutdown()
+    hash_pool.shutdown()
+    shutdown_logging()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -28,6 +56,9 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Inside CORS so shed responses still carry CORS headers
+app.add_middleware(AdmissionMiddleware)
+
 # Set all CORS enabled origins
 app.add_middleware(
     CORSMiddleware,
@@ -37,8 +68,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(RequestMetricsMiddleware)
+track_queries(engine)
+for replica in replicas.replicas:
+    track_queries(replica.engine)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok", "project": settings.PROJECT_NAME}
+
+@app.get("/internal/stats", include_in_schema=False, dependencies=[Depends(require_operator)])
+async def internal_stats():
+    return {
+        "auth_cache": auth_cache.stats(),
+        "query_cache": query_cache.stats.as_dict(),
+        "password_hashing": hash_pool.stats(),
+        "db_pool": pool_snapshot(engine),
+        "db_replicas": replicas.stats(),
+        "logging": log_pipeline.stats(),
+        "recommendations": generation_stats.as_dict(),
+        "reminders": reminder_scheduler.stats(),
+        "jobs": job_workers.stats(),
+        "admission": admission.stats(),
+    }
+
+@app.get("/internal/metrics", include_in_schema=False, dependencies=[Depends(require_operator)])
+async def internal_metrics():
+    pool_stats = get_pool_stats(engine)
+    pool = engine.sync_engine.pool
+    gauges = {
+        "db_pool_checked_out": pool.checkedout() if hasattr(pool, "checkedout") else 0,
+        "db_pool_timeouts_total": pool_stats.timeouts,
+        "db_replicas_healthy": sum(r.healthy for r in replicas.replicas),
+        "db_reads_on_primary_total": replicas.primary_reads + recent_writers.pinned_reads,
+        "password_hash_pending": hash_pool.pending,
+        "auth_cache_db_queries_saved_total": auth_cache.users.stats.hits,
+        "query_cache_hit_rate": query_cache.stats.as_dict()["hit_rate"],
+        "jobs_running": job_workers.running_jobs,
+        "jobs_succeeded_total": job_workers.succeeded,
+        "jobs_failed_total": job_workers.failed,
+        "jobs_retried_total": job_workers.retried,
+    }
+    body = render_prometheus(gauges, {
+        "db_pool_wait_seconds": pool_stats.wait,
+        "recommendation_ttft_seconds": generation_stats.ttft,
+        "recommendation_total_seconds": generation_stats.total,
+        "reminder_delivery_lag_seconds": reminder_scheduler.lag,
+        "job_duration_seconds": job_workers.duration,
+    }, labelled=admission.prometheus())
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
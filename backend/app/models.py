@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from pgvector.sqlalchemy import Vector
 from app.db.base_class import Base
@@ -21,6 +21,11 @@ class User(Base):
 
 class Metric(Base):
     __tablename__ = "metrics"
+    __table_args__ = (
+        # Serves the history/export range scans, and being unique lets bulk
+        # ingest skip re-sent readings with ON CONFLICT DO NOTHING
+        Index("ix_metrics_owner_type_ts", "owner_id", "metric_type", "timestamp", unique=True),
+    )
     id = Column(Integer, primary_key=True, index=True)
     metric_type = Column(String, index=True) # glucose, weight, bp, etc.
     value = Column(Float)
@@ -29,8 +34,39 @@ class Metric(Base):
     owner_id = Column(Integer, ForeignKey("users.id"))
     owner = relationship("User", back_populates="metrics")
 
+class MetricTrend(Base):
+    """Running statistics per (user, metric_type), updated as readings arrive.
+
+    ``count``/``mean``/``m2`` are lifetime Welford accumulators. The ``w*``
+    columns are exponentially time-decayed sums (half-life
+    ``TREND_HALF_LIFE_HOURS``) referenced to ``last_timestamp``, with time
+    measured in hours since ``t_ref``; they give the rolling-window mean,
+    variance and least-squares slope.
+    """
+    __tablename__ = "metric_trends"
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    metric_type = Column(String, primary_key=True)
+    count = Column(Integer, default=0)
+    mean = Column(Float, default=0.0)
+    m2 = Column(Float, default=0.0)
+    min_value = Column(Float, nullable=True)
+    max_value = Column(Float, nullable=True)
+    last_value = Column(Float, nullable=True)
+    last_timestamp = Column(DateTime, nullable=True)
+    t_ref = Column(DateTime, nullable=True)
+    w = Column(Float, default=0.0)
+    wt = Column(Float, default=0.0)
+    wtt = Column(Float, default=0.0)
+    wy = Column(Float, default=0.0)
+    wyy = Column(Float, default=0.0)
+    wty = Column(Float, default=0.0)
+
 class TeleSession(Base):
     __tablename__ = "tele_sessions"
+    __table_args__ = (
+        Index("ix_tele_sessions_owner_scheduled", "owner_id", "scheduled_at"),
+        Index("ix_tele_sessions_scheduled", "scheduled_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
     scheduled_at = Column(DateTime)
@@ -43,5 +79,36 @@ class ReactedDocument(Base):
     __tablename__ = "documents"
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text)
+    content_hash = Column(String(64), unique=True, index=True)  # sha256 of whitespace-normalised content
     embedding = Column(Vector(1536))
     metadata_json = Column(Text)
+
+class Job(Base):
+    """A unit of background work, claimed by workers with FOR UPDATE SKIP LOCKED.
+
+    ``locked_at`` is the lease: a running worker refreshes it, and a job
+    whose lease is older than ``JOB_LEASE_SECONDS`` is handed to another
+    worker (its process died). ``payload`` and ``result`` are JSON strings.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_claim", "status", "run_after"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # who may read it; None for operator jobs
+    payload = Column(Text, nullable=False, default="{}")
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    priority = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    progress = Column(Float, nullable=False, default=0.0)
+    message = Column(String, nullable=True)
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models import ReactedDocument
+
+
+class CorpusWatermark:
+    """Highest ``documents.id``, re-read at most every ``interval`` seconds.
+
+    Ingestion runs as a job, often in a separate worker process, so the API
+    process can't rely on the ingesting process updating its in-memory
+    state. Readers compare this against what they last saw and reload (the
+    BM25 index) or drop (the answer cache) when it has moved.
+    """
+
+    def __init__(self, interval: float = settings.CORPUS_POLL_SECONDS, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self.value: int | None = None
+        self._checked = 0.0
+        self._lock = asyncio.Lock()
+
+    async def current(self, session_factory) -> int:
+        if self.value is not None and self.clock() - self._checked < self.interval:
+            return self.value
+        async with self._lock:
+            if self.value is None or self.clock() - self._checked >= self.interval:
+                async with session_factory() as db:
+                    high = (await db.execute(select(func.coalesce(func.max(ReactedDocument.id), 0)))).scalar_one()
+                self.value = max(self.value or 0, high)
+                self._checked = self.clock()
+        return self.value
+
+
+corpus_watermark = CorpusWatermark()
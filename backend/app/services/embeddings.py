@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.core.config import settings
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def content_hash(text: str) -> str:
+    """Identity of a chunk's text, insensitive to whitespace differences."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+class HashingEmbedder:
+    """Deterministic, offline embedder using signed feature hashing of word
+    unigrams and bigrams. Useful for local development, tests and benchmarks
+    where calling a hosted model is not an option."""
+
+    def __init__(self, dim: int = settings.EMBEDDING_DIM):
+        self.dim = dim
+        self.model = f"hashing-{dim}"
+
+    def _embed(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        words = _WORD_RE.findall(text.lower())
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            h = int.from_bytes(digest, "little")
+            vec[h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    async def embed_documents(self, texts: list[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        return np.stack([self._embed(t) for t in texts])
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        return self._embed(text)
+
+
+class OpenAIEmbedder:
+    def __init__(self, model: str = settings.EMBEDDING_MODEL, dim: int = settings.EMBEDDING_DIM):
+        from langchain_openai import OpenAIEmbeddings
+
+        self.dim = dim
+        self.model = model
+        self._client = OpenAIEmbeddings(model=model, api_key=settings.OPENAI_API_KEY)
+
+    async def embed_documents(self, texts: list[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        return np.asarray(await self._client.aembed_documents(texts), dtype=np.float32)
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        return np.asarray(await self._client.aembed_query(text), dtype=np.float32)
+
+
+class EmbeddingStore:
+    """On-disk map of (model, content hash) -> float32 vector, backed by SQLite
+    so it survives restarts and works without network access."""
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, hash TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, hash))"
+            )
+            self._conn.commit()
+
+    def get_many(self, model: str, hashes: list[str]) -> dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                part = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(part))})",
+                    [model, *part],
+                )
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, items: dict[str, np.ndarray]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                [(model, h, np.asarray(v, dtype=np.float32).tobytes()) for h, v in items.items()],
+            )
+            self._conn.commit()
+
+
+@dataclass
+class EmbeddingStats:
+    hits: int = 0
+    misses: int = 0
+    calls: int = 0  # batched requests made to the underlying embedder
+
+    def as_dict(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "calls": self.calls}
+
+
+class CachedEmbedder:
+    """Content-addressed cache in front of another embedder.
+
+    Texts are keyed by the SHA-256 of their whitespace-normalised content, so
+    re-ingesting unchanged chunks costs a local lookup instead of an API call.
+    Misses are de-duplicated and sent in batches of ``batch_size``.
+    """
+
+    def __init__(self, inner, store: EmbeddingStore, batch_size: int = settings.EMBEDDING_BATCH_SIZE):
+        self.inner = inner
+        self.store = store
+        self.batch_size = batch_size
+        self.dim = inner.dim
+        self.model = inner.model
+        self.stats = EmbeddingStats()
+
+    async def embed_documents(self, texts: list[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        keys = [content_hash(t) for t in texts]
+        found = await asyncio.to_thread(self.store.get_many, self.model, list(set(keys)))
+        missing = {k: t for k, t in zip(keys, texts) if k not in found}
+        self.stats.misses += len(missing)
+        self.stats.hits += len(texts) - len(missing)
+        pending = list(missing.items())
+        computed = {}
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            vectors = await self.inner.embed_documents([t for _, t in batch])
+            self.stats.calls += 1
+            computed.update((k, v) for (k, _), v in zip(batch, vectors))
+        if computed:
+            await asyncio.to_thread(self.store.put_many, self.model, computed)
+            found.update(computed)
+        return np.stack([found[k] for k in keys])
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        return (await self.embed_documents([text]))[0]
+
+
+_embedder = None
+
+
+def get_embedder():
+    global _embedder
+    if _embedder is None:
+        if settings.EMBEDDING_BACKEND == "openai" and settings.OPENAI_API_KEY:
+            _embedder = OpenAIEmbedder()
+        else:
+            _embedder = HashingEmbedder()
+        if settings.EMBEDDING_CACHE_PATH:
+            _embedder = CachedEmbedder(_embedder, EmbeddingStore(settings.EMBEDDING_CACHE_PATH))
+    return _embedder
@@ -0,0 +1,134 @@
+import csv
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.core.config import settings
+
+BUNDLED_TABLE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "who_lms.csv")
+INDICATORS = ("weight", "length", "head_circumference")
+SEXES = ("male", "female")
+# WHO recommends the restricted (SD23-adjusted) z-score beyond +/-3 for skewed indicators
+_RESTRICTED = {"weight", "head_circumference"}
+
+
+def _normal_cdf(z: np.ndarray) -> np.ndarray:
+    # Abramowitz & Stegun 7.1.26 erf, |error| < 1.5e-7; numpy has no erf and scipy isn't a dependency
+    x = np.abs(z) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-x * x)
+    return 0.5 * (1.0 + np.sign(z) * erf)
+
+
+def _lms_value(l: np.ndarray, m: np.ndarray, s: np.ndarray, z: float) -> np.ndarray:
+    """The measurement at z-score ``z``."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        box_cox = m * np.power(1.0 + l * s * z, 1.0 / l)
+    return np.where(np.abs(l) < 1e-9, m * np.exp(s * z), box_cox)
+
+
+@dataclass
+class GrowthResult:
+    z: np.ndarray
+    percentile: np.ndarray
+
+    def flags(self, cutoff: float = 2.0) -> np.ndarray:
+        """-1 below ``-cutoff``, +1 above ``cutoff``, 0 otherwise; NaN z (age off the table) is 0."""
+        return np.where(self.z < -cutoff, -1, np.where(self.z > cutoff, 1, 0)).astype(np.int8)
+
+
+class GrowthReference:
+    """WHO Child Growth Standards LMS tables, resampled to one row per day of age.
+
+    Tables are ``(len(INDICATORS), len(SEXES), days)`` float64 arrays of L,
+    M and S, so looking up thousands of measurements is a fancy-index plus a
+    linear interpolation between neighbouring days. Source rows may be any
+    spacing (the WHO expanded tables are daily; the bundled file has monthly
+    anchors) and are interpolated onto the daily grid at load.
+    """
+
+    def __init__(self, l: np.ndarray, m: np.ndarray, s: np.ndarray):
+        self.l, self.m, self.s = l, m, s
+        self.max_day = l.shape[2] - 1
+
+    @classmethod
+    def load(cls, path: str = BUNDLED_TABLE) -> "GrowthReference":
+        rows: dict[tuple[int, int], list[tuple[float, float, float, float]]] = {}
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                key = (INDICATORS.index(row["indicator"]), SEXES.index(row["sex"]))
+                rows.setdefault(key, []).append(
+                    (float(row["age_days"]), float(row["l"]), float(row["m"]), float(row["s"]))
+                )
+        missing = [(INDICATORS[i], SEXES[j]) for i in range(len(INDICATORS)) for j in range(len(SEXES))
+                   if (i, j) not in rows]
+        if missing:
+            raise ValueError(f"{path} has no rows for {missing}")
+        # Every table covers the range all of them cover
+        days = int(min(max(r[0] for r in points) for points in rows.values()))
+        grid = np.arange(days + 1, dtype=np.float64)
+        shape = (len(INDICATORS), len(SEXES), days + 1)
+        l, m, s = np.empty(shape), np.empty(shape), np.empty(shape)
+        for (i, j), points in rows.items():
+            table = np.array(sorted(points))
+            l[i, j] = np.interp(grid, table[:, 0], table[:, 1])
+            m[i, j] = np.interp(grid, table[:, 0], table[:, 2])
+            s[i, j] = np.interp(grid, table[:, 0], table[:, 3])
+        return cls(l, m, s)
+
+    def lms(self, indicator: str, sex: np.ndarray, age_days: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """L, M, S at each (sex index, fractional age in days); NaN outside the table."""
+        i = INDICATORS.index(indicator)
+        age = np.asarray(age_days, dtype=np.float64)
+        inside = (age >= 0) & (age <= self.max_day)
+        clipped = np.clip(np.nan_to_num(age), 0, self.max_day)
+        lo = np.floor(clipped).astype(np.intp)
+        hi = np.minimum(lo + 1, self.max_day)
+        frac = clipped - lo
+        out = []
+        for table in (self.l[i], self.m[i], self.s[i]):
+            value = table[sex, lo] * (1 - frac) + table[sex, hi] * frac
+            out.append(np.where(inside, value, np.nan))
+        return out[0], out[1], out[2]
+
+    def zscores(self, indicator: str, sex, age_days, values) -> np.ndarray:
+        sex = sex_index(sex)
+        x = np.asarray(values, dtype=np.float64)
+        l, m, s = self.lms(indicator, sex, age_days)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = np.where(np.abs(l) < 1e-9, np.log(x / m) / s, (np.power(x / m, l) - 1.0) / (l * s))
+            if indicator in _RESTRICTED:
+                sd3 = _lms_value(l, m, s, 3.0)
+                sd23 = sd3 - _lms_value(l, m, s, 2.0)
+                z = np.where(z > 3, 3.0 + (x - sd3) / sd23, z)
+                sd3neg = _lms_value(l, m, s, -3.0)
+                sd23neg = _lms_value(l, m, s, -2.0) - sd3neg
+                z = np.where(z < -3, -3.0 + (x - sd3neg) / sd23neg, z)
+        return z
+
+    def assess(self, indicator: str, sex, age_days, values) -> GrowthResult:
+        z = self.zscores(indicator, sex, age_days, values)
+        return GrowthResult(z=z, percentile=100.0 * _normal_cdf(z))
+
+
+def sex_index(sex) -> np.ndarray:
+    """0 for male, 1 for female; accepts the strings or already-encoded integers."""
+    arr = np.asarray(sex)
+    if arr.dtype.kind in "iub":
+        return arr.astype(np.intp)
+    lowered = np.char.lower(arr.astype(str))
+    if not np.isin(lowered, SEXES).all():
+        raise ValueError(f"sex must be one of {SEXES}")
+    return (lowered == "female").astype(np.intp)
+
+
+_reference = None
+
+
+def get_growth_reference() -> GrowthReference:
+    global _reference
+    if _reference is None:
+        _reference = GrowthReference.load(settings.WHO_LMS_PATH or BUNDLED_TABLE)
+    return _reference
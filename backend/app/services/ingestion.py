@@ -1,15 +1,328 @@
-from fastapi import UploadFile
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, Iterator
+
 import pypdf
-import io
+from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.dml import insert_ignore
+from app.models import ReactedDocument
+from app.services.embeddings import content_hash, get_embedder
+from app.services.lexical_index import lexical_index
+from app.services.query_cache import query_cache
+
+_TOKEN_RE = re.compile(r"\S+")
+_SPOOL_CHUNK = 1024 * 1024
+
+# Worker-side reader cache so consecutive page batches of the same file
+# don't re-parse the xref table every time.
+_worker_reader: tuple[str, pypdf.PdfReader] | None = None
+
+
+def _open_reader(path: str) -> pypdf.PdfReader:
+    global _worker_reader
+    if _worker_reader is None or _worker_reader[0] != path:
+        _worker_reader = (path, pypdf.PdfReader(path))
+    return _worker_reader[1]
+
+
+def _count_pages(path: str) -> int:
+    return len(_open_reader(path).pages)
+
+
+def _extract_pages(path: str, start: int, stop: int) -> list[str]:
+    reader = _open_reader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+@dataclass
+class Chunk:
+    text: str
+    page_start: int
+    page_end: int
+    index: int
+    token_count: int
+
+
+@dataclass
+class IngestionReport:
+    filename: str | None
+    pages: int = 0
+    chunks: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    embedding_calls: int = 0
+    seconds: float = 0.0
+    preview: str = ""
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "filename": self.filename,
+            "pages": self.pages,
+            "chunks": self.chunks,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "embedding_calls": self.embedding_calls,
+            "seconds": round(self.seconds, 3),
+            "pages_per_sec": round(self.pages_per_sec, 2),
+            "chunks_per_sec": round(self.chunks_per_sec, 2),
+            "preview": self.preview,
+        }
+
+
+class TokenChunker:
+    """Content-defined token windows fed one page at a time.
+
+    Tokens are whitespace-delimited words, which tracks model tokens closely
+    enough for sizing retrieval chunks without pulling in a tokenizer.
+
+    A chunk ends at the first token pair past ``min_tokens`` whose hash hits
+    the boundary mask, or at ``max_tokens``. Because cut points depend on
+    local content rather than on an absolute offset, an edit early in a
+    document only changes the chunks around it; later chunks re-synchronise
+    and keep the same text (and content hash) as before.
+    """
+
+    def __init__(self, max_tokens: int = 400, overlap: int = 50, min_tokens: int | None = None):
+        if overlap >= max_tokens:
+            raise ValueError("overlap must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+        self.min_tokens = max(overlap + 2, min_tokens or max_tokens // 2)
+        self._divisor = max(1, (self.max_tokens - self.min_tokens) // 2)
+        self._buffer: list[tuple[str, int]] = []
+        self._index = 0
+        self._fresh = 0  # tokens in the buffer not yet emitted in any chunk
+        self._scan = 0  # next cut length to test
+
+    def _is_boundary(self, length: int) -> bool:
+        pair = f"{self._buffer[length - 2][0]} {self._buffer[length - 1][0]}"
+        return zlib.crc32(pair.encode("utf-8")) % self._divisor == 0
+
+    def _find_cut(self) -> int | None:
+        limit = min(len(self._buffer), self.max_tokens)
+        for length in range(max(self._scan, self.min_tokens), limit + 1):
+            if length == self.max_tokens or self._is_boundary(length):
+                return length
+        self._scan = limit + 1
+        return None
+
+    def feed(self, page_no: int, text: str) -> Iterator[Chunk]:
+        tokens = [(m.group(), page_no) for m in _TOKEN_RE.finditer(text)]
+        self._buffer.extend(tokens)
+        self._fresh += len(tokens)
+        while (cut := self._find_cut()) is not None:
+            yield self._emit(self._buffer[:cut])
+            del self._buffer[: cut - self.overlap]
+            self._fresh = len(self._buffer) - self.overlap
+            self._scan = 0
+
+    def finish(self) -> Iterator[Chunk]:
+        if self._fresh > 0:
+            yield self._emit(self._buffer)
+        self._buffer.clear()
+        self._fresh = 0
+        self._scan = 0
+
+    def chunk(self, pages: Iterable[tuple[int, str]]) -> Iterator[Chunk]:
+        for page_no, text in pages:
+            yield from self.feed(page_no, text)
+        yield from self.finish()
+
+    def _emit(self, window: list[tuple[str, int]]) -> Chunk:
+        chunk = Chunk(
+            text=" ".join(token for token, _ in window),
+            page_start=window[0][1],
+            page_end=window[-1][1],
+            index=self._index,
+            token_count=len(window),
+        )
+        self._index += 1
+        return chunk
+
 
 class IngestionService:
+    _pool: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def pool(cls) -> ProcessPoolExecutor:
+        if cls._pool is None:
+            cls._pool = ProcessPoolExecutor(max_workers=settings.INGEST_WORKERS)
+        return cls._pool
+
+    @classmethod
+    def shutdown(cls):
+        if cls._pool is not None:
+            cls._pool.shutdown(wait=False, cancel_futures=True)
+            cls._pool = None
+
+    @staticmethod
+    async def spool_upload(file: UploadFile, directory: str | None = settings.UPLOAD_SPOOL_DIR) -> str:
+        """Copy the upload to a temp file on disk in fixed-size reads."""
+        fd, path = tempfile.mkstemp(suffix=".pdf", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while block := await file.read(_SPOOL_CHUNK):
+                    out.write(block)
+        except BaseException:
+            os.unlink(path)
+            raise
+        return path
+
+    @classmethod
+    async def iter_pages(cls, path: str, progress=None) -> AsyncIterator[tuple[int, str]]:
+        """Yield (page_number, text) in order, extracting batches in the process pool.
+
+        At most ``INGEST_WORKERS * 2`` batches are in flight, so memory is
+        bounded by the batch size rather than the document size.
+        ``progress(pages_done, total)`` is awaited after each batch.
+        """
+        loop = asyncio.get_running_loop()
+        pool = cls.pool()
+        total = await loop.run_in_executor(pool, _count_pages, path)
+        batch = settings.INGEST_PAGE_BATCH
+        in_flight: deque = deque()
+        next_start = 0
+        while next_start < total or in_flight:
+            while next_start < total and len(in_flight) < settings.INGEST_WORKERS * 2:
+                stop = min(next_start + batch, total)
+                in_flight.append((next_start, loop.run_in_executor(pool, _extract_pages, path, next_start, stop)))
+                next_start = stop
+            start, future = in_flight.popleft()
+            texts = await future
+            for offset, text in enumerate(texts):
+                yield start + offset + 1, text
+            if progress is not None:
+                await progress(start + len(texts), total)
+
+    @classmethod
+    async def _store(cls, db: AsyncSession, rows: list[dict], report: IngestionReport) -> list[tuple[int, str]]:
+        """Insert chunk rows whose content hash isn't stored yet, embedding only those.
+
+        Returns (id, content) of the rows actually inserted."""
+        hashes = [row["content_hash"] for row in rows]
+        existing = set((await db.execute(
+            select(ReactedDocument.content_hash).where(ReactedDocument.content_hash.in_(hashes))
+        )).scalars())
+        fresh = []
+        for row in rows:
+            if row["content_hash"] in existing:
+                report.duplicates += 1
+                continue
+            existing.add(row["content_hash"])
+            fresh.append(row)
+        if not fresh:
+            return []
+        vectors = await get_embedder().embed_documents([row["content"] for row in fresh])
+        for row, vector in zip(fresh, vectors):
+            row["embedding"] = vector
+        # A concurrent ingest may have stored the same chunk since the check above
+        stmt = insert_ignore(db, ReactedDocument, ["content_hash"]).returning(ReactedDocument.id, ReactedDocument.content)
+        inserted = (await db.execute(stmt, fresh)).all()
+        report.inserted += len(inserted)
+        report.duplicates += len(fresh) - len(inserted)
+        return inserted
+
+    @classmethod
+    async def _ingest_documents(cls, documents: AsyncIterator[AsyncIterator[tuple[int, str]]], db: AsyncSession,
+                                source: str | None) -> IngestionReport:
+        """Chunk, embed and store each document's pages; chunks never span two documents."""
+        report = IngestionReport(filename=source)
+        embedder = get_embedder()
+        embed_stats = getattr(embedder, "stats", None)
+        calls_before = embed_stats.calls if embed_stats else 0
+        rows: list[dict] = []
+        stored: list[tuple[int, str]] = []
+        started = time.perf_counter()
+
+        async def add(chunks: Iterable[Chunk], document: int):
+            for chunk in chunks:
+                if not report.preview:
+                    report.preview = chunk.text[:100]
+                rows.append(cls._row(chunk, source, document))
+                report.chunks += 1
+                if len(rows) >= settings.INGEST_INSERT_BATCH:
+                    stored.extend(await cls._store(db, rows, report))
+                    rows.clear()
+
+        document = 0
+        async for pages in documents:
+            chunker = TokenChunker(settings.CHUNK_TOKENS, settings.CHUNK_OVERLAP_TOKENS)
+            async for page_no, text in pages:
+                report.pages += 1
+                await add(chunker.feed(page_no, text), document)
+            await add(chunker.finish(), document)
+            document += 1
+        if rows:
+            stored.extend(await cls._store(db, rows, report))
+        await db.commit()
+        if stored:
+            lexical_index.add_many(stored)
+            query_cache.invalidate()
+        if embed_stats:
+            report.embedding_calls = embed_stats.calls - calls_before
+        report.seconds = time.perf_counter() - started
+        return report
+
+    @classmethod
+    async def ingest_pdf(cls, path: str, db: AsyncSession, filename: str | None = None,
+                         progress=None) -> IngestionReport:
+        async def documents():
+            yield cls.iter_pages(path, progress)
+        return await cls._ingest_documents(documents(), db, filename)
+
+    @classmethod
+    async def ingest_texts(cls, texts: Iterable[str], db: AsyncSession, source: str | None = None) -> IngestionReport:
+        """Ingest plain-text documents, each a separate one-page document."""
+        async def page(text: str):
+            yield 1, text
+
+        async def documents():
+            for text in texts:
+                yield page(text)
+        return await cls._ingest_documents(documents(), db, source)
+
+    @classmethod
+    async def process_pdf(cls, file: UploadFile, db: AsyncSession) -> IngestionReport:
+        path = await cls.spool_upload(file)
+        try:
+            return await cls.ingest_pdf(path, db, filename=file.filename)
+        finally:
+            os.unlink(path)
+
     @staticmethod
-    async def process_pdf(file: UploadFile) -> str:
-        content = ""
-        pdf_reader = pypdf.PdfReader(io.BytesIO(await file.read()))
-        for page in pdf_reader.pages:
-            content += page.extract_text() + "\n"
-        return content
+    def _row(chunk: Chunk, source: str | None, document: int = 0) -> dict:
+        return {
+            "content": chunk.text,
+            "content_hash": content_hash(chunk.text),
+            "metadata_json": json.dumps({
+                "source": source,
+                "document": document,
+                "chunk": chunk.index,
+                "page_start": chunk.page_start,
+                "page_end": chunk.page_end,
+                "tokens": chunk.token_count,
+            }),
+        }
 
     @staticmethod
     def process_metric(data: dict):
@@ -0,0 +1,51 @@
+import os
+from collections import Counter
+
+from app.services.ingestion import IngestionService
+from app.services.jobs import JobContext, job_kind
+from app.services.lexicon import screen_chunk
+from app.services.metabolic import MetabolicService
+
+# Importing this module registers the handlers; workers and enqueuers both do.
+
+
+def _discard_upload(payload: dict):
+    if os.path.exists(payload["path"]):
+        os.unlink(payload["path"])
+
+
+@job_kind("ingest_pdf", on_failed=_discard_upload)
+async def ingest_pdf(ctx: JobContext, payload: dict) -> dict:
+    """Ingest a spooled upload; chunks are content-hash deduplicated, so a retry re-stores nothing."""
+    path = payload["path"]
+    done = False
+
+    async def progress(pages: int, total: int):
+        await ctx.progress(pages / total if total else 1.0, f"{pages}/{total} pages")
+
+    try:
+        async with ctx.session_factory() as db:
+            report = await IngestionService.ingest_pdf(path, db, payload.get("filename"), progress=progress)
+        done = True
+        return report.as_dict()
+    finally:
+        # Keep the upload for a retry unless this was the last chance
+        if done or ctx.final_attempt:
+            _discard_upload(payload)
+
+
+@job_kind("rebuild_trends", max_attempts=1)
+async def rebuild_trends(ctx: JobContext, payload: dict) -> dict:
+    async with ctx.session_factory() as db:
+        groups = await MetabolicService.rebuild_trends(db)
+    return {"groups": groups}
+
+
+@job_kind("screen_journals", process=True)
+def screen_journals(payload: dict) -> dict:
+    screenings = screen_chunk(payload["texts"])
+    return {
+        "entries": len(screenings),
+        "levels": dict(Counter(s.level for s in screenings)),
+        "flagged": [i for i, s in enumerate(screenings) if s.level != "stable"],
+    }
@@ -0,0 +1,343 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.telemetry import Histogram
+from app.db.session import SessionLocal
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Seconds, from a quick trend rebuild to a long document
+JOB_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+@dataclass
+class JobKind:
+    name: str
+    fn: Callable
+    process: bool = False  # run the sync ``fn(payload)`` in a worker process instead of awaiting ``fn(ctx, payload)``
+    max_attempts: int = settings.JOB_MAX_ATTEMPTS
+    on_failed: Callable | None = None  # ``fn(payload)`` once the reaper fails a job whose handler never got to clean up
+
+
+JOB_KINDS: dict[str, JobKind] = {}
+
+
+def job_kind(name: str, process: bool = False, max_attempts: int = settings.JOB_MAX_ATTEMPTS,
+             on_failed: Callable | None = None):
+    """Register a job handler under ``name``.
+
+    Async handlers take ``(ctx: JobContext, payload)``; process handlers are
+    plain module-level functions of ``payload`` so they can be pickled. Both
+    return a JSON-serialisable result. Handlers may run more than once (a
+    retry, or a lease that expired under a slow worker), so they must be
+    idempotent.
+    """
+    def register(fn):
+        JOB_KINDS[name] = JobKind(name, fn, process, max_attempts, on_failed)
+        return fn
+    return register
+
+
+_enqueued = asyncio.Event()
+
+
+class JobQueue:
+    @staticmethod
+    async def enqueue(db: AsyncSession, kind: str, payload: dict | None = None, priority: int = 0,
+                      delay: float = 0, owner_id: int | None = None) -> Job:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"unknown job kind {kind!r}")
+        job = Job(
+            kind=kind,
+            owner_id=owner_id,
+            payload=json.dumps(payload or {}),
+            priority=priority,
+            max_attempts=JOB_KINDS[kind].max_attempts,
+            run_after=datetime.utcnow() + timedelta(seconds=delay),
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        _enqueued.set()  # wakes idle workers in this process; others find it on their next poll
+        return job
+
+    @staticmethod
+    async def claim(db: AsyncSession, worker_id: str, kinds: list[str], limit: int = 1) -> list[Job]:
+        """Atomically take up to ``limit`` runnable jobs of ``kinds``.
+
+        On Postgres ``FOR UPDATE SKIP LOCKED`` lets concurrent claimers pass
+        over each other's rows instead of queueing on them; SQLite ignores
+        it, but serialises writers so the single UPDATE is atomic anyway.
+        """
+        now = datetime.utcnow()
+        candidates = (
+            select(Job.id)
+            .where(Job.status == "queued", Job.run_after <= now, Job.kind.in_(kinds))
+            .order_by(Job.priority.desc(), Job.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        rows = await db.execute(
+            update(Job)
+            .where(Job.id.in_(candidates))
+            .values(status="running", locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1,
+                    started_at=now, progress=0.0, message=None)
+            .returning(Job)
+            .execution_options(synchronize_session=False)
+        )
+        jobs = list(rows.scalars())
+        for job in jobs:
+            db.expunge(job)  # keep the claimed values readable after commit
+        await db.commit()
+        return jobs
+
+    @staticmethod
+    async def _owned(db: AsyncSession, job_id: int, worker_id: str, **values) -> bool:
+        """Update the job only while ``worker_id`` still holds its lease."""
+        result = await db.execute(
+            update(Job).where(Job.id == job_id, Job.locked_by == worker_id, Job.status == "running").values(**values)
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    @classmethod
+    async def heartbeat(cls, db: AsyncSession, job_id: int, worker_id: str, **values) -> bool:
+        return await cls._owned(db, job_id, worker_id, locked_at=datetime.utcnow(), **values)
+
+    @classmethod
+    async def complete(cls, db: AsyncSession, job_id: int, worker_id: str, result) -> bool:
+        return await cls._owned(db, job_id, worker_id, status="succeeded", progress=1.0, result=json.dumps(result),
+                                error=None, locked_by=None, finished_at=datetime.utcnow())
+
+    @classmethod
+    async def fail(cls, db: AsyncSession, job: Job, worker_id: str, error: str) -> bool:
+        """Requeue with exponential backoff, or mark failed after the last attempt; True if retried."""
+        if job.attempts < job.max_attempts:
+            backoff = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+            await cls._owned(db, job.id, worker_id, status="queued", error=error, locked_by=None,
+                             run_after=datetime.utcnow() + timedelta(seconds=backoff))
+            return True
+        await cls._owned(db, job.id, worker_id, status="failed", error=error, locked_by=None,
+                         finished_at=datetime.utcnow())
+        return False
+
+    @classmethod
+    async def release(cls, db: AsyncSession, job_id: int, worker_id: str):
+        """Hand a job back untouched (worker shutting down); the attempt isn't counted."""
+        await cls._owned(db, job_id, worker_id, status="queued", locked_by=None, attempts=Job.attempts - 1)
+
+    @staticmethod
+    async def requeue_expired(db: AsyncSession, lease_seconds: float = settings.JOB_LEASE_SECONDS) -> int:
+        """Return jobs whose worker stopped heartbeating to the queue (or fail them if out of attempts)."""
+        cutoff = datetime.utcnow() - timedelta(seconds=lease_seconds)
+        expired = (Job.status == "running", Job.locked_at < cutoff)
+        failed = (await db.execute(
+            update(Job).where(*expired, Job.attempts >= Job.max_attempts)
+            .values(status="failed", error="lease expired", locked_by=None, finished_at=datetime.utcnow())
+            .returning(Job.id, Job.kind, Job.payload)
+            .execution_options(synchronize_session=False)
+        )).all()
+        retried = await db.execute(
+            update(Job).where(*expired).values(status="queued", locked_by=None, error="lease expired")
+        )
+        await db.commit()
+        for job_id, kind, payload in failed:
+            on_failed = JOB_KINDS[kind].on_failed if kind in JOB_KINDS else None
+            if on_failed is not None:
+                try:
+                    on_failed(json.loads(payload))
+                except Exception:
+                    logger.exception("job cleanup failed", extra={"job_id": job_id, "kind": kind})
+        return len(failed) + retried.rowcount
+
+    @staticmethod
+    async def get(db: AsyncSession, job_id: int, owner_id: int | None = None) -> Job | None:
+        """The job, or None if it doesn't exist or ``owner_id`` is given and doesn't own it."""
+        job = await db.get(Job, job_id)
+        if job is None or (owner_id is not None and job.owner_id != owner_id):
+            return None
+        return job
+
+
+class JobContext:
+    """Handed to async handlers for progress reporting and DB access."""
+
+    def __init__(self, job: Job, worker_id: str, session_factory, interval: float = settings.JOB_PROGRESS_INTERVAL):
+        self.job_id = job.id
+        self.attempt = job.attempts
+        self.final_attempt = job.attempts >= job.max_attempts
+        self.worker_id = worker_id
+        self.session_factory = session_factory
+        self.interval = interval
+        self._last = 0.0
+
+    async def progress(self, fraction: float, message: str | None = None, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        async with self.session_factory() as db:
+            await JobQueue.heartbeat(db, self.job_id, self.worker_id, progress=min(max(fraction, 0.0), 1.0),
+                                     message=message)
+
+
+class JobWorkerPool:
+    """Async and process worker slots pulling from the job table.
+
+    Each async slot runs one I/O-bound handler at a time on the event loop;
+    each process slot runs one CPU-bound handler in a ``ProcessPoolExecutor``
+    sized to match. Any number of pools, in any number of processes or
+    hosts, can share the table: claiming is a single SKIP LOCKED update.
+    """
+
+    def __init__(self, session_factory=SessionLocal, async_workers: int = settings.JOB_ASYNC_WORKERS,
+                 process_workers: int = settings.JOB_PROCESS_WORKERS, poll_seconds: float = settings.JOB_POLL_SECONDS,
+                 lease_seconds: float = settings.JOB_LEASE_SECONDS):
+        self.session_factory = session_factory
+        self.async_workers = async_workers
+        self.process_workers = process_workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self._pool: ProcessPoolExecutor | None = None
+        self._tasks: list[asyncio.Task] = []
+        self.running_jobs = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.slot_errors = 0
+        self.duration = Histogram(JOB_BUCKETS)
+
+    def _kinds(self, process: bool) -> list[str]:
+        return [name for name, kind in JOB_KINDS.items() if kind.process == process]
+
+    async def _slot(self, process: bool):
+        kinds = self._kinds(process)
+        failures = 0
+        while True:
+            try:
+                async with self.session_factory() as db:
+                    jobs = await JobQueue.claim(db, self.worker_id, kinds)
+                if jobs:
+                    await self._run(jobs[0])
+                failures = 0
+            except Exception:
+                # A DB blip must not end the slot; an unfinished job is re-run once its lease expires
+                failures += 1
+                self.slot_errors += 1
+                logger.exception("job worker slot error", extra={"consecutive": failures})
+                await asyncio.sleep(min(self.poll_seconds * 2 ** failures, self.lease_seconds / 2))
+                continue
+            if not jobs:
+                _enqueued.clear()
+                try:
+                    await asyncio.wait_for(_enqueued.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _heartbeat(self, job_id: int):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            async with self.session_factory() as db:
+                if not await JobQueue.heartbeat(db, job_id, self.worker_id):
+                    logger.warning("lost lease on job", extra={"job_id": job_id})
+                    return
+
+    async def _run(self, job: Job):
+        kind = JOB_KINDS[job.kind]
+        payload = json.loads(job.payload)
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        started = time.perf_counter()
+        self.running_jobs += 1
+        try:
+            if kind.process:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._process_pool(), kind.fn, payload)
+            else:
+                result = await kind.fn(JobContext(job, self.worker_id, self.session_factory), payload)
+        except asyncio.CancelledError:
+            async with self.session_factory() as db:
+                await JobQueue.release(db, job.id, self.worker_id)
+            raise
+        except Exception as e:
+            logger.exception("job failed", extra={"job_id": job.id, "kind": job.kind, "attempt": job.attempts})
+            async with self.session_factory() as db:
+                if await JobQueue.fail(db, job, self.worker_id, f"{type(e).__name__}: {e}"):
+                    self.retried += 1
+                else:
+                    self.failed += 1
+        else:
+            async with self.session_factory() as db:
+                await JobQueue.complete(db, job.id, self.worker_id, result)
+            self.succeeded += 1
+        finally:
+            heartbeat.cancel()
+            self.running_jobs -= 1
+            self.duration.observe(time.perf_counter() - started)
+
+    async def _reap(self):
+        while True:
+            try:
+                async with self.session_factory() as db:
+                    if requeued := await JobQueue.requeue_expired(db, self.lease_seconds):
+                        logger.warning("requeued jobs with expired leases", extra={"count": requeued})
+            except Exception:
+                logger.exception("job lease check failed")
+            await asyncio.sleep(self.lease_seconds / 2)
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=max(self.process_workers, 1))
+        return self._pool
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._reap()))
+        if self._kinds(process=False):
+            self._tasks += [asyncio.create_task(self._slot(False)) for _ in range(self.async_workers)]
+        if self._kinds(process=True):
+            self._tasks += [asyncio.create_task(self._slot(True)) for _ in range(self.process_workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "async_workers": self.async_workers if self.running else 0,
+            "process_workers": self.process_workers if self.running else 0,
+            "running": self.running_jobs,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "slot_errors": self.slot_errors,
+            "duration_seconds": self.duration.as_dict(),
+        }
+
+
+job_workers = JobWorkerPool()
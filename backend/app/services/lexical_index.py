@@ -0,0 +1,162 @@
+import asyncio
+import math
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models import ReactedDocument
+
+# Keeps clinical shorthand intact: "24-28", "t2dm", "5.5", "hba1c"
+_TERM_RE = re.compile(r"[a-z0-9]+(?:[-./][a-z0-9]+)*")
+_SPLIT_RE = re.compile(r"[-./]")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how i if in is it its my of on or should so that the this "
+    "to was what when which who will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased terms; compound terms like ``24-28`` also yield their parts."""
+    terms = []
+    for term in _TERM_RE.findall(text.lower()):
+        if term in _STOPWORDS:
+            continue
+        terms.append(term)
+        if _SPLIT_RE.search(term):
+            terms.extend(part for part in _SPLIT_RE.split(term) if part)
+    return terms
+
+
+class _Postings:
+    """Growable (document, term frequency) arrays for one term.
+
+    Appends only write past ``size`` and growth allocates new arrays, so a
+    ``[:size]`` slice taken by a reader never changes underneath it.
+    """
+
+    __slots__ = ("docs", "tfs", "size")
+
+    def __init__(self):
+        self.docs = np.empty(4, dtype=np.int32)
+        self.tfs = np.empty(4, dtype=np.float32)
+        self.size = 0
+
+    def append(self, doc: int, tf: int):
+        if self.size == len(self.docs):
+            self.docs = np.concatenate([self.docs, np.empty_like(self.docs)])
+            self.tfs = np.concatenate([self.tfs, np.empty_like(self.tfs)])
+        self.docs[self.size] = doc
+        self.tfs[self.size] = tf
+        self.size += 1
+
+    def view(self) -> tuple[np.ndarray, np.ndarray]:
+        return self.docs[:self.size], self.tfs[:self.size]
+
+
+class BM25Index:
+    """In-memory inverted index over document chunks, scored with Okapi BM25.
+
+    Documents are numbered densely in insertion order; ``doc_ids`` maps that
+    number back to the ``documents`` row id. Adding documents is incremental
+    and safe to interleave with searches running in worker threads.
+    """
+
+    def __init__(self, k1: float = settings.BM25_K1, b: float = settings.BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings: dict[str, _Postings] = {}
+        self.doc_ids = np.empty(1024, dtype=np.int64)
+        self.doc_lens = np.empty(1024, dtype=np.float32)
+        self.count = 0
+        self.total_len = 0
+        self._positions: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, doc_id: int, text: str):
+        terms = tokenize(text or "")
+        with self._lock:
+            if doc_id in self._positions:
+                return
+            if self.count == len(self.doc_ids):
+                self.doc_ids = np.concatenate([self.doc_ids, np.empty_like(self.doc_ids)])
+                self.doc_lens = np.concatenate([self.doc_lens, np.empty_like(self.doc_lens)])
+            doc = self.count
+            for term, tf in Counter(terms).items():
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = _Postings()
+                postings.append(doc, tf)
+            self.doc_ids[doc] = doc_id
+            self.doc_lens[doc] = len(terms)
+            self._positions[doc_id] = doc
+            self.total_len += len(terms)
+            self.count += 1
+
+    def add_many(self, docs):
+        for doc_id, text in docs:
+            self.add(doc_id, text)
+
+    def search(self, query: str, k: int) -> list[tuple[int, float]]:
+        """Top ``k`` (document id, BM25 score) pairs, best first."""
+        with self._lock:
+            n = self.count
+            if not n:
+                return []
+            avgdl = self.total_len / n
+            lists = [self.postings[t].view() for t in set(tokenize(query)) if t in self.postings]
+            doc_ids = self.doc_ids[:n]
+            doc_lens = self.doc_lens[:n]
+        if not lists:
+            return []
+        scores = np.zeros(n, dtype=np.float32)
+        for docs, tfs in lists:
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * doc_lens[docs] / avgdl)
+            # Each document appears at most once per term, so fancy-index += is safe
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(scores[candidates], -k)[-k:]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(doc_ids[c]), float(scores[c])) for c in candidates]
+
+
+lexical_index = BM25Index()
+_load_lock = asyncio.Lock()
+_loaded_through: int | None = None  # highest documents.id read; None before the first load
+
+
+async def load_lexical_index(session_factory, through: int | None = None, batch: int = 2000) -> BM25Index:
+    """Fill ``lexical_index`` from the documents table, then keep it current.
+
+    The first call reads every row; later calls read only rows past the
+    highest id already loaded, and only when ``through`` (the corpus
+    watermark) says there are some, so chunks ingested by a worker process
+    show up here too. Chunks this process ingests are also added directly.
+    """
+    global _loaded_through
+    if _loaded_through is not None and (through is None or through <= _loaded_through):
+        return lexical_index
+    async with _load_lock:
+        if _loaded_through is None or (through is not None and through > _loaded_through):
+            start = _loaded_through or 0
+            high = start
+            async with session_factory() as db:
+                result = await db.stream(
+                    select(ReactedDocument.id, ReactedDocument.content)
+                    .where(ReactedDocument.id > start)
+                    .order_by(ReactedDocument.id)
+                    .execution_options(yield_per=batch)
+                )
+                async for rows in result.partitions(batch):
+                    await asyncio.to_thread(lexical_index.add_many, rows)
+                    high = rows[-1][0]
+            _loaded_through = high
+    return lexical_index
@@ -0,0 +1,210 @@
+import bisect
+import csv
+import os
+import re
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+from app.core.config import settings
+
+BUNDLED_LEXICON = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "mental_lexicon.csv")
+# Words (keeping contractions and hyphenated compounds whole) and the punctuation that ends a clause
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:['\-][a-z0-9]+)*|[.!?;:,]")
+_CLAUSE_BREAKS = frozenset(".!?;:,")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower().replace("’", "'"))
+
+
+class PhraseMatcher:
+    """Token-level Aho-Corasick automaton over multi-word phrases.
+
+    One pass over the tokens finds every occurrence of every phrase; the
+    cost is linear in the text plus the number of matches, independent of
+    how many phrases there are. ``find`` resolves overlaps leftmost-longest,
+    so "no hope" wins over "no" and "so sad" over "so".
+    """
+
+    def __init__(self, phrases: list[tuple[str, ...]]):
+        self.lengths = [len(p) for p in phrases]
+        goto: list[dict[str, int]] = [{}]
+        out: list[list[int]] = [[]]
+        for pid, phrase in enumerate(phrases):
+            state = 0
+            for token in phrase:
+                nxt = goto[state].get(token)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][token] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(pid)
+
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:  # breadth-first, so fail[] of shallower states is final
+            for token, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and token not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(token, 0)
+                out[nxt].extend(out[fail[nxt]])
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(o) for o in out]
+
+    def find(self, tokens: list[str]) -> list[tuple[int, int, int]]:
+        """Non-overlapping (start, end, phrase_id) matches, leftmost-longest."""
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self.lengths
+        hits = []
+        state = 0
+        for pos, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if out[state]:
+                hits.extend((pos + 1 - lengths[pid], pos + 1, pid) for pid in out[state])
+        if len(hits) < 2:
+            return hits
+        hits.sort(key=lambda h: (h[0], h[0] - h[1]))
+        kept, end = [], 0
+        for hit in hits:
+            if hit[0] >= end:
+                kept.append(hit)
+                end = hit[1]
+        return kept
+
+
+class Match(NamedTuple):
+    phrase: str
+    category: str
+    weight: float
+    negated: bool
+
+
+@dataclass
+class Screening:
+    score: float
+    level: str  # "stable", "monitor" or "urgent"
+    categories: dict[str, float] = field(default_factory=dict)
+    matches: list[Match] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "score": round(self.score, 3),
+            "level": self.level,
+            "categories": {k: round(v, 3) for k, v in self.categories.items()},
+            "matches": [m._asdict() for m in self.matches],
+        }
+
+
+class LexiconScreener:
+    """Scores text against a clinical lexicon of risk terms and modifiers.
+
+    Lexicon rows are ``phrase,kind,category,weight`` where kind is ``term``
+    (a risk phrase with its category and weight), ``negation``,
+    ``intensifier`` / ``diminisher`` (the weight multiplies the next term)
+    or ``break`` (a word that ends negation scope like punctuation does).
+    A term is negated when a negation cue ends at most ``negation_window``
+    tokens before it with no break or ``scope_ends`` conjunction in between,
+    and a cue negates only the first term it reaches ("not sad or
+    hopeless" counts hopeless). Modifiers apply within ``modifier_window``
+    tokens. Non-negated ``urgent_categories`` terms make the entry urgent
+    whatever the total score; a cue only negates one within
+    ``urgent_negation_window``, and a negated one still makes it monitor.
+    """
+
+    def __init__(self, rows: list[dict], negation_window: int = settings.NEGATION_WINDOW,
+                 modifier_window: int = 2, monitor_score: float = settings.MENTAL_MONITOR_SCORE,
+                 urgent_categories: frozenset[str] = frozenset({"self_harm"}),
+                 urgent_negation_window: int = settings.URGENT_NEGATION_WINDOW,
+                 scope_ends: frozenset[str] = frozenset({"and", "so", "then"})):
+        self.entries = [
+            (row["phrase"], row["kind"], row.get("category") or "", float(row.get("weight") or 1.0))
+            for row in rows
+        ]
+        # Punctuation ends negation and modifier scope the same way "but" does
+        self.entries += [(mark, "break", "", 1.0) for mark in _CLAUSE_BREAKS]
+        self.matcher = PhraseMatcher([tuple(tokenize(e[0])) for e in self.entries])
+        self.negation_window = negation_window
+        self.modifier_window = modifier_window
+        self.monitor_score = monitor_score
+        self.urgent_categories = urgent_categories
+        self.urgent_negation_window = urgent_negation_window
+        # Checked per token rather than matched as breaks, so "so" stays an intensifier
+        self.scope_ends = scope_ends
+
+    @classmethod
+    def load(cls, path: str = BUNDLED_LEXICON, **kwargs) -> "LexiconScreener":
+        with open(path, newline="") as f:
+            return cls(list(csv.DictReader(f)), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def screen(self, text: str) -> Screening:
+        tokens = tokenize(text)
+        conjunctions = [i for i, token in enumerate(tokens) if token in self.scope_ends]
+        negated_until = -1  # last token index a negation cue still applies to
+        cue_end = 0
+        modifier, modifier_until = 1.0, -1
+        score = 0.0
+        categories: dict[str, float] = {}
+        matches: list[Match] = []
+        urgent = negated_urgent = False
+        for start, end, pid in self.matcher.find(tokens):
+            phrase, kind, category, weight = self.entries[pid]
+            if kind == "negation":
+                cue_end = end
+                negated_until = end - 1 + self.negation_window
+                nxt = bisect.bisect_left(conjunctions, end)
+                if nxt < len(conjunctions):
+                    # A term starting at the conjunction ("not so sad") is still in scope
+                    negated_until = min(negated_until, conjunctions[nxt])
+            elif kind == "break":
+                negated_until = modifier_until = -1
+            elif kind in ("intensifier", "diminisher"):
+                modifier, modifier_until = weight, end - 1 + self.modifier_window
+            else:
+                is_urgent = category in self.urgent_categories
+                negated = start <= negated_until
+                if negated and is_urgent:
+                    negated = start <= cue_end - 1 + self.urgent_negation_window
+                if negated:
+                    negated_until = -1
+                if start <= modifier_until:
+                    weight *= modifier
+                    modifier_until = -1
+                matches.append(Match(phrase, category, weight, negated))
+                if not negated:
+                    score += weight
+                    categories[category] = categories.get(category, 0.0) + weight
+                    urgent = urgent or is_urgent
+                else:
+                    negated_urgent = negated_urgent or is_urgent
+        if urgent:
+            level = "urgent"
+        elif score >= self.monitor_score or negated_urgent:
+            level = "monitor"
+        else:
+            level = "stable"
+        return Screening(score, level, categories, matches)
+
+
+_screener = None
+
+
+def get_screener() -> LexiconScreener:
+    global _screener
+    if _screener is None:
+        _screener = LexiconScreener.load(settings.MENTAL_LEXICON_PATH or BUNDLED_LEXICON)
+    return _screener
+
+
+def screen_chunk(texts: list[str]) -> list[Screening]:
+    """Process-pool entry point; each worker compiles the lexicon once."""
+    screener = get_screener()
+    return [screener.screen(t) for t in texts]
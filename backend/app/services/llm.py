@@ -0,0 +1,63 @@
+import asyncio
+import re
+from typing import AsyncIterator
+
+from app.core.config import settings
+
+_TOKEN_RE = re.compile(r"\S+\s*")
+_CONTEXT_RE = re.compile(r"^Context: (.*?)\nPatient:", re.S | re.M)
+
+
+def _echo_reply(prompt: str) -> str:
+    match = _CONTEXT_RE.search(prompt)
+    context = " ".join(match.group(1).split()) if match else ""
+    return f"Based on your data and clinical guidelines ({context}), we recommend monitoring your glucose levels closely."
+
+
+class FakeLLM:
+    """Deterministic offline stand-in for a chat model.
+
+    The reply depends only on the prompt and is streamed word by word after
+    ``first_token_ms``, with ``token_ms`` between words, so streaming and
+    time-to-first-token can be exercised without network access.
+    """
+
+    def __init__(self, reply=_echo_reply, first_token_ms: float = settings.FAKE_LLM_FIRST_TOKEN_MS,
+                 token_ms: float = settings.FAKE_LLM_TOKEN_MS):
+        self.reply = reply
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.model = "fake"
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        await asyncio.sleep(self.first_token_ms / 1000)
+        for i, match in enumerate(_TOKEN_RE.finditer(self.reply(prompt))):
+            if i:
+                await asyncio.sleep(self.token_ms / 1000)
+            yield match.group()
+
+
+class OpenAILLM:
+    def __init__(self, model: str = settings.LLM_MODEL):
+        from langchain_openai import ChatOpenAI
+
+        self.model = model
+        self._client = ChatOpenAI(model=model, api_key=settings.OPENAI_API_KEY, streaming=True)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        async for chunk in self._client.astream(prompt):
+            if chunk.content:
+                yield chunk.content
+
+
+_llm = None
+
+
+def get_llm():
+    global _llm
+    if _llm is None:
+        if settings.LLM_BACKEND == "openai" and settings.OPENAI_API_KEY:
+            _llm = OpenAILLM()
+        else:
+            _llm = FakeLLM()
+    return _llm
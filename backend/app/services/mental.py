@@ -1,11 +1,48 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core.config import settings
+from app.services.lexicon import Screening, get_screener, screen_chunk
+
+
 class MentalHealthService:
+    _pool: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def pool(cls) -> ProcessPoolExecutor:
+        if cls._pool is None:
+            cls._pool = ProcessPoolExecutor(max_workers=settings.MENTAL_SCREEN_WORKERS)
+        return cls._pool
+
+    @classmethod
+    def shutdown(cls):
+        if cls._pool is not None:
+            cls._pool.shutdown(wait=False, cancel_futures=True)
+            cls._pool = None
+
     @staticmethod
     def analyze_sentiment(text: str) -> str:
-        # Stub for sentiment analysis
-        # In real app: use NLTK or LLM
-        if "sad" in text.lower() or "anxious" in text.lower():
-            return "monitor"
-        return "stable"
+        return get_screener().screen(text).level
+
+    @staticmethod
+    def screen(text: str) -> Screening:
+        return get_screener().screen(text)
+
+    @classmethod
+    async def screen_batch(cls, texts: list[str], chunk: int = settings.MENTAL_SCREEN_CHUNK) -> list[Screening]:
+        """Screen many journal entries, in the process pool when the batch spans several chunks.
+
+        Results are in input order. Batches of one chunk or less run inline:
+        shipping them to a worker costs more than screening them.
+        """
+        if settings.MENTAL_SCREEN_WORKERS <= 0 or len(texts) <= chunk:
+            return screen_chunk(texts)
+        loop = asyncio.get_running_loop()
+        pool = cls.pool()
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(pool, screen_chunk, texts[i:i + chunk]) for i in range(0, len(texts), chunk)
+        ))
+        return [screening for part in parts for screening in part]
 
     @staticmethod
     def get_digital_detox_recommendation(stress_level: int) -> bool:
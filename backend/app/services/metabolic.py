@@ -1,19 +1,222 @@
 from datetime import datetime, timedelta
 from typing import List
-from app.models import Metric
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.dml import insert_ignore
+from app.models import Metric, MetricTrend
+
+_SUMS = ("w", "wt", "wtt", "wy", "wyy", "wty")
+# metric_type -> (low, high, label below low, label above high); types not
+# listed get no trend label rather than another metric's thresholds
+TREND_THRESHOLDS = {
+    "glucose": (70, 140, "Falling Trend - Risk of Hypoglycemia", "Rising Trend - Consult Physician"),  # mg/dL
+}
+_US_PER_HOUR = 3.6e9
+
+
+def _hours(stamps: np.ndarray, origin) -> np.ndarray:
+    return (stamps - np.asarray(origin, dtype="datetime64[us]")).astype(np.float64) / _US_PER_HOUR
+
+
+def _as_datetime(value: np.datetime64) -> datetime:
+    return value.astype("datetime64[us]").item()
+
+
+def _blank(owner_id: int, metric_type: str) -> dict:
+    return {"owner_id": owner_id, "metric_type": metric_type, "count": 0, "mean": 0.0, "m2": 0.0,
+            **{name: 0.0 for name in _SUMS}}
+
+
+def fold(trend: MetricTrend, stamps: np.ndarray, values: np.ndarray,
+         half_life: float = settings.TREND_HALF_LIFE_HOURS) -> MetricTrend:
+    """Merge a batch of readings into ``trend`` in O(1) per reading.
+
+    Order doesn't matter: the decayed sums are always referenced to the
+    newest timestamp seen, and readings older than that just get a smaller
+    weight.
+    """
+    stamps = np.asarray(stamps, dtype="datetime64[us]")
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return trend
+    if not trend.count:
+        trend.t_ref = _as_datetime(stamps.min())
+    t = _hours(stamps, trend.t_ref)
+    newest = int(t.argmax())
+    if trend.last_timestamp is None:
+        reference, scale = float(t[newest]), 0.0
+    else:
+        previous = float(_hours(np.datetime64(trend.last_timestamp, "us"), trend.t_ref))
+        reference = max(previous, float(t[newest]))
+        scale = np.exp2(-(reference - previous) / half_life)
+    if trend.last_timestamp is None or stamps[newest] >= np.datetime64(trend.last_timestamp, "us"):
+        trend.last_timestamp = _as_datetime(stamps[newest])
+        trend.last_value = float(values[newest])
+    w = np.exp2(-(reference - t) / half_life)
+    batch = {"w": w.sum(), "wt": (w * t).sum(), "wtt": (w * t * t).sum(),
+             "wy": (w * values).sum(), "wyy": (w * values * values).sum(), "wty": (w * t * values).sum()}
+    for name in _SUMS:
+        setattr(trend, name, (getattr(trend, name) or 0.0) * scale + float(batch[name]))
+
+    # Chan et al. parallel merge of the lifetime mean/variance
+    n_a, n_b = trend.count or 0, len(values)
+    mean_b = float(values.mean())
+    m2_b = float(((values - mean_b) ** 2).sum())
+    n = n_a + n_b
+    delta = mean_b - (trend.mean or 0.0)
+    trend.mean = (trend.mean or 0.0) + delta * n_b / n
+    trend.m2 = (trend.m2 or 0.0) + m2_b + delta * delta * n_a * n_b / n
+    trend.count = n
+    lo, hi = float(values.min()), float(values.max())
+    trend.min_value = lo if trend.min_value is None else min(trend.min_value, lo)
+    trend.max_value = hi if trend.max_value is None else max(trend.max_value, hi)
+    return trend
+
+
+def summarize(trend: MetricTrend) -> dict:
+    count = trend.count or 0
+    window_mean = window_std = slope = None
+    if trend.w:
+        window_mean = trend.wy / trend.w
+        window_std = float(np.sqrt(max(trend.wyy / trend.w - window_mean ** 2, 0.0)))
+        denom = trend.w * trend.wtt - trend.wt ** 2
+        if denom > 1e-9 * max(trend.w * trend.wtt, 1.0):
+            slope = (trend.w * trend.wty - trend.wt * trend.wy) / denom * 24  # per day
+    return {
+        "metric_type": trend.metric_type,
+        "count": count,
+        "mean": trend.mean if count else None,
+        "std": float(np.sqrt(trend.m2 / (count - 1))) if count > 1 else None,
+        "min": trend.min_value,
+        "max": trend.max_value,
+        "window_mean": window_mean,
+        "window_std": window_std,
+        "slope_per_day": slope,
+        "last_value": trend.last_value,
+        "last_timestamp": trend.last_timestamp,
+        "trend": MetabolicService.classify(trend.metric_type, window_mean),
+    }
+
 
 class MetabolicService:
+    @staticmethod
+    def classify(metric_type: str, avg: float | None) -> str | None:
+        if metric_type not in TREND_THRESHOLDS:
+            return None
+        if avg is None:
+            return "Insufficient data"
+        low, high, below, above = TREND_THRESHOLDS[metric_type]
+        if avg > high:
+            return above
+        elif avg < low:
+            return below
+        return "Stable"
+
     @staticmethod
     def predict_trend(metrics: List[Metric]) -> str:
-        # Simple moving average or linear regression stub
         if not metrics:
             return "Insufficient data"
-        
         values = [m.value for m in metrics]
-        avg = sum(values) / len(values)
-        
-        if avg > 140: # Hyperglycemia threshold example
-            return "Rising Trend - Consult Physician"
-        elif avg < 70:
-            return "Falling Trend - Risk of Hypoglycemia"
-        return "Stable"
+        return MetabolicService.classify(metrics[0].metric_type, sum(values) / len(values))
+
+    @staticmethod
+    async def record(db: AsyncSession, owner_id: int, metric_type: str, stamps, values) -> MetricTrend:
+        """Fold new readings into the stored state; the caller commits."""
+        # Create the row first so FOR UPDATE always has something to lock;
+        # concurrent first writes then queue on it instead of both inserting
+        await db.execute(insert_ignore(db, MetricTrend, ["owner_id", "metric_type"]).values(_blank(owner_id, metric_type)))
+        trend = (await db.execute(
+            select(MetricTrend)
+            .filter(MetricTrend.owner_id == owner_id, MetricTrend.metric_type == metric_type)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )).scalars().one()
+        return fold(trend, stamps, values)
+
+    @staticmethod
+    async def get_trend(db: AsyncSession, owner_id: int, metric_type: str) -> dict | None:
+        trend = await db.get(MetricTrend, (owner_id, metric_type))
+        return summarize(trend) if trend is not None else None
+
+    @staticmethod
+    async def rebuild_trends(db: AsyncSession, partition: int = 100_000,
+                             half_life: float = settings.TREND_HALF_LIFE_HOURS) -> int:
+        """Recompute every user's trend state from the raw metrics table.
+
+        Rows stream ordered by (owner, type, timestamp), so each group is
+        contiguous and its statistics come from ``np.add.reduceat`` over the
+        partition. The trailing group of a partition is carried into the next
+        one so no group is split.
+        """
+        await db.execute(delete(MetricTrend))
+        result = await db.stream(
+            select(Metric.owner_id, Metric.metric_type, Metric.timestamp, Metric.value)
+            .order_by(Metric.owner_id, Metric.metric_type, Metric.timestamp)
+            .execution_options(yield_per=partition)
+        )
+        carry: list = []
+        groups = 0
+
+        async def flush(rows: list, final: bool) -> list:
+            nonlocal groups
+            if not rows:
+                return []
+            owners = np.array([r[0] for r in rows], dtype=np.int64)
+            types = np.array([r[1] for r in rows], dtype=object)
+            starts = np.concatenate(([0], np.flatnonzero((owners[1:] != owners[:-1]) | (types[1:] != types[:-1])) + 1))
+            held = []
+            if not final:
+                if len(starts) == 1:
+                    return rows  # still one group; keep accumulating
+                held = rows[starts[-1]:]
+                rows = rows[:starts[-1]]
+                owners, types, starts = owners[:len(rows)], types[:len(rows)], starts[:-1]
+            stamps = np.array([r[2] for r in rows], dtype="datetime64[us]")
+            values = np.array([r[3] for r in rows], dtype=np.float64)
+            ends = np.concatenate((starts[1:], [len(rows)]))
+            sizes = ends - starts
+            group_of = np.repeat(np.arange(len(starts)), sizes)
+            t = _hours(stamps, stamps[starts][group_of])
+            reference = t[ends - 1][group_of]
+            w = np.exp2(-(reference - t) / half_life)
+            sums = {
+                "w": np.add.reduceat(w, starts),
+                "wt": np.add.reduceat(w * t, starts),
+                "wtt": np.add.reduceat(w * t * t, starts),
+                "wy": np.add.reduceat(w * values, starts),
+                "wyy": np.add.reduceat(w * values * values, starts),
+                "wty": np.add.reduceat(w * t * values, starts),
+            }
+            means = np.add.reduceat(values, starts) / sizes
+            m2 = np.add.reduceat((values - means[group_of]) ** 2, starts)
+            lows = np.minimum.reduceat(values, starts)
+            highs = np.maximum.reduceat(values, starts)
+            states = [
+                {
+                    "owner_id": int(owners[s]),
+                    "metric_type": types[s],
+                    "count": int(sizes[g]),
+                    "mean": float(means[g]),
+                    "m2": float(m2[g]),
+                    "min_value": float(lows[g]),
+                    "max_value": float(highs[g]),
+                    "last_value": float(values[ends[g] - 1]),
+                    "last_timestamp": _as_datetime(stamps[ends[g] - 1]),
+                    "t_ref": _as_datetime(stamps[s]),
+                    **{name: float(sums[name][g]) for name in _SUMS},
+                }
+                for g, s in enumerate(starts)
+            ]
+            await db.execute(insert(MetricTrend), states)
+            groups += len(states)
+            return held
+
+        async for part in result.partitions(partition):
+            carry = await flush(carry + list(part), final=False)
+        await flush(carry, final=True)
+        await db.commit()
+        return groups
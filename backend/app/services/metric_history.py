@@ -0,0 +1,104 @@
+import base64
+import json
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import Integer, cast, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Metric
+from app.services.downsampling import lttb
+
+
+def _window(owner_id: int, metric_type: str, since: datetime):
+    return (
+        Metric.owner_id == owner_id,
+        Metric.metric_type == metric_type,
+        Metric.timestamp >= since,
+    )
+
+
+def bucket_seconds(since: datetime, until: datetime, max_points: int) -> int:
+    return max(1, math.ceil((until - since).total_seconds() / max_points))
+
+
+async def bucketed_series(db: AsyncSession, owner_id: int, metric_type: str, since: datetime,
+                          max_points: int, until: datetime | None = None) -> list[dict]:
+    """min/max/mean/count per fixed-width time bucket, aggregated in SQL."""
+    until = until or datetime.utcnow()
+    width = bucket_seconds(since, until, max_points)
+    since_epoch = int((since - datetime(1970, 1, 1)).total_seconds())
+    epoch = func.extract("epoch", Metric.timestamp)
+    if db.bind.dialect.name == "postgresql":
+        # Postgres's epoch is fractional and the cast rounds; SQLite's
+        # strftime('%s') is already whole seconds (and floor() is optional there)
+        epoch = func.floor(epoch)
+    # Integer operands make "//" plain integer division on both Postgres and SQLite
+    bucket = ((cast(epoch, Integer) - since_epoch) // width).label("bucket")
+    rows = await db.execute(
+        select(
+            bucket,
+            func.min(Metric.value),
+            func.max(Metric.value),
+            func.avg(Metric.value),
+            func.count(),
+        )
+        .filter(*_window(owner_id, metric_type, since))
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+    return [
+        {
+            "start": since + timedelta(seconds=int(b) * width),
+            "min": lo,
+            "max": hi,
+            "mean": float(mean),
+            "count": count,
+        }
+        for b, lo, hi, mean, count in rows
+    ]
+
+
+async def lttb_series(db: AsyncSession, owner_id: int, metric_type: str, since: datetime,
+                      max_points: int) -> list[dict]:
+    """Shape-preserving downsample of the raw series to ``max_points`` points."""
+    rows = (await db.execute(
+        select(Metric.timestamp, Metric.value)
+        .filter(*_window(owner_id, metric_type, since))
+        .order_by(Metric.timestamp.asc())
+    )).all()
+    if not rows:
+        return []
+    stamps = np.array([r[0] for r in rows], dtype="datetime64[us]")
+    values = np.array([r[1] for r in rows], dtype=np.float64)
+    keep = lttb(stamps.astype(np.int64), values, max_points)
+    return [{"timestamp": stamps[i].item(), "value": float(values[i])} for i in keep]
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    timestamp, row_id = json.loads(raw)
+    return datetime.fromisoformat(timestamp), int(row_id)
+
+
+async def raw_page(db: AsyncSession, owner_id: int, metric_type: str, since: datetime,
+                   limit: int, cursor: str | None = None) -> tuple[list, str | None]:
+    """One page of raw rows ordered by (timestamp, id), continuing after ``cursor``."""
+    query = select(Metric.id, Metric.metric_type, Metric.value, Metric.unit, Metric.timestamp).filter(
+        *_window(owner_id, metric_type, since)
+    )
+    if cursor:
+        after = decode_cursor(cursor)
+        query = query.filter(tuple_(Metric.timestamp, Metric.id) > tuple_(*after))
+    rows = (await db.execute(query.order_by(Metric.timestamp.asc(), Metric.id.asc()).limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return rows, next_cursor
@@ -0,0 +1,196 @@
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterable
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.dml import insert_ignore
+from app.models import Metric
+from app.services.metabolic import MetabolicService
+
+# Plausible physical ranges; readings outside them are device or entry errors.
+METRIC_RANGES = {
+    "glucose": (20.0, 600.0),  # mg/dL
+    "weight": (20.0, 300.0),  # kg
+    "bp": (30.0, 300.0),  # mmHg
+    "heart_rate": (20.0, 250.0),  # bpm
+    "steps": (0.0, 100_000.0),
+    "sleep_hours": (0.0, 24.0),
+}
+_TYPE_RE = re.compile(r"^[a-z_]{1,32}$")
+_FUTURE_SLACK = timedelta(minutes=5)
+
+
+def _parse_timestamp(value) -> np.datetime64:
+    if not isinstance(value, str):
+        return np.datetime64("NaT")
+    try:
+        ts = datetime.fromisoformat(value)
+    except ValueError:
+        return np.datetime64("NaT")
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(ts, "us")
+
+
+def _as_float(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+@dataclass
+class BatchResult:
+    received: int = 0
+    accepted: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    reasons: dict[str, int] = field(default_factory=dict)
+
+    def merge(self, other: "BatchResult"):
+        self.received += other.received
+        self.accepted += other.accepted
+        self.duplicates += other.duplicates
+        self.rejected += other.rejected
+        for reason, n in other.reasons.items():
+            self.reasons[reason] = self.reasons.get(reason, 0) + n
+
+    def as_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "reasons": self.reasons,
+        }
+
+
+class MetricIngestionService:
+    @staticmethod
+    def validate(readings: list, now: datetime | None = None) -> tuple[list[dict], BatchResult]:
+        """Column-wise validation of a batch of raw reading dicts.
+
+        Returns the rows to insert (deduplicated on metric_type + timestamp
+        within the batch) and the per-reason reject counts.
+        """
+        result = BatchResult(received=len(readings))
+        if not readings:
+            return [], result
+        dicts = [r if isinstance(r, dict) else {} for r in readings]
+        types = np.array([d.get("metric_type") if isinstance(d.get("metric_type"), str) else "" for d in dicts], dtype=object)
+        units = np.array([d.get("unit") if isinstance(d.get("unit"), str) else "" for d in dicts], dtype=object)
+        values = np.array([_as_float(d.get("value")) for d in dicts], dtype=np.float64)
+        stamps = np.array([_parse_timestamp(d.get("timestamp")) for d in dicts], dtype="datetime64[us]")
+
+        lo = np.full(len(dicts), -np.inf)
+        hi = np.full(len(dicts), np.inf)
+        for metric_type, (low, high) in METRIC_RANGES.items():
+            is_type = types == metric_type
+            lo[is_type] = low
+            hi[is_type] = high
+        now = np.datetime64(now or datetime.utcnow(), "us")
+        oldest = now - np.timedelta64(settings.METRIC_MAX_AGE_DAYS, "D")
+
+        checks = [
+            ("malformed", np.array([isinstance(r, dict) for r in readings])),
+            ("bad_type", np.array([bool(_TYPE_RE.match(t)) for t in types])),
+            ("bad_value", np.isfinite(values)),
+            ("out_of_range", (values >= lo) & (values <= hi)),
+            ("bad_timestamp", ~np.isnat(stamps)),
+            ("future_timestamp", stamps <= now + np.timedelta64(_FUTURE_SLACK)),
+            ("too_old", stamps >= oldest),
+        ]
+        ok = np.ones(len(dicts), dtype=bool)
+        for reason, passed in checks:
+            failed = ok & ~passed
+            if failed.any():
+                result.reasons[reason] = int(failed.sum())
+            ok &= passed
+
+        idx = np.flatnonzero(ok)
+        # Keep the first reading for each (type, timestamp) pair in the batch
+        keys = np.array([f"{types[i]}|{stamps[i]}" for i in idx], dtype=object)
+        _, first = np.unique(keys, return_index=True) if len(keys) else (None, np.empty(0, dtype=np.int64))
+        keep = np.sort(idx[first])
+        dup_in_batch = len(idx) - len(keep)
+        result.rejected = len(dicts) - len(idx)
+        result.duplicates = dup_in_batch
+        rows = [
+            {"metric_type": types[i], "value": float(values[i]), "unit": units[i], "timestamp": stamps[i].item()}
+            for i in keep
+        ]
+        return rows, result
+
+    @classmethod
+    async def write_batch(cls, db: AsyncSession, owner_id: int, readings: list) -> BatchResult:
+        rows, result = cls.validate(readings)
+        if rows:
+            for row in rows:
+                row["owner_id"] = owner_id
+            stmt = insert_ignore(db, Metric, ["owner_id", "metric_type", "timestamp"]).returning(
+                Metric.metric_type, Metric.timestamp, Metric.value
+            )
+            inserted = (await db.execute(stmt, rows)).all()
+            result.accepted = len(inserted)
+            result.duplicates += len(rows) - len(inserted)
+            # Only readings that were actually stored feed the trend state
+            by_type: dict[str, tuple[list, list]] = {}
+            for metric_type, timestamp, value in inserted:
+                stamps, values = by_type.setdefault(metric_type, ([], []))
+                stamps.append(timestamp)
+                values.append(value)
+            for metric_type, (stamps, values) in by_type.items():
+                await MetabolicService.record(db, owner_id, metric_type, stamps, values)
+            await db.commit()
+        return result
+
+    @classmethod
+    async def write_stream(cls, db: AsyncSession, owner_id: int, readings: AsyncIterator[list]) -> tuple[list[BatchResult], BatchResult]:
+        batches, total = [], BatchResult()
+        async for batch in readings:
+            result = await cls.write_batch(db, owner_id, batch)
+            batches.append(result)
+            total.merge(result)
+        return batches, total
+
+
+async def batched(items: Iterable, size: int = settings.METRIC_BATCH_SIZE) -> AsyncIterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def ndjson_batches(chunks: AsyncIterator[bytes], size: int = settings.METRIC_BATCH_SIZE) -> AsyncIterator[list]:
+    """Parse newline-delimited JSON from a byte stream into lists of ``size``
+    readings, holding at most one batch plus one partial line in memory.
+    Unparseable lines are passed through as ``None`` so they count as rejects."""
+    batch, tail = [], b""
+    async for chunk in chunks:
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                batch.append(json.loads(line))
+            except ValueError:
+                batch.append(None)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if tail.strip():
+        try:
+            batch.append(json.loads(tail))
+        except ValueError:
+            batch.append(None)
+    if batch:
+        yield batch
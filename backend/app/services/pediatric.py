@@ -1,10 +1,41 @@
+import numpy as np
+
+from app.core.config import settings
+from app.services.growth import SEXES, get_growth_reference
+
+DAYS_PER_MONTH = 30.4375
+_SEX_ALIASES = {"m": "male", "boy": "male", "f": "female", "girl": "female"}
+
+
+def normalise_sex(value: str) -> str:
+    """``'male'`` or ``'female'`` from any case/spacing or m/f, boy/girl; ValueError otherwise."""
+    sex = value.strip().lower()
+    sex = _SEX_ALIASES.get(sex, sex)
+    if sex not in SEXES:
+        raise ValueError(f"sex must be one of {SEXES}")
+    return sex
+
+
 class PediatricService:
     @staticmethod
-    def check_growth(age_months: int, weight_kg: float, gender: str) -> str:
-        # Simplified WHO standards check
-        # Example for 6 months
-        if age_months == 6:
-            min_weight = 6.4 if gender == 'male' else 5.8
-            if weight_kg < min_weight:
-                return "Below expected range"
+    def check_growth(age_months: float, weight_kg: float, gender: str) -> str:
+        # WHO tables are indexed by whole days, so 12 months lands on the last row
+        age_days = round(age_months * DAYS_PER_MONTH)
+        z = get_growth_reference().zscores("weight", [normalise_sex(gender)], [age_days], [weight_kg])[0]
+        if np.isnan(z):
+            return "Outside reference range"
+        if z < -settings.GROWTH_Z_CUTOFF:
+            return "Below expected range"
+        if z > settings.GROWTH_Z_CUTOFF:
+            return "Above expected range"
         return "Normal growth"
+
+    @staticmethod
+    def screen(indicator: str, sex, age_days, values, cutoff: float = settings.GROWTH_Z_CUTOFF) -> dict[str, np.ndarray]:
+        """Z-scores, percentiles and -1/0/+1 flags for a whole cohort in one vectorised pass.
+
+        ``sex``, ``age_days`` and ``values`` are equal-length arrays; ages
+        outside the reference table get NaN z-scores and are never flagged.
+        """
+        result = get_growth_reference().assess(indicator, sex, age_days, values)
+        return {"z": result.z, "percentile": result.percentile, "flag": result.flags(cutoff)}
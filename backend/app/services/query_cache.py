@@ -0,0 +1,145 @@
+import re
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalise_query(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+class SimilarityCache:
+    """Fixed-capacity cache of (embedding, answer) pairs matched by cosine similarity.
+
+    Embeddings live in one preallocated matrix so a lookup is a single
+    mat-vec product; when full, the least recently used slot is overwritten.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, threshold: float, dim: int = settings.EMBEDDING_DIM, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.clock = clock
+        self._vectors = np.zeros((maxsize, dim), dtype=np.float32)
+        self._expires = np.full(maxsize, -np.inf)
+        self._last_used = np.full(maxsize, -np.inf)
+        self._answers: list = [None] * maxsize
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires > self.clock()))
+
+    @staticmethod
+    def _unit(vector: np.ndarray) -> np.ndarray:
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, vector: np.ndarray):
+        now = self.clock()
+        sims = self._vectors @ self._unit(np.asarray(vector, dtype=np.float32))
+        sims[self._expires <= now] = -np.inf
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            self.misses += 1
+            return None
+        self._last_used[best] = now
+        self.hits += 1
+        return self._answers[best]
+
+    def set(self, vector: np.ndarray, answer):
+        now = self.clock()
+        free = np.flatnonzero(self._expires <= now)
+        if len(free):
+            slot = int(free[0])
+        else:
+            slot = int(np.argmin(self._last_used))
+            self.evictions += 1
+        self._vectors[slot] = self._unit(np.asarray(vector, dtype=np.float32))
+        self._expires[slot] = now + self.ttl
+        self._last_used[slot] = now
+        self._answers[slot] = answer
+
+    def clear(self):
+        self._expires[:] = -np.inf
+        self._last_used[:] = -np.inf
+        self._answers = [None] * self.maxsize
+
+
+@dataclass
+class QueryCacheStats:
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    hit_seconds: float = 0.0
+    miss_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        total = self.exact_hits + self.semantic_hits + self.misses
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+            "avg_hit_ms": round(self.hit_seconds / hits * 1000, 3) if hits else 0.0,
+            "avg_miss_ms": round(self.miss_seconds / self.misses * 1000, 3) if self.misses else 0.0,
+        }
+
+
+class QueryCache:
+    """Two-level answer cache: exact match on the normalised query, then
+    nearest previous query embedding within a cosine threshold."""
+
+    def __init__(self, maxsize: int = settings.QUERY_CACHE_SIZE, ttl: float = settings.QUERY_CACHE_TTL_SECONDS,
+                 semantic_maxsize: int = settings.SEMANTIC_CACHE_SIZE,
+                 threshold: float = settings.SEMANTIC_CACHE_THRESHOLD, clock=time.monotonic):
+        self.exact = TTLCache(maxsize, ttl, clock=clock)
+        self.similar = SimilarityCache(semantic_maxsize, ttl, threshold, clock=clock)
+        self.stats = QueryCacheStats()
+        self.corpus_version: int | None = None
+
+    def sync(self, corpus_version: int):
+        """Invalidate when the documents table has grown since the last call,
+        wherever the ingestion ran."""
+        if self.corpus_version is not None and corpus_version > self.corpus_version:
+            self.invalidate()
+        self.corpus_version = corpus_version
+
+    def get_exact(self, key: str):
+        return self.exact.get(key)
+
+    def get_similar(self, vector: np.ndarray):
+        return self.similar.get(vector)
+
+    def set(self, key: str, vector: np.ndarray | None, answer):
+        self.exact.set(key, answer)
+        if vector is not None:
+            self.similar.set(vector, answer)
+
+    def record(self, level: str | None, seconds: float):
+        if level == "exact":
+            self.stats.exact_hits += 1
+        elif level == "semantic":
+            self.stats.semantic_hits += 1
+        else:
+            self.stats.misses += 1
+            self.stats.miss_seconds += seconds
+            return
+        self.stats.hit_seconds += seconds
+
+    def invalidate(self):
+        """Drop every cached answer, e.g. after new guideline documents are ingested."""
+        self.exact.clear()
+        self.similar.clear()
+        self.stats.invalidations += 1
+
+
+query_cache = QueryCache()
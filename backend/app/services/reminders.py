@@ -0,0 +1,208 @@
+import asyncio
+import heapq
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.telemetry import Histogram
+from app.db.session import SessionLocal
+from app.models import TeleSession
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class UpcomingSession:
+    id: int
+    owner_id: int
+    title: str
+    scheduled_at: datetime  # naive UTC, like the column
+    notes: str | None = None
+    created_at: datetime | None = None
+
+    @property
+    def epoch(self) -> float:
+        return self.scheduled_at.replace(tzinfo=timezone.utc).timestamp()
+
+    @classmethod
+    def from_row(cls, row) -> "UpcomingSession":
+        return cls(id=row.id, owner_id=row.owner_id, title=row.title, scheduled_at=row.scheduled_at,
+                   notes=row.notes, created_at=row.created_at)
+
+
+class ReminderScheduler:
+    """Fires session reminders from a min-heap instead of clients polling.
+
+    Sessions scheduled within ``horizon_hours`` are held in memory; the
+    horizon is reloaded every ``refresh_seconds`` (one indexed range query
+    per worker, however many clients are connected) and ``create_session``
+    adds new rows immediately. Each session gets one heap entry per lead
+    time still in the future. Due reminders are pushed to the owner's
+    subscriber queues, and how late each one fired is recorded in ``lag``.
+    """
+
+    def __init__(self, session_factory, leads_minutes: list[float] = settings.REMINDER_LEADS_MINUTES,
+                 horizon_hours: float = settings.REMINDER_HORIZON_HOURS,
+                 refresh_seconds: float = settings.REMINDER_REFRESH_SECONDS,
+                 queue_size: int = settings.REMINDER_QUEUE_SIZE, clock=time.time):
+        self.session_factory = session_factory
+        self.leads = sorted(leads_minutes, reverse=True)
+        self.horizon = horizon_hours * 3600
+        self.refresh_seconds = refresh_seconds
+        self.queue_size = queue_size
+        self.clock = clock
+        self.sessions: dict[int, UpcomingSession] = {}
+        self._by_owner: dict[int, set[int]] = {}
+        self._heap: list[tuple[float, int, float]] = []  # (fire_at, session_id, lead_minutes)
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self.lag = Histogram()
+        self.delivered = 0
+        self.unheard = 0  # fired while the owner had no open stream
+        self.dropped = 0  # subscriber queue full
+        self.loads = 0
+
+    # -- schedule ---------------------------------------------------------
+
+    def add(self, session: UpcomingSession):
+        now = self.clock()
+        start = session.epoch
+        if session.id in self.sessions or start <= now or start > now + self.horizon:
+            return
+        self.sessions[session.id] = session
+        self._by_owner.setdefault(session.owner_id, set()).add(session.id)
+        earliest = None
+        for lead in self.leads:
+            fire_at = start - lead * 60
+            if fire_at >= now:
+                heapq.heappush(self._heap, (fire_at, session.id, lead))
+                earliest = fire_at if earliest is None else min(earliest, fire_at)
+        if earliest is not None and self._wake is not None and self._heap[0][0] == earliest:
+            self._wake.set()
+
+    def _forget(self, session_id: int):
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            owned = self._by_owner.get(session.owner_id)
+            if owned is not None:
+                owned.discard(session_id)
+                if not owned:
+                    del self._by_owner[session.owner_id]
+
+    async def refresh(self):
+        now = self.clock()
+        for session_id in [s.id for s in self.sessions.values() if s.epoch <= now]:
+            self._forget(session_id)
+        start = datetime.utcfromtimestamp(now)
+        async with self.session_factory() as db:
+            rows = await db.execute(
+                select(TeleSession.id, TeleSession.owner_id, TeleSession.title, TeleSession.scheduled_at,
+                       TeleSession.notes, TeleSession.created_at)
+                .where(TeleSession.scheduled_at > start, TeleSession.scheduled_at <= start + timedelta(seconds=self.horizon))
+            )
+            for row in rows:
+                self.add(UpcomingSession.from_row(row))
+        self.loads += 1
+
+    def upcoming(self, owner_id: int, within_hours: float = 24) -> list[UpcomingSession]:
+        """The owner's sessions in the next ``within_hours``, from memory."""
+        now = self.clock()
+        end = now + within_hours * 3600
+        sessions = [self.sessions[i] for i in self._by_owner.get(owner_id, ())]
+        return sorted((s for s in sessions if now < s.epoch <= end), key=lambda s: s.scheduled_at)
+
+    # -- delivery ---------------------------------------------------------
+
+    def subscribe(self, owner_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(owner_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, owner_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(owner_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[owner_id]
+
+    def _deliver(self, fire_at: float, session_id: int, lead: float, now: float):
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        lag = max(0.0, now - fire_at)
+        self.lag.observe(lag)
+        reminder = {
+            "session_id": session.id,
+            "title": session.title,
+            "scheduled_at": session.scheduled_at.isoformat(),
+            "lead_minutes": lead,
+            "lag_ms": round(lag * 1000, 3),
+        }
+        queues = self._subscribers.get(session.owner_id)
+        if not queues:
+            self.unheard += 1
+            return
+        for queue in queues:
+            try:
+                queue.put_nowait(reminder)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    async def _run(self):
+        next_refresh = 0.0
+        while True:
+            now = self.clock()
+            if now >= next_refresh:
+                try:
+                    await self.refresh()
+                except Exception:
+                    logger.exception("reminder horizon refresh failed")
+                next_refresh = self.clock() + self.refresh_seconds
+            now = self.clock()
+            while self._heap and self._heap[0][0] <= now:
+                self._deliver(*heapq.heappop(self._heap), now)
+            wake_at = min(next_refresh, self._heap[0][0]) if self._heap else next_refresh
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, wake_at - self.clock()))
+            except asyncio.TimeoutError:
+                pass
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self.sessions),
+            "pending": len(self._heap),
+            "subscribers": sum(len(q) for q in self._subscribers.values()),
+            "delivered": self.delivered,
+            "unheard": self.unheard,
+            "dropped": self.dropped,
+            "loads": self.loads,
+            "lag_seconds": self.lag.as_dict(),
+        }
+
+
+reminder_scheduler = ReminderScheduler(SessionLocal)
@@ -1,10 +1,106 @@
+import asyncio
+
+import numpy as np
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.corpus import corpus_watermark
+from app.services.embeddings import get_embedder
+from app.services.lexical_index import load_lexical_index
+from app.services.vector_index import LocalBackend, PgVectorBackend, SearchHit, recall_at_k
+
+
+def get_backend(name: str = settings.RETRIEVAL_BACKEND):
+    if name == "pgvector":
+        return PgVectorBackend(SessionLocal)
+    if name == "local":
+        return LocalBackend(settings.LOCAL_INDEX_DIR)
+    raise ValueError(f"unknown retrieval backend: {name}")
+
+
+def reciprocal_rank_fusion(rankings: list[list[int]], k: int = settings.RRF_K) -> list[tuple[int, float]]:
+    """Merge ranked id lists; each list contributes 1 / (k + rank) per id."""
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
 class RetrievalService:
-    async def search_clinical_guidelines(self, query: str, top_k: int = 3):
-        # Stub for vector search integration
-        # Real implementation would use:
-        # embedding = await embeddings.aembed_query(query)
-        # result = await session.execute(select(ReactedDocument).order_by(ReactedDocument.embedding.l2_distance(embedding)).limit(top_k))
+    def __init__(self, backend=None, embedder=None, lexical=None, hybrid: bool = settings.HYBRID_RETRIEVAL):
+        self._backend = backend
+        self._lexical = lexical
+        self.embedder = embedder or get_embedder()
+        self.hybrid = hybrid
+
+    @property
+    def backend(self):
+        # Resolved lazily so constructing the service never touches the DB or disk
+        if self._backend is None:
+            self._backend = get_backend()
+        return self._backend
+
+    @staticmethod
+    def _format(hits: list[SearchHit]) -> list[dict]:
+        return [
+            {"id": h.id, "content": h.content, "distance": h.distance, "score": 1.0 / (1.0 + h.distance)}
+            for h in hits
+        ]
+
+    async def _embed(self, queries: list[str]) -> np.ndarray:
+        return await self.embedder.embed_documents(queries)
+
+    async def search_vectors(self, vectors: np.ndarray, top_k: int = 3) -> list[list[dict]]:
+        hits = await self.backend.search(vectors, top_k)
+        return [self._format(h) for h in hits]
+
+    async def search_batch(self, queries: list[str], top_k: int = 3) -> list[list[dict]]:
+        return await self.search_vectors(await self._embed(queries), top_k)
+
+    async def lexical_search(self, query: str, top_k: int = 3) -> list[tuple[int, float]]:
+        lexical = self._lexical
+        if lexical is None:
+            lexical = await load_lexical_index(SessionLocal, await corpus_watermark.current(SessionLocal))
+        return await asyncio.to_thread(lexical.search, query, top_k)
+
+    async def search_hybrid(self, query: str, query_vector: np.ndarray | None = None, top_k: int = 3) -> list[dict]:
+        """BM25 and vector search run concurrently, merged by reciprocal rank fusion.
+
+        Exact clinical terms ("GDM", "24-28 weeks", drug names) that an
+        embedding blurs still surface through the lexical ranking.
+        """
+        candidates = max(top_k, settings.HYBRID_CANDIDATES)
+        lexical = asyncio.create_task(self.lexical_search(query, candidates))
+        try:
+            if query_vector is None:
+                query_vector = (await self._embed([query]))[0]
+            dense = (await self.backend.search(query_vector[None, :], candidates))[0]
+            sparse = await lexical
+        finally:
+            lexical.cancel()
+        fused = reciprocal_rank_fusion([[h.id for h in dense], [doc_id for doc_id, _ in sparse]])[:top_k]
+        by_id = {h.id: h for h in dense}
+        missing = [doc_id for doc_id, _ in fused if doc_id not in by_id]
+        contents = await self.backend.contents(missing) if missing else {}
         return [
-            {"content": "WHO Guideline: Exclusive breastfeeding for 6 months.", "score": 0.95},
-            {"content": "GDM Screening: 24-28 weeks gestation.", "score": 0.88}
+            {
+                "id": doc_id,
+                "content": by_id[doc_id].content if doc_id in by_id else contents.get(doc_id, ""),
+                "distance": by_id[doc_id].distance if doc_id in by_id else None,
+                "score": score,
+            }
+            for doc_id, score in fused
         ]
+
+    async def search_clinical_guidelines(self, query: str, top_k: int = 3):
+        if self.hybrid:
+            return await self.search_hybrid(query, top_k=top_k)
+        return (await self.search_batch([query], top_k))[0]
+
+    async def measure_recall(self, queries: list[str], top_k: int = 10) -> float:
+        """recall@k of the backend's ANN search against its own exact search."""
+        vectors = await self._embed(queries)
+        approx = await self.backend.search(vectors, top_k)
+        exact = await self.backend.exact_search(vectors, top_k)
+        return recall_at_k([[h.id for h in a] for a in approx], [[h.id for h in e] for e in exact])
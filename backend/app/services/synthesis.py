@@ -1,16 +1,165 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import AsyncIterator, Awaitable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth_cache import UserSnapshot
+from app.core.telemetry import Histogram
+from app.db.session import SessionLocal
+from .corpus import corpus_watermark
+from .llm import get_llm
+from .metabolic import MetabolicService
+from .query_cache import normalise_query, query_cache
 from .retrieval import RetrievalService
 
-class SynthesisApp:
+PROMPT = """You are a maternal and infant health assistant. Answer from the clinical guidelines in the context and the patient's data, and advise seeing a clinician for anything urgent.
+
+Context: {context}
+Patient: {patient}
+User: {question}
+Answer:"""
+
+
+class GenerationStats:
     def __init__(self):
-        self.retriever = RetrievalService()
+        self.ttft = Histogram()
+        self.total = Histogram()
+        self.completed = 0
+        self.cancelled = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "ttft_seconds": self.ttft.as_dict(),
+            "total_seconds": self.total.as_dict(),
+        }
+
+
+generation_stats = GenerationStats()
+
+
+async def patient_context(db: AsyncSession, user: UserSnapshot) -> str:
+    """One-line summary of the profile and glucose trend for the prompt."""
+    parts = []
+    if user.age:
+        parts.append(f"age {user.age}")
+    if user.lmp_date:
+        parts.append(f"{(datetime.utcnow() - user.lmp_date).days // 7} weeks since LMP")
+    if user.conditions:
+        parts.append(f"conditions: {user.conditions}")
+    trend = await MetabolicService.get_trend(db, user.id, "glucose")
+    if trend and trend["window_mean"] is not None:
+        parts.append(f"recent glucose mean {trend['window_mean']:.0f} mg/dL ({trend['trend']})")
+    return "; ".join(parts)
+
+
+class SynthesisApp:
+    def __init__(self, cache=query_cache, llm=None, retriever=None):
+        self.retriever = retriever or RetrievalService()
+        self.llm = llm or get_llm()
+        self.cache = cache
+
+    async def _retrieve(self, question: str, semantic: bool):
+        """Embed the question, then either reuse a similar cached answer or search."""
+        query_vector = await self.retriever.embedder.embed_query(question)
+        if semantic:
+            answer = self.cache.get_similar(query_vector)
+            if answer is not None:
+                return query_vector, [], answer
+        if self.retriever.hybrid:
+            docs = await self.retriever.search_hybrid(question, query_vector)
+        else:
+            docs = (await self.retriever.search_vectors(query_vector[None, :]))[0]
+        return query_vector, docs, None
+
+    async def stream_recommendation(self, question: str,
+                                    patient: Awaitable[str] | None = None) -> AsyncIterator[dict]:
+        """Yield ``sources``, then ``token`` events as the model produces
+        them, then a ``done`` event with time-to-first-token and total time.
+
+        Retrieval starts before ``patient`` (the profile lookup) is awaited,
+        so the two overlap. Personalised answers are cached under the exact
+        question and profile only; the similarity cache is reserved for
+        generic questions so one patient's answer never reaches another.
+        """
+        started = time.perf_counter()
+        first_token = None
+        key = normalise_query(question)
+        retrieval = None
+        level = answer = None
+        completed = False
+        try:
+            self.cache.sync(await corpus_watermark.current(SessionLocal))
+            if patient is None:
+                answer = self.cache.get_exact(key)
+                level = "exact"
+            if answer is None:
+                retrieval = asyncio.create_task(self._retrieve(question, semantic=patient is None))
+                profile = await patient if patient is not None else ""
+                if patient is not None:
+                    if profile:
+                        key = f"{key}\n{profile}"
+                    answer = self.cache.get_exact(key)
+                    level = "exact"
+            if answer is None:
+                query_vector, docs, answer = await retrieval
+                level = "semantic"
+                if answer is not None:
+                    # Promote so the next identical phrasing skips the embedding call
+                    self.cache.exact.set(key, answer)
+            if answer is not None:
+                first_token = time.perf_counter()
+                self.cache.record(level, first_token - started)
+                yield {"event": "token", "text": answer}
+            else:
+                level = None
+                yield {"event": "sources", "sources": docs}
+                prompt = PROMPT.format(
+                    context="\n".join(d["content"] for d in docs), patient=profile or "unknown", question=question
+                )
+                tokens = []
+                async for token in self.llm.stream(prompt):
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    tokens.append(token)
+                    yield {"event": "token", "text": token}
+                answer = "".join(tokens)
+                self.cache.set(key, None if profile else query_vector, answer)
+                self.cache.record(None, time.perf_counter() - started)
+            finished = time.perf_counter()
+            ttft = (first_token or finished) - started
+            generation_stats.ttft.observe(ttft)
+            generation_stats.total.observe(finished - started)
+            generation_stats.completed += 1
+            completed = True
+            yield {
+                "event": "done",
+                "cached": level,
+                "ttft_ms": round(ttft * 1000, 3),
+                "total_ms": round((finished - started) * 1000, 3),
+            }
+        finally:
+            if retrieval is not None and not retrieval.done():
+                retrieval.cancel()
+            if not completed:
+                generation_stats.cancelled += 1
 
     async def generate_recommendation(self, user_context: str) -> str:
-        # 1. Retrieve context
-        docs = await self.retriever.search_clinical_guidelines(user_context)
-        context_str = "\n".join([d['content'] for d in docs])
-        
-        # 2. Synthesize (Mock LLM Call)
-        # prompt = f"Context: {context_str}\nUser: {user_context}\nAnswer:"
-        # response = llm.predict(prompt)
-        
-        return f"Based on your data and clinical guidelines ({context_str}), we recommend monitoring your glucose levels closely."
+        parts = []
+        async for event in self.stream_recommendation(user_context):
+            if event["event"] == "token":
+                parts.append(event["text"])
+        return "".join(parts)
+
+
+_synthesis = None
+
+
+def get_synthesis() -> SynthesisApp:
+    global _synthesis
+    if _synthesis is None:
+        _synthesis = SynthesisApp()
+    return _synthesis
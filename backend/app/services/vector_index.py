@@ -0,0 +1,442 @@
+import asyncio
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+from pgvector.sqlalchemy import HALFVEC, VECTOR
+from sqlalchemy import func, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import ReactedDocument
+
+
+class SearchHit(NamedTuple):
+    id: int
+    distance: float
+    content: str
+
+
+def recall_at_k(approx: list[list[int]], exact: list[list[int]]) -> float:
+    """Fraction of the exact top-k ids that the approximate search returned."""
+    found = total = 0
+    for a, e in zip(approx, exact):
+        found += len(set(a) & set(e))
+        total += len(e)
+    return found / total if total else 1.0
+
+
+def _sq_distances(queries: np.ndarray, block: np.ndarray, block_norms: np.ndarray) -> np.ndarray:
+    q_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+    return np.maximum(q_norms - 2.0 * queries @ block.T + block_norms[None, :], 0.0)
+
+
+def _topk(dists: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k smallest entries per row, sorted ascending."""
+    k = min(k, dists.shape[1])
+    if k == 0:
+        return np.empty((dists.shape[0], 0), dtype=np.int64)
+    part = np.argpartition(dists, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(dists, part, axis=1).argsort(axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+
+def _kmeans(sample: np.ndarray, nlist: int, iters: int = 20, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iters):
+        assign = _sq_distances(sample, centroids, np.einsum("ij,ij->i", centroids, centroids)).argmin(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=nlist)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        # Re-seed empty lists so no centroid is wasted
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+    return centroids
+
+
+COMPACT_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+
+def _fit_projection(sample: np.ndarray, dim: int, reduction: str) -> tuple[np.ndarray, np.ndarray]:
+    """(components, mean) such that ``(x - mean) @ components.T`` keeps ``dim`` coordinates."""
+    full = sample.shape[1]
+    if reduction == "truncate":
+        return np.eye(dim, full, dtype=np.float32), np.zeros(full, dtype=np.float32)
+    if reduction != "pca":
+        raise ValueError(f"unknown embedding reduction: {reduction}")
+    mean = sample.mean(axis=0)
+    centred = sample - mean
+    _, eigvecs = np.linalg.eigh(centred.T @ centred)  # ascending eigenvalues
+    return np.ascontiguousarray(eigvecs[:, ::-1][:, :dim].T, dtype=np.float32), mean.astype(np.float32)
+
+
+def _project(x: np.ndarray, components: np.ndarray | None, mean: np.ndarray | None) -> np.ndarray:
+    return x if components is None else (x - mean) @ components.T
+
+
+def _fit_codes(sample: np.ndarray, storage: str) -> tuple[np.ndarray, np.ndarray]:
+    """Per-dimension (scale, offset) with ``x ~= offset + scale * code``."""
+    if storage != "int8":
+        return np.ones(sample.shape[1], dtype=np.float32), np.zeros(sample.shape[1], dtype=np.float32)
+    lo, hi = sample.min(axis=0), sample.max(axis=0)
+    return (np.maximum(hi - lo, 1e-12) / 254).astype(np.float32), ((hi + lo) / 2).astype(np.float32)
+
+
+def _encode(x: np.ndarray, scale: np.ndarray, offset: np.ndarray, storage: str) -> np.ndarray:
+    if storage == "int8":
+        return np.clip(np.rint((x - offset) / scale), -127, 127).astype(np.int8)
+    return x.astype(COMPACT_DTYPES[storage])
+
+
+class LocalVectorIndex:
+    """IVF-Flat index kept in ``.npy`` files and memory-mapped on load.
+
+    Vectors are stored grouped by inverted list so each probed list is a
+    contiguous slice of the mapped file. Chunk texts are kept in a JSON-lines
+    file with a byte-offset table, so the index can answer queries with no
+    database connection at all.
+
+    Optionally the inverted lists also hold a compact copy of every vector
+    (float16 or int8 scalar codes, after an optional PCA or Matryoshka-prefix
+    reduction). Probed lists are then scanned on the codes, and only the
+    best ``k * rerank`` rows are read from the full-precision file and
+    re-ranked, so the hot part of the index shrinks by up to 4x per
+    dimension kept.
+    """
+
+    _BLOCK = 8192
+
+    def __init__(self, path: str, nprobe: int | None = None, rerank: int | None = None):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.norms = np.load(os.path.join(path, "norms.npy"), mmap_mode="r")
+        self.order = np.load(os.path.join(path, "order.npy"))
+        self.ids = np.load(os.path.join(path, "ids.npy"))
+        self.centroids = np.load(os.path.join(path, "centroids.npy"))
+        self.list_offsets = np.load(os.path.join(path, "list_offsets.npy"))
+        self.content_offsets = np.load(os.path.join(path, "content_offsets.npy"))
+        self.nprobe = nprobe or settings.LOCAL_INDEX_NPROBE
+        self._centroid_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        self._id_order = np.argsort(self.ids)
+        self.rerank = rerank or settings.RERANK_CANDIDATES
+        self.codes = self.projection = self.projection_mean = None
+        compact = self.meta.get("compact")
+        if compact:
+            self.codes = np.load(os.path.join(path, "codes.npy"), mmap_mode="r")
+            self.code_norms = np.load(os.path.join(path, "code_norms.npy"), mmap_mode="r")
+            self.code_scale = np.load(os.path.join(path, "code_scale.npy"))
+            self.code_offset = np.load(os.path.join(path, "code_offset.npy"))
+            if compact["reduction"]:
+                self.projection = np.load(os.path.join(path, "projection.npy"))
+                self.projection_mean = np.load(os.path.join(path, "projection_mean.npy"))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    @classmethod
+    def build(cls, path: str, vectors: np.ndarray, ids: np.ndarray, contents_file: str,
+              content_offsets: np.ndarray, nlist: int | None = None, seed: int = 0,
+              storage: str = settings.EMBEDDING_STORAGE, reduced_dim: int | None = settings.EMBEDDING_REDUCED_DIM,
+              reduction: str = settings.EMBEDDING_REDUCTION) -> "LocalVectorIndex":
+        """Write an index for ``vectors`` (row i belongs to ``ids[i]``).
+
+        ``contents_file`` must already hold one JSON string per row, at the
+        byte offsets given in ``content_offsets``; it is moved into ``path``.
+        ``storage``/``reduced_dim`` other than float32 at full width add the
+        compact first-pass codes.
+        """
+        if storage not in COMPACT_DTYPES:
+            raise ValueError(f"unknown embedding storage: {storage}")
+        os.makedirs(path, exist_ok=True)
+        n, dim = vectors.shape
+        if reduced_dim and not 0 < reduced_dim < dim:
+            raise ValueError(f"reduced_dim must be between 1 and {dim - 1}")
+        nlist = max(1, min(nlist or settings.LOCAL_INDEX_NLIST, n))
+        rng = np.random.default_rng(seed)
+        sample_size = min(n, nlist * 64)
+        sample = np.asarray(vectors[np.sort(rng.choice(n, sample_size, replace=False))], dtype=np.float32)
+        centroids = _kmeans(sample, nlist, seed=seed)
+        c_norms = np.einsum("ij,ij->i", centroids, centroids)
+
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, cls._BLOCK):
+            block = np.asarray(vectors[start:start + cls._BLOCK], dtype=np.float32)
+            assign[start:start + len(block)] = _sq_distances(block, centroids, c_norms).argmin(axis=1)
+        order = np.argsort(assign, kind="stable")
+        list_offsets = np.zeros(nlist + 1, dtype=np.int64)
+        list_offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+
+        compact = None
+        if storage != "float32" or reduced_dim:
+            components = mean = None
+            if reduced_dim:
+                components, mean = _fit_projection(sample, reduced_dim, reduction)
+                np.save(os.path.join(path, "projection.npy"), components)
+                np.save(os.path.join(path, "projection_mean.npy"), mean)
+            scale, offset = _fit_codes(_project(sample, components, mean), storage)
+            np.save(os.path.join(path, "code_scale.npy"), scale)
+            np.save(os.path.join(path, "code_offset.npy"), offset)
+            codes = np.lib.format.open_memmap(os.path.join(path, "codes.npy"), mode="w+",
+                                              dtype=COMPACT_DTYPES[storage], shape=(n, reduced_dim or dim))
+            code_norms = np.lib.format.open_memmap(os.path.join(path, "code_norms.npy"), mode="w+",
+                                                   dtype=np.float32, shape=(n,))
+            compact = {"storage": storage, "dim": int(reduced_dim or dim), "reduction": reduction if reduced_dim else None}
+
+        out = np.lib.format.open_memmap(os.path.join(path, "vectors.npy"), mode="w+", dtype=np.float32, shape=(n, dim))
+        norms = np.lib.format.open_memmap(os.path.join(path, "norms.npy"), mode="w+", dtype=np.float32, shape=(n,))
+        for start in range(0, n, cls._BLOCK):
+            rows = order[start:start + cls._BLOCK]
+            block = np.asarray(vectors[np.sort(rows)], dtype=np.float32)[np.argsort(np.argsort(rows))]
+            out[start:start + len(rows)] = block
+            norms[start:start + len(rows)] = np.einsum("ij,ij->i", block, block)
+            if compact:
+                code = _encode(_project(block, components, mean), scale, offset, storage)
+                codes[start:start + len(rows)] = code
+                # Norms of the vectors as the codes represent them, relative to offset
+                scaled = code.astype(np.float32) * scale
+                code_norms[start:start + len(rows)] = np.einsum("ij,ij->i", scaled, scaled)
+        out.flush()
+        norms.flush()
+        del out, norms
+        if compact:
+            codes.flush()
+            code_norms.flush()
+            del codes, code_norms
+
+        np.save(os.path.join(path, "order.npy"), order)
+        np.save(os.path.join(path, "ids.npy"), np.asarray(ids, dtype=np.int64))
+        np.save(os.path.join(path, "centroids.npy"), centroids)
+        np.save(os.path.join(path, "list_offsets.npy"), list_offsets)
+        np.save(os.path.join(path, "content_offsets.npy"), np.asarray(content_offsets, dtype=np.int64))
+        os.replace(contents_file, os.path.join(path, "contents.jsonl"))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"count": int(n), "dim": int(dim), "nlist": int(nlist), "metric": "l2", "compact": compact}, f)
+        return cls(path)
+
+    def _finish(self, rows: np.ndarray, sq: np.ndarray) -> list[tuple[int, float]]:
+        """Map stored row positions to (document id, l2 distance) pairs."""
+        return [(int(self.ids[self.order[r]]), float(np.sqrt(d))) for r, d in zip(rows, sq)]
+
+    def _approx_distances(self, q: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Squared l2 distances from ``q`` to ``rows`` as their codes represent them."""
+        qc = _project(q, self.projection, self.projection_mean) - self.code_offset
+        weighted = qc * self.code_scale
+        return (qc @ qc - 2.0 * (self.codes[rows].astype(np.float32) @ weighted) + self.code_norms[rows])[None, :]
+
+    def search(self, queries: np.ndarray, k: int, nprobe: int | None = None) -> list[list[tuple[int, float]]]:
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        probes = _topk(_sq_distances(queries, self.centroids, self._centroid_norms), nprobe)
+        results = []
+        for q, lists in zip(queries, probes):
+            spans = [np.arange(self.list_offsets[c], self.list_offsets[c + 1]) for c in lists]
+            rows = np.concatenate(spans) if spans else np.empty(0, dtype=np.int64)
+            if not len(rows):
+                results.append([])
+                continue
+            if self.codes is not None:
+                rows = rows[_topk(self._approx_distances(q, rows), k * self.rerank)[0]]
+            sq = _sq_distances(q[None, :], self.vectors[rows], self.norms[rows])
+            best = _topk(sq, k)[0]
+            results.append(self._finish(rows[best], sq[0, best]))
+        return results
+
+    def exact_search(self, queries: np.ndarray, k: int) -> list[list[tuple[int, float]]]:
+        """Brute-force scan over the mapped file in fixed-size blocks."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        best_d = np.full((len(queries), 0), np.inf, dtype=np.float32)
+        best_r = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self), self._BLOCK):
+            block = self.vectors[start:start + self._BLOCK]
+            sq = _sq_distances(queries, block, self.norms[start:start + self._BLOCK])
+            cand_d = np.concatenate([best_d, sq], axis=1)
+            cand_r = np.concatenate([best_r, np.broadcast_to(np.arange(start, start + len(block)), sq.shape)], axis=1)
+            top = _topk(cand_d, k)
+            best_d = np.take_along_axis(cand_d, top, axis=1)
+            best_r = np.take_along_axis(cand_r, top, axis=1)
+        return [self._finish(r, d) for r, d in zip(best_r, best_d)]
+
+    def contents(self, doc_ids: list[int]) -> dict[int, str]:
+        out = {}
+        if not doc_ids:
+            return out
+        wanted = np.unique(np.asarray(doc_ids, dtype=np.int64))
+        sorted_ids = self.ids[self._id_order]
+        pos = np.clip(np.searchsorted(sorted_ids, wanted), 0, len(sorted_ids) - 1)
+        with open(os.path.join(self.path, "contents.jsonl"), "rb") as f:
+            for doc_id, p in zip(wanted, pos):
+                if sorted_ids[p] != doc_id:
+                    continue
+                f.seek(int(self.content_offsets[self._id_order[p]]))
+                out[int(doc_id)] = json.loads(f.readline())
+        return out
+
+
+async def build_local_index(db: AsyncSession, path: str, nlist: int | None = None, batch: int = 2048,
+                            **compact) -> LocalVectorIndex:
+    """Stream embedded rows of the documents table into a ``LocalVectorIndex``.
+
+    ``compact`` passes ``storage``/``reduced_dim``/``reduction`` to ``build``.
+    """
+    os.makedirs(path, exist_ok=True)
+    has_embedding = ReactedDocument.embedding.isnot(None)
+    n = await db.scalar(select(func.count()).select_from(ReactedDocument).where(has_embedding))
+    if not n:
+        raise ValueError("no embedded documents to index")
+    raw_path = os.path.join(path, "raw.npy")
+    contents_path = os.path.join(path, "contents.tmp")
+    raw = np.lib.format.open_memmap(raw_path, mode="w+", dtype=np.float32, shape=(n, settings.EMBEDDING_DIM))
+    ids = np.empty(n, dtype=np.int64)
+    offsets = np.empty(n, dtype=np.int64)
+    i = 0
+    result = await db.stream(
+        select(ReactedDocument.id, ReactedDocument.content, ReactedDocument.embedding)
+        .where(has_embedding)
+        .order_by(ReactedDocument.id)
+        .execution_options(yield_per=batch)
+    )
+    with open(contents_path, "wb") as f:
+        async for rows in result.partitions(batch):
+            for doc_id, content, embedding in rows:
+                if i == n:
+                    break
+                raw[i] = embedding
+                ids[i] = doc_id
+                offsets[i] = f.tell()
+                f.write(json.dumps(content or "").encode("utf-8") + b"\n")
+                i += 1
+    raw.flush()
+    try:
+        index = LocalVectorIndex.build(path, raw[:i], ids[:i], contents_path, offsets[:i], nlist=nlist, **compact)
+    finally:
+        del raw
+        os.unlink(raw_path)
+    return index
+
+
+class LocalBackend:
+    name = "local"
+
+    def __init__(self, path: str = settings.LOCAL_INDEX_DIR, nprobe: int | None = None, rerank: int | None = None):
+        self.index = LocalVectorIndex(path, nprobe=nprobe, rerank=rerank)
+
+    async def _run(self, fn, queries, k) -> list[list[SearchHit]]:
+        pairs = await asyncio.to_thread(fn, queries, k)
+        contents = self.index.contents([doc_id for hits in pairs for doc_id, _ in hits])
+        return [[SearchHit(doc_id, d, contents.get(doc_id, "")) for doc_id, d in hits] for hits in pairs]
+
+    async def search(self, queries: np.ndarray, k: int) -> list[list[SearchHit]]:
+        return await self._run(self.index.search, queries, k)
+
+    async def exact_search(self, queries: np.ndarray, k: int) -> list[list[SearchHit]]:
+        return await self._run(self.index.exact_search, queries, k)
+
+    async def contents(self, doc_ids: list[int]) -> dict[int, str]:
+        return await asyncio.to_thread(self.index.contents, doc_ids)
+
+
+class PgVectorBackend:
+    name = "pgvector"
+    INDEX_NAMES = {"hnsw": "ix_documents_embedding_hnsw", "ivfflat": "ix_documents_embedding_ivfflat"}
+
+    def __init__(self, session_factory, kind: str = settings.VECTOR_INDEX_KIND,
+                 ef_search: int = settings.HNSW_EF_SEARCH, probes: int = settings.IVFFLAT_PROBES,
+                 storage: str = settings.EMBEDDING_STORAGE, reduced_dim: int | None = settings.EMBEDDING_REDUCED_DIM,
+                 rerank: int = settings.RERANK_CANDIDATES):
+        if kind not in self.INDEX_NAMES:
+            raise ValueError(f"unknown vector index kind: {kind}")
+        if storage not in ("float32", "float16"):
+            raise ValueError(f"pgvector stores float32 or float16 (halfvec) vectors, not {storage}")
+        self.session_factory = session_factory
+        self.kind = kind
+        self.ef_search = ef_search
+        self.probes = probes
+        self.rerank = rerank
+        # The index is on an expression over the float32 column, which stays
+        # as the full-precision copy for re-ranking. Constants are inlined so
+        # the planner can match the query's expression to the index's.
+        self.compact_dim = reduced_dim or settings.EMBEDDING_DIM
+        self.compact = storage == "float16" or bool(reduced_dim)
+        expr = f"subvector(embedding, 1, {int(self.compact_dim)})" if reduced_dim else "embedding"
+        if storage == "float16":
+            expr = f"({expr})::halfvec({int(self.compact_dim)})"
+        self.compact_expr = expr
+        self.compact_type = HALFVEC(self.compact_dim) if storage == "float16" else VECTOR(self.compact_dim)
+        self.opclass = "halfvec_l2_ops" if storage == "float16" else "vector_l2_ops"
+        self.index_name = self.INDEX_NAMES[kind]
+        if self.compact:
+            self.index_name += f"_{'half' if storage == 'float16' else 'vec'}{int(self.compact_dim)}"
+
+    async def ensure_index(self, engine, concurrently: bool = True):
+        """Create the ANN index for ``self.kind`` if it doesn't exist."""
+        if self.kind == "hnsw":
+            params = f"m = {int(settings.HNSW_M)}, ef_construction = {int(settings.HNSW_EF_CONSTRUCTION)}"
+        else:
+            params = f"lists = {int(settings.IVFFLAT_LISTS)}"
+        column = f"({self.compact_expr})" if self.compact else "embedding"
+        ddl = (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {self.index_name} "
+            f"ON documents USING {self.kind} ({column} {self.opclass}) WITH ({params})"
+        )
+        # CONCURRENTLY can't run inside a transaction block
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text(ddl))
+
+    async def _query(self, queries: np.ndarray, k: int, exact: bool) -> list[list[SearchHit]]:
+        distance = ReactedDocument.embedding.l2_distance
+        async with self.session_factory() as db:
+            async with db.begin():
+                if exact:
+                    await db.execute(text("SET LOCAL enable_indexscan = off"))
+                elif self.kind == "hnsw":
+                    await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(self.ef_search)}"))
+                else:
+                    await db.execute(text(f"SET LOCAL ivfflat.probes = {int(self.probes)}"))
+                results = []
+                for q in np.atleast_2d(queries):
+                    query = select(ReactedDocument.id, distance(q).label("distance"), ReactedDocument.content)
+                    if self.compact and not exact:
+                        # Index scan on the compact expression, then exact order over its candidates
+                        compact = literal_column(self.compact_expr, type_=self.compact_type)
+                        candidates = (
+                            select(ReactedDocument.id)
+                            .where(ReactedDocument.embedding.isnot(None))
+                            .order_by(compact.l2_distance(q[:self.compact_dim]))
+                            .limit(k * self.rerank)
+                        )
+                        query = query.where(ReactedDocument.id.in_(candidates))
+                    rows = await db.execute(
+                        query
+                        .where(ReactedDocument.embedding.isnot(None))
+                        .order_by(distance(q))
+                        .limit(k)
+                    )
+                    results.append([SearchHit(r.id, float(r.distance), r.content) for r in rows])
+        return results
+
+    async def search(self, queries: np.ndarray, k: int) -> list[list[SearchHit]]:
+        return await self._query(queries, k, exact=False)
+
+    async def exact_search(self, queries: np.ndarray, k: int) -> list[list[SearchHit]]:
+        return await self._query(queries, k, exact=True)
+
+    async def contents(self, doc_ids: list[int]) -> dict[int, str]:
+        if not doc_ids:
+            return {}
+        async with self.session_factory() as db:
+            rows = await db.execute(
+                select(ReactedDocument.id, ReactedDocument.content).where(ReactedDocument.id.in_(doc_ids))
+            )
+            return {doc_id: content for doc_id, content in rows}
@@ -0,0 +1,84 @@
+import os
+import tempfile
+
+os.environ.setdefault("JOB_SPOOL_DIR", tempfile.mkdtemp(prefix="admission-spool-"))
+
+import argparse
+import asyncio
+import itertools
+import time
+
+import httpx
+
+from benchmarks.common import client, percentiles, register, reset_schema
+from benchmarks.fixtures import make_pdf
+from app.api.admission import AdmissionController, admission
+from app.core.config import settings
+from app.main import app as asgi_app
+
+# Saturates the expensive routes (registration at full bcrypt cost, PDF
+# uploads) from several client addresses while a few users poll a cheap
+# read, once with admission control off and once on, and reports the cheap
+# route's latency next to what the heavy routes got through or had shed.
+#   python -m benchmarks.admission --seconds 10 --heavy-clients 16
+_emails = itertools.count()
+
+
+async def heavy(c, pdf: bytes, headers: dict, stop: float, outcome: dict):
+    while time.perf_counter() < stop:
+        r = await c.post("/api/v1/auth/register", json={"email": f"load{next(_emails)}@example.com", "password": "pw"})
+        outcome[r.status_code] = outcome.get(r.status_code, 0) + 1
+        r = await c.post("/api/v1/ingest/pdf", files={"file": ("guide.pdf", pdf, "application/pdf")}, headers=headers)
+        outcome[r.status_code] = outcome.get(r.status_code, 0) + 1
+        if r.status_code in (429, 503):
+            await asyncio.sleep(float(r.headers["retry-after"]) / 10)  # an impatient client
+
+
+async def cheap(c, headers: dict, stop: float, samples: list):
+    while time.perf_counter() < stop:
+        started = time.perf_counter()
+        (await c.get("/api/v1/sessions/", headers=headers)).raise_for_status()
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+
+async def run(enabled: bool, args, pdf: bytes, headers: dict, uploaders: list[dict]) -> dict:
+    admission.enabled = enabled
+    admission.gates = AdmissionController(settings.ADMISSION_LIMITS).gates
+    clients = [
+        httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi_app, client=(f"10.0.0.{i}", 1234)), base_url="http://bench")
+        for i in range(args.heavy_clients)
+    ]
+    samples: list[float] = []
+    outcome: dict[int, int] = {}
+    stop = time.perf_counter() + args.seconds
+    async with client() as c:
+        await asyncio.gather(
+            *(heavy(h, pdf, uploaders[i], stop, outcome) for i, h in enumerate(clients)),
+            *(cheap(c, headers, stop, samples) for _ in range(args.cheap_clients)),
+        )
+    for h in clients:
+        await h.aclose()
+    return {"admission": enabled, "cheap_reads": len(samples), **percentiles(samples),
+            "heavy_ok_per_sec": round(sum(n for s, n in outcome.items() if s < 300) / args.seconds, 1),
+            "heavy_statuses": dict(sorted(outcome.items())), "shed": {g.prefix: g.shed for g in admission.gates}}
+
+
+async def main(args):
+    await reset_schema()
+    pdf = make_pdf(args.pdf_pages)
+    async with client() as c:
+        headers = {"Authorization": f"Bearer {await register(c, 'reader@example.com')}"}
+        uploaders = [{"Authorization": f"Bearer {await register(c, f'uploader{i}@example.com')}"}
+                     for i in range(args.heavy_clients)]
+    for enabled in (False, True):
+        print(await run(enabled, args, pdf, headers, uploaders))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--heavy-clients", type=int, default=16)
+    parser.add_argument("--cheap-clients", type=int, default=4)
+    parser.add_argument("--pdf-pages", type=int, default=40)
+    asyncio.run(main(parser.parse_args()))
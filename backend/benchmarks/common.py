@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+
+sys.path.append(os.getcwd())
+
+# Benchmarks run in-process against a throwaway SQLite database and the
+# offline embedder unless the environment says otherwise. This must happen
+# before anything under ``app`` is imported.
+_DB_DIR = tempfile.mkdtemp(prefix="bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_DB_DIR}/bench.db")
+os.environ.setdefault("EMBEDDING_BACKEND", "hashing")
+os.environ.setdefault("EMBEDDING_CACHE_PATH", f"{_DB_DIR}/embeddings.sqlite3")
+# Every in-process request comes from one client address, which the rate limits would throttle
+os.environ.setdefault("ADMISSION_CONTROL", "false")
+
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import numpy as np
+
+from sqlalchemy import text
+
+from app.db.base_class import Base
+from app.db.migrations import migrate
+from app.db.session import engine
+from app.main import app as asgi_app
+
+
+def percentiles(samples: list[float]) -> dict:
+    """p50/p95/p99 in milliseconds for latencies given in seconds."""
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    p50, p95, p99 = np.percentile(np.asarray(samples) * 1000, [50, 95, 99])
+    return {"p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3)}
+
+
+async def reset_schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.execute(text("DROP TABLE IF EXISTS schema_version"))
+    await migrate(engine)
+
+
+@asynccontextmanager
+async def client():
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        yield c
+
+
+async def timed(coro) -> tuple[float, object]:
+    started = time.perf_counter()
+    result = await coro
+    return time.perf_counter() - started, result
+
+
+async def register(c: httpx.AsyncClient, email: str, password: str = "password123") -> str:
+    r = await c.post("/api/v1/auth/register", json={"email": email, "password": password})
+    r.raise_for_status()
+    return r.json()["access_token"]
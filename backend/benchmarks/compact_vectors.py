@@ -0,0 +1,84 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import embeddings
+from app.services.vector_index import LocalVectorIndex, recall_at_k
+
+# Builds the local IVF index over a fixture embedding corpus with each
+# first-pass representation and reports, per configuration: bytes per chunk
+# the first pass scans, bytes per chunk on disk (the full-precision copy
+# stays for re-ranking), ms/query and recall@k against exact float32 search.
+# "truncate" runs on a Matryoshka-like corpus, where prefixes are meaningful.
+#   python -m benchmarks.compact_vectors --docs 30000 --queries 200 -k 10
+
+CONFIGS = [
+    ("float32", None, "pca"),
+    ("float16", None, "pca"),
+    ("int8", None, "pca"),
+    ("float32", 256, "pca"),
+    ("int8", 256, "pca"),
+    ("int8", 256, "truncate"),
+]
+
+
+def build(path: str, vectors: np.ndarray, storage: str, reduced_dim: int | None, reduction: str, nlist: int) -> LocalVectorIndex:
+    contents = os.path.join(path, "contents.tmp")
+    os.makedirs(path, exist_ok=True)
+    with open(contents, "wb") as f:
+        offsets = []
+        for i in range(len(vectors)):
+            offsets.append(f.tell())
+            f.write(b'"chunk %d"\n' % i)
+    return LocalVectorIndex.build(path, vectors, np.arange(1, len(vectors) + 1), contents, np.asarray(offsets),
+                                  nlist=nlist, storage=storage, reduced_dim=reduced_dim, reduction=reduction)
+
+
+def scan_bytes(index: LocalVectorIndex) -> int:
+    if index.codes is None:
+        return index.vectors.itemsize * index.dim + index.norms.itemsize
+    return index.codes.itemsize * index.codes.shape[1] + index.code_norms.itemsize
+
+
+def main(args):
+    corpora = {}
+    for storage, reduced_dim, reduction in CONFIGS:
+        matryoshka = reduction == "truncate"
+        if matryoshka not in corpora:
+            docs, queries = embeddings(args.docs, args.queries, matryoshka=matryoshka)
+            with tempfile.TemporaryDirectory(prefix="exact-") as path:
+                exact = build(path, docs, "float32", None, "pca", args.nlist).exact_search(queries, args.k)
+            corpora[matryoshka] = docs, queries, [[doc_id for doc_id, _ in hits] for hits in exact]
+        docs, queries, exact_ids = corpora[matryoshka]
+        with tempfile.TemporaryDirectory(prefix="compact-") as path:
+            index = build(path, docs, storage, reduced_dim, reduction, args.nlist)
+            disk = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path) if name.endswith(".npy"))
+            for rerank in args.rerank:
+                index.rerank = rerank
+                index.search(queries[:5], args.k, nprobe=args.nprobe)  # warm the page cache
+                started = time.perf_counter()
+                hits = index.search(queries, args.k, nprobe=args.nprobe)
+                elapsed = time.perf_counter() - started
+                print({
+                    "storage": storage, "dim": reduced_dim or docs.shape[1], "reduction": reduction if reduced_dim else None,
+                    "rerank": rerank if index.codes is not None else None,
+                    "scan_bytes_per_chunk": scan_bytes(index), "disk_bytes_per_chunk": round(disk / len(docs)),
+                    "ms_per_query": round(elapsed / len(queries) * 1000, 3),
+                    f"recall@{args.k}": round(recall_at_k([[doc_id for doc_id, _ in h] for h in hits], exact_ids), 3),
+                })
+                if index.codes is None:
+                    break
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=30_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=128)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--rerank", type=int, nargs="+", default=[1, 4])
+    main(parser.parse_args())
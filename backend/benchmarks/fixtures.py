@@ -0,0 +1,90 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+def readings(n: int, days: float = 30, metric_type: str = "glucose", seed: int = 0,
+             end: datetime | None = None) -> list[dict]:
+    """``n`` evenly spaced readings ending at ``end``, as the batch endpoint takes them."""
+    rng = random.Random(seed)
+    end = end or datetime.utcnow()
+    step = timedelta(days=days) / max(n, 1)
+    return [
+        {
+            "metric_type": metric_type,
+            "value": round(rng.gauss(110, 20), 1),
+            "unit": "mg/dL",
+            "timestamp": (end - step * (n - i)).isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+def guideline_text(words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    vocab = (
+        "pregnancy glucose screening GDM 24-28 weeks OGTT insulin metformin diet exercise blood pressure "
+        "pre-eclampsia aspirin labetalol iron folate anaemia breastfeeding postpartum weight gain fetal "
+        "growth ultrasound antenatal visit referral monitoring target fasting level advice"
+    ).split()
+    return " ".join(rng.choice(vocab) + (str(rng.randrange(1000)) if rng.random() < 0.3 else "") for _ in range(words))
+
+
+def embeddings(n: int, queries: int, dim: int = 1536, topics: int = 200, decay: float = 0.5,
+               matryoshka: bool = False, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Unit vectors clustered around ``topics`` with a power-law spectrum, as
+    text embeddings have, plus ``queries`` fresh draws from the same topics.
+
+    The spectrum is randomly rotated unless ``matryoshka``, in which case the
+    leading dimensions carry the most variance, as in models trained so
+    their prefixes work as smaller embeddings.
+    """
+    rng = np.random.default_rng(seed)
+    spectrum = (np.arange(1, dim + 1) ** -decay).astype(np.float32)
+    centres = rng.standard_normal((topics, dim), dtype=np.float32) * spectrum
+    rotation = None if matryoshka else np.linalg.qr(rng.standard_normal((dim, dim)))[0].astype(np.float32)
+
+    def draw(count: int) -> np.ndarray:
+        x = centres[rng.integers(0, topics, count)] + rng.standard_normal((count, dim), dtype=np.float32) * spectrum
+        if rotation is not None:
+            x = x @ rotation
+        return x / np.linalg.norm(x, axis=1, keepdims=True)
+    return draw(n), draw(queries)
+
+
+def make_pdf(pages: int, words_per_page: int = 300, seed: int = 0) -> bytes:
+    """A minimal text PDF pypdf can extract, without any PDF-writing dependency."""
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for page in range(pages):
+        page_obj, content_obj = 4 + 2 * page, 5 + 2 * page
+        words = guideline_text(words_per_page, seed=seed * 100_003 + page).split()
+        lines = [
+            f"BT /F1 8 Tf 20 {780 - 10 * row} Td ({' '.join(words[i:i + 12])}) Tj ET"
+            for row, i in enumerate(range(0, len(words), 12))
+        ]
+        stream = "\n".join(lines).encode("latin-1")
+        kids.append(f"{page_obj} 0 R")
+        objects[page_obj] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_obj
+        )
+        objects[content_obj] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for num in sorted(objects):
+        offsets[num] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (num, objects[num])
+    xref = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for num in range(1, size):
+        out += b"%010d 00000 n \n" % offsets[num]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+    return bytes(out)
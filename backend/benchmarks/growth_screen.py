@@ -0,0 +1,56 @@
+import argparse
+import time
+
+import numpy as np
+
+from app.services.growth import get_growth_reference
+from app.services.pediatric import PediatricService
+
+# Screens a synthetic infant cohort (weight, length and head circumference
+# per child) in one vectorised call per indicator, and compares the time
+# with calling check_growth once per measurement.
+#   python -m benchmarks.growth_screen --infants 100000
+
+
+def cohort(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    reference = get_growth_reference()
+    sex = rng.integers(0, 2, n)
+    age = rng.uniform(0, reference.max_day, n)
+    measurements = {}
+    for indicator in ("weight", "length", "head_circumference"):
+        _, m, s = reference.lms(indicator, sex, age)
+        measurements[indicator] = m * (1 + s * rng.normal(0, 1.1, n))
+    return sex, age, measurements
+
+
+def main(args):
+    get_growth_reference()  # table load is once per process, not per screen
+    sex, age, measurements = cohort(args.infants)
+
+    started = time.perf_counter()
+    flagged = 0
+    for indicator, values in measurements.items():
+        flagged += int(np.count_nonzero(PediatricService.screen(indicator, sex, age, values)["flag"]))
+    vectorised = time.perf_counter() - started
+
+    sample = min(args.loop_sample, args.infants)
+    genders = np.array(["male", "female"])[sex[:sample]]
+    started = time.perf_counter()
+    for g, a, w in zip(genders, age[:sample] / 30.4375, measurements["weight"][:sample]):
+        PediatricService.check_growth(a, w, g)
+    per_row = (time.perf_counter() - started) / sample
+
+    print({
+        "measurements": args.infants * len(measurements),
+        "flagged": flagged,
+        "vectorised_ms": round(vectorised * 1000, 2),
+        "per_row_loop_ms_estimate": round(per_row * args.infants * len(measurements) * 1000, 1),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--infants", type=int, default=100_000)
+    parser.add_argument("--loop-sample", type=int, default=2000, help="per-row calls timed to extrapolate the loop")
+    main(parser.parse_args())
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import percentiles
+from app.services.embeddings import HashingEmbedder
+from app.services.lexical_index import BM25Index
+from app.services.retrieval import RetrievalService
+from app.services.vector_index import LocalBackend, LocalVectorIndex
+
+# Builds a synthetic guideline corpus where each query hinges on one exact
+# term (a drug name, an acronym or a gestational range) shared by a handful
+# of chunks among otherwise similar prose, then compares vector-only search
+# with BM25 + vector fused by reciprocal rank fusion.
+#   python -m benchmarks.hybrid_retrieval --docs 5000 --queries 300 -k 5
+
+GENERIC = (
+    "pregnancy maternal infant glucose blood pressure weight diet exercise sleep fetal growth monitoring "
+    "screening risk clinic visit follow-up nutrition iron folate supplement trimester delivery labour "
+    "postpartum breastfeeding vaccination antenatal care assessment symptoms advice guideline management "
+    "treatment dose review referral test result history family support mental health stress anxiety "
+    "physical activity hydration protein calcium vitamin counselling outcome complication target level"
+).split()
+SYLLABLES = ["lab", "eta", "nif", "edi", "met", "for", "ins", "ulin", "aspi", "rin", "oxy", "toc", "hep", "arin", "mag"]
+
+
+def anchor_terms(n: int, rng: np.random.Generator) -> list[str]:
+    terms, seen = [], set()
+    attempt = 0
+    while len(terms) < n:
+        # Only a hundred or so distinct ranges exist; the other kinds fill the rest
+        kind = attempt % 3 if attempt < 300 else attempt % 2
+        attempt += 1
+        if kind == 0:
+            term = "".join(rng.choice(SYLLABLES, 3)) + rng.choice(["ine", "ol", "ide", "pam"])
+        elif kind == 1:
+            term = "".join(chr(ord("A") + c) for c in rng.integers(0, 26, 3)) + "D"
+        else:
+            start = int(rng.integers(8, 36))
+            term = f"{start}-{start + int(rng.integers(2, 6))} weeks"
+        if term not in seen:
+            seen.add(term)
+            terms.append(term)
+    return terms
+
+
+def vocabulary(size: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Clinical words plus filler words, with Zipfian sampling weights."""
+    filler = {"".join(rng.choice(list("aeioubdfgklmnprstv"), int(rng.integers(4, 9)))) for _ in range(size)}
+    words = np.array(GENERIC + sorted(filler))
+    weights = 1.0 / np.arange(1, len(words) + 1)
+    return words, weights / weights.sum()
+
+
+def corpus(docs: int, group: int, seed: int = 0) -> tuple[list[str], list[str], list[list[int]]]:
+    """Chunk texts, the anchor term of each group and the chunk ids per group."""
+    rng = np.random.default_rng(seed)
+    anchors = anchor_terms(docs // group, rng)
+    words_, weights = vocabulary(5000, rng)
+    texts, members = [], [[] for _ in anchors]
+    for i in range(docs):
+        words = list(rng.choice(words_, 80, p=weights))
+        g = i % len(anchors)
+        words.insert(int(rng.integers(0, len(words))), anchors[g])
+        texts.append(" ".join(words))
+        members[g].append(i + 1)
+    return texts, anchors, members
+
+
+def build_vector_index(path: str, texts: list[str], vectors: np.ndarray) -> LocalVectorIndex:
+    contents = os.path.join(path, "contents.tmp")
+    offsets = np.empty(len(texts), dtype=np.int64)
+    with open(contents, "wb") as f:
+        for i, t in enumerate(texts):
+            offsets[i] = f.tell()
+            f.write(json.dumps(t).encode("utf-8") + b"\n")
+    return LocalVectorIndex.build(path, vectors, np.arange(1, len(texts) + 1), contents, offsets, nlist=64)
+
+
+async def run(service: RetrievalService, queries: list[str], members: list[list[int]], k: int, hybrid: bool) -> dict:
+    found = total = 0
+    samples = []
+    for query, relevant in zip(queries, members):
+        started = time.perf_counter()
+        if hybrid:
+            hits = await service.search_hybrid(query, top_k=k)
+        else:
+            hits = await service.search_clinical_guidelines(query, top_k=k)
+        samples.append(time.perf_counter() - started)
+        found += len({h["id"] for h in hits} & set(relevant))
+        total += min(k, len(relevant))
+    return {"mode": "hybrid" if hybrid else "vector", f"recall@{k}": round(found / total, 3), **percentiles(samples)}
+
+
+async def main(args):
+    texts, anchors, members = corpus(args.docs, args.group)
+    rng = np.random.default_rng(1)
+    picked = rng.choice(len(anchors), min(args.queries, len(anchors)), replace=False)
+    # The anchor term plus a few words from one of the chunks that carry it
+    queries = [f"{anchors[g]} {' '.join(rng.choice(texts[members[g][0] - 1].split(), 3))}" for g in picked]
+    relevant = [members[g] for g in picked]
+
+    embedder = HashingEmbedder()
+    started = time.perf_counter()
+    vectors = await embedder.embed_documents(texts)
+    lexical = BM25Index()
+    lexical.add_many(enumerate(texts, start=1))
+    with tempfile.TemporaryDirectory() as path:
+        build_vector_index(path, texts, vectors)
+        print(f"indexed {len(texts)} chunks in {time.perf_counter() - started:.1f}s")
+        backend = LocalBackend(path, nprobe=args.nprobe)
+        service = RetrievalService(backend=backend, embedder=embedder, lexical=lexical, hybrid=False)
+        print(await run(service, queries, relevant, args.k, hybrid=False))
+        print(await run(service, queries, relevant, args.k, hybrid=True))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--group", type=int, default=5, help="chunks sharing each anchor term")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("-k", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import func, insert, select
+
+from benchmarks.common import reset_schema
+from app.db.session import SessionLocal
+from app.models import Job
+from app.services.jobs import JobWorkerPool, job_kind
+
+# Queues jobs that each wait on simulated I/O, then drains the queue with
+# pools of increasing size and reports jobs/sec, to check that throughput
+# grows with the worker count until the database's claim rate is the limit.
+# SQLite serialises every claim, so expect the curve to flatten much earlier
+# there than on Postgres with SKIP LOCKED.
+#   python -m benchmarks.job_throughput --jobs 400 --io-ms 50 --workers 1 2 4 8 16
+
+
+@job_kind("bench_io")
+async def bench_io(ctx, payload):
+    await asyncio.sleep(payload["ms"] / 1000)
+    return {}
+
+
+async def drain(jobs: int, workers: int, io_ms: float) -> float:
+    async with SessionLocal() as db:
+        await db.execute(insert(Job), [{"kind": "bench_io", "payload": f'{{"ms": {io_ms}}}'} for _ in range(jobs)])
+        await db.commit()
+    pool = JobWorkerPool(SessionLocal, async_workers=workers, process_workers=0, poll_seconds=0.05)
+    started = time.perf_counter()
+    pool.start()
+    while True:
+        async with SessionLocal() as db:
+            left = (await db.execute(select(func.count()).where(Job.status != "succeeded"))).scalar_one()
+        if not left:
+            break
+        await asyncio.sleep(0.02)
+    elapsed = time.perf_counter() - started
+    await pool.stop()
+    return elapsed
+
+
+async def main(args):
+    await reset_schema()
+    base = None
+    for workers in args.workers:
+        elapsed = await drain(args.jobs, workers, args.io_ms)
+        rate = args.jobs / elapsed
+        base = base or rate / workers
+        print({"workers": workers, "jobs_per_sec": round(rate, 1), "ideal_jobs_per_sec": round(base * workers, 1),
+               "scaling_efficiency": round(rate / (base * workers), 2)})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=400)
+    parser.add_argument("--io-ms", type=float, default=50, help="simulated I/O per job")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    asyncio.run(main(parser.parse_args()))
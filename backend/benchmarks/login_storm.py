@@ -0,0 +1,67 @@
+import asyncio
+import argparse
+import time
+
+from benchmarks.common import client, percentiles, register, reset_schema, timed
+from app.core import security
+from app.core.config import settings
+
+# Fires a burst of concurrent logins while a background prober hits cheap
+# endpoints, once with bcrypt inline on the event loop and once on the hash
+# pool. Reports login throughput and the prober's latency percentiles.
+#   python -m benchmarks.login_storm --logins 200 --concurrency 50
+
+
+async def probe(c, token: str, stop: asyncio.Event, samples: list[float]):
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        elapsed, _ = await timed(c.get("/health"))
+        samples.append(elapsed)
+        elapsed, _ = await timed(c.get("/api/v1/users/me", headers=headers))
+        samples.append(elapsed)
+        await asyncio.sleep(0.005)
+
+
+async def storm(workers: int, logins: int, concurrency: int) -> dict:
+    security.hash_pool = security.PasswordHashPool(workers, settings.PASSWORD_HASH_MAX_PENDING)
+    await reset_schema()
+    async with client() as c:
+        token = await register(c, "probe@example.com")
+        await register(c, "storm@example.com")
+        stop = asyncio.Event()
+        samples: list[float] = []
+        prober = asyncio.create_task(probe(c, token, stop, samples))
+        gate = asyncio.Semaphore(concurrency)
+        statuses: dict[int, int] = {}
+
+        async def login():
+            async with gate:
+                r = await c.post("/api/v1/auth/login", data={"username": "storm@example.com", "password": "password123"})
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await prober
+    security.hash_pool.shutdown()
+    return {
+        "mode": f"pool({workers})" if workers else "inline",
+        "logins_per_sec": round(logins / elapsed, 1),
+        "statuses": statuses,
+        "probe_requests": len(samples),
+        **percentiles(samples),
+    }
+
+
+async def main(args):
+    for workers in (0, args.workers):
+        print(await storm(workers, args.logins, args.concurrency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import random
+import re
+import time
+
+from app.core.config import settings
+from app.services.lexicon import get_screener
+from app.services.mental import MentalHealthService
+
+# Screens synthetic journal entries (everyday prose with a few lexicon
+# phrases, negations and modifiers mixed in) and reports entries/sec for a
+# word-bounded regex per phrase, the compiled matcher inline, and the batch
+# API fanning chunks out to the process pool.
+#   python -m benchmarks.mental_screen --entries 20000 --words 120 --workers 2
+
+FILLER = (
+    "today the baby slept after feeding and we went for a walk in the park my partner made dinner "
+    "I talked to my mother on the phone the midwife visited this morning we did the laundry "
+    "it rained again I read a few pages of my book before bed the house was quiet"
+).split()
+
+
+def entries(n: int, words: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    phrases = [e[0] for e in get_screener().entries]
+    out = []
+    for _ in range(n):
+        tokens = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(rng.randrange(4)):
+            tokens.insert(rng.randrange(len(tokens)), rng.choice(phrases))
+        out.append(" ".join(tokens) + ".")
+    return out
+
+
+def regex_scan(texts: list[str]) -> int:
+    """One word-bounded pattern per phrase, finding positions as negation handling needs."""
+    patterns = [re.compile(rf"\b{re.escape(e[0])}\b") for e in get_screener().entries if e[1] != "break"]
+    found = 0
+    for text in texts:
+        lowered = text.lower()
+        for pattern in patterns:
+            found += len(pattern.findall(lowered))
+    return found
+
+
+async def main(args):
+    settings.MENTAL_SCREEN_WORKERS = args.workers
+    texts = entries(args.entries, args.words)
+    print(f"{len(get_screener())} lexicon phrases, {len(texts)} entries of ~{args.words} words")
+
+    started = time.perf_counter()
+    regex_scan(texts)
+    elapsed = time.perf_counter() - started
+    print({"mode": "regex per phrase", "entries_per_sec": round(len(texts) / elapsed)})
+
+    started = time.perf_counter()
+    inline = [get_screener().screen(t) for t in texts]
+    elapsed = time.perf_counter() - started
+    print({"mode": "compiled, inline", "entries_per_sec": round(len(texts) / elapsed),
+           "flagged": sum(s.level != "stable" for s in inline)})
+
+    await MentalHealthService.screen_batch(texts[:args.chunk * args.workers + 1], chunk=args.chunk)  # start workers
+    started = time.perf_counter()
+    pooled = await MentalHealthService.screen_batch(texts, chunk=args.chunk)
+    elapsed = time.perf_counter() - started
+    assert [s.level for s in pooled] == [s.level for s in inline]
+    print({"mode": f"compiled, {args.workers} processes", "entries_per_sec": round(len(texts) / elapsed)})
+    MentalHealthService.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=20_000)
+    parser.add_argument("--words", type=int, default=120)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--chunk", type=int, default=settings.MENTAL_SCREEN_CHUNK)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import percentiles, reset_schema
+from app.core.config import settings
+from app.db.instrumentation import pool_snapshot
+from app.db.session import build_engine
+from app.models import Metric
+
+# Compares request throughput across pool configurations: each simulated
+# request checks out a session, runs a short metrics query and a trivial
+# statement, and returns the connection. Point DATABASE_URL at Postgres for
+# numbers that mean anything for production.
+#   python -m benchmarks.pool_configs --requests 2000 --concurrency 100
+
+CONFIGS = [
+    {"pool_size": 5, "max_overflow": 0},
+    {"pool_size": 5, "max_overflow": 15},
+    {"pool_size": 20, "max_overflow": 0},
+    {"pool_size": 20, "max_overflow": 20},
+]
+
+
+async def run(config: dict, requests: int, concurrency: int) -> dict:
+    engine = build_engine(settings.DATABASE_URL, **config)
+    Session = sessionmaker(bind=engine, class_=AsyncSession)
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def request():
+        async with gate:
+            started = time.perf_counter()
+            async with Session() as db:
+                await db.execute(select(Metric.id).filter(Metric.owner_id == 1).limit(10))
+                await db.execute(text("SELECT 1"))
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    snapshot = pool_snapshot(engine)
+    await engine.dispose()
+    return {
+        **config,
+        "req_per_sec": round(requests / elapsed, 1),
+        **percentiles(latencies),
+        "wait_p99_s": snapshot["wait_seconds"]["p99"],
+        "overflow_events": snapshot["overflow_events"],
+        "timeouts": snapshot["timeouts"],
+    }
+
+
+async def main(args):
+    await reset_schema()
+    for config in CONFIGS:
+        print(await run(config, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
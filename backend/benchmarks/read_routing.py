@@ -0,0 +1,92 @@
+import os
+import tempfile
+
+# A primary and two replicas as separate SQLite files. Replication is
+# simulated by copying the primary's file after seeding, so the replicas
+# are a snapshot that later writes don't reach, which is exactly what
+# replica lag looks like to a reader.
+_DIR = tempfile.mkdtemp(prefix="routing-")
+_REPLICAS = [f"{_DIR}/replica{i}.db" for i in (1, 2)]
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_DIR}/primary.db")
+os.environ.setdefault("DATABASE_REPLICA_URLS", "[" + ", ".join(f'"sqlite+aiosqlite:///{p}"' for p in _REPLICAS) + "]")
+
+import argparse
+import asyncio
+import shutil
+
+from benchmarks.common import client, register, reset_schema
+from benchmarks.fixtures import readings
+from app.db.replicas import recent_writers, replicas
+from app.db.session import engine
+
+# Routes authenticated reads through the app with two replicas configured
+# and checks: round-robin spread, read-your-writes pinning after a user's
+# own write, failover when a replica stops answering, and recovery.
+#   python -m benchmarks.read_routing --reads 200
+
+
+def snapshot_primary():
+    primary = engine.url.database
+    for path in _REPLICAS:
+        shutil.copyfile(primary, path)
+
+
+def reads_by_replica() -> dict:
+    return {r.name.rsplit("/", 1)[-1]: r.reads for r in replicas.replicas} | {"primary": replicas.primary_reads}
+
+
+async def history_len(c, headers) -> int:
+    r = await c.get("/api/v1/metrics/history", params={"metric_type": "glucose", "days": 30}, headers=headers)
+    r.raise_for_status()
+    return len(r.json())
+
+
+async def main(args):
+    await reset_schema()
+    for replica in replicas.replicas:
+        replica.healthy = False  # empty until the snapshot below
+    async with client() as c:
+        headers = {"Authorization": f"Bearer {await register(c, 'routing@example.com')}"}
+        (await c.post("/api/v1/metrics/batch", json=readings(args.seed_readings), headers=headers)).raise_for_status()
+        recent_writers._writes.clear()  # seeding isn't the write under test
+        for replica in replicas.replicas:
+            await replica.engine.dispose()
+        snapshot_primary()
+        await replicas.check()
+
+        await asyncio.gather(*(history_len(c, headers) for _ in range(args.reads)))
+        print({"spread": reads_by_replica()})
+
+        before_write = await history_len(c, headers)
+        body = {"metric_type": "glucose", "value": 99.0, "unit": "mg/dL"}
+        (await c.post("/api/v1/metrics/", json=body, headers=headers)).raise_for_status()
+        pinned = await history_len(c, headers)
+        recent_writers._writes.clear()
+        stale = await history_len(c, headers)
+        print({"before_write": before_write, "after_own_write": pinned, "same_read_unpinned": stale,
+               "read_your_writes": pinned == before_write + 1 and stale == before_write})
+
+        # A directory where the database file was makes every connection fail
+        await replicas.replicas[1].engine.dispose()
+        os.remove(_REPLICAS[1])
+        os.mkdir(_REPLICAS[1])
+        await replicas.check()
+        before = reads_by_replica()
+        await asyncio.gather(*(history_len(c, headers) for _ in range(args.reads // 2)))
+        after = reads_by_replica()
+        print({"failover": {k: after[k] - before[k] for k in after},
+               "healthy": [r.healthy for r in replicas.replicas]})
+
+        os.rmdir(_REPLICAS[1])
+        snapshot_primary()
+        await replicas.check()
+        print({"recovered": [r.healthy for r in replicas.replicas]})
+    await replicas.stop()
+    shutil.rmtree(_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--seed-readings", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import percentiles, reset_schema
+from app.db.session import SessionLocal
+from app.models import TeleSession, User
+from app.services.reminders import ReminderScheduler, UpcomingSession
+
+# Schedules sessions a few seconds out for many connected users, half
+# already in the table when the scheduler starts and half added live as
+# create_session would, and measures how late each reminder reaches its
+# subscriber. Also prints how many DB queries the same clients would have
+# made polling /sessions/reminders.
+#   python -m benchmarks.reminder_precision --users 500 --seconds 10
+
+
+async def seed(users: int, sessions: int, seconds: float) -> list[UpcomingSession]:
+    """Store ``sessions`` rows; returns as many more that exist only in memory."""
+    now = datetime.utcnow()
+    async with SessionLocal() as db:
+        db.add_all(User(email=f"u{i}@example.com", hashed_password="x") for i in range(users))
+        await db.flush()
+        db.add_all(
+            TeleSession(
+                title=f"session {i}",
+                owner_id=1 + i % users,
+                scheduled_at=now + timedelta(seconds=random.uniform(2, seconds)),
+            )
+            for i in range(sessions)
+        )
+        await db.commit()
+    return [
+        UpcomingSession(
+            id=sessions + 1 + i,
+            owner_id=1 + i % users,
+            title=f"live {i}",
+            scheduled_at=now + timedelta(seconds=random.uniform(2, seconds)),
+        )
+        for i in range(sessions)
+    ]
+
+
+async def main(args):
+    await reset_schema()
+    live = await seed(args.users, args.sessions // 2, args.seconds)
+
+    scheduler = ReminderScheduler(SessionLocal, leads_minutes=[0], refresh_seconds=args.refresh)
+    received: list[float] = []
+    queues = {owner: scheduler.subscribe(owner) for owner in range(1, args.users + 1)}
+
+    async def consume(queue: asyncio.Queue):
+        while True:
+            reminder = await queue.get()
+            due = datetime.fromisoformat(reminder["scheduled_at"]) - datetime(1970, 1, 1)
+            received.append(time.time() - due.total_seconds())
+
+    consumers = [asyncio.create_task(consume(q)) for q in queues.values()]
+    started = time.perf_counter()
+    scheduler.start()
+    for s in live:
+        scheduler.add(s)
+    await asyncio.sleep(args.seconds + 1)
+    elapsed = time.perf_counter() - started
+    await scheduler.stop()
+    for task in consumers:
+        task.cancel()
+    print({
+        "reminders": args.sessions // 2 * 2,
+        "received": len(received),
+        **percentiles(received),
+        "scheduler_queries": scheduler.loads,
+        "polling_queries": int(args.users * elapsed / args.poll_interval),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--refresh", type=float, default=60)
+    parser.add_argument("--poll-interval", type=float, default=30, help="client polling period being replaced")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,83 @@
+import os
+
+# Cheap hashes so log I/O, not bcrypt, dominates login latency
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmarks.common import client, percentiles, register, reset_schema, timed
+from app.core.log import JsonFormatter, configure_logging, pipeline, shutdown_logging
+
+# Logs in through the API while every log record takes ``--sink-ms`` to
+# write, once with a handler writing straight from the request (what
+# print() to a blocked stdout amounts to) and once through the queue
+# pipeline. Reports login latency percentiles for both.
+#   python -m benchmarks.slow_sink --logins 300 --concurrency 20 --sink-ms 10
+
+
+class SlowHandler(logging.Handler):
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.written = 0
+
+    def emit(self, record: logging.LogRecord):
+        self.format(record)
+        time.sleep(self.delay)
+        self.written += 1
+
+
+async def storm(mode: str, logins: int, concurrency: int, delay: float) -> dict:
+    sink = SlowHandler(delay)
+    root = logging.getLogger()
+    if mode == "queue":
+        configure_logging(sink)
+    else:
+        sink.setFormatter(JsonFormatter())
+        root.addHandler(sink)
+        root.setLevel(logging.INFO)
+    await reset_schema()
+    async with client() as c:
+        await register(c, "storm@example.com")
+        gate = asyncio.Semaphore(concurrency)
+        samples: list[float] = []
+
+        async def login():
+            async with gate:
+                elapsed, r = await timed(c.post(
+                    "/api/v1/auth/login", data={"username": "storm@example.com", "password": "password123"}
+                ))
+                r.raise_for_status()
+                samples.append(elapsed)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+    stats = pipeline.stats()
+    if mode == "queue":
+        shutdown_logging()
+    else:
+        root.removeHandler(sink)
+    return {
+        "mode": mode,
+        "logins_per_sec": round(logins / elapsed, 1),
+        **percentiles(samples),
+        "records_written": sink.written,
+        "dropped": stats.get("dropped", 0),
+    }
+
+
+async def main(args):
+    for mode in ("direct", "queue"):
+        print(await storm(mode, args.logins, args.concurrency, args.sink_ms / 1000))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--sink-ms", type=float, default=10)
+    asyncio.run(main(parser.parse_args()))
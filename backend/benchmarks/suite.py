@@ -0,0 +1,323 @@
+import os
+
+# The suite measures the request path, not bcrypt's deliberate cost
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from benchmarks.common import client, percentiles, register, reset_schema
+from benchmarks.fixtures import guideline_text, make_pdf, readings
+from app.db.session import SessionLocal
+from app.services.ingestion import IngestionService
+from app.services.jobs import JobWorkerPool
+from app.services.metric_ingest import MetricIngestionService
+from app.services.retrieval import RetrievalService
+from app.services.vector_index import LocalBackend, build_local_index
+
+# Drives the app in-process through the ASGI client against the SQLite
+# stand-in and reports throughput and latency percentiles per scenario.
+# Results can be saved as a JSON baseline; later runs compared against it
+# exit non-zero if any scenario regressed by more than --threshold.
+#   python -m benchmarks.suite --save benchmarks/baseline.json
+#   python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.2
+#   python -m benchmarks.suite --only metrics --scale 0.2
+
+NOISE_FLOOR_MS = 1.0  # latency changes smaller than this never count as regressions
+
+
+@dataclass
+class Result:
+    samples: list[float]
+    seconds: float
+    units: int = 0  # readings, pages, ... when one operation covers many
+
+    def as_dict(self) -> dict:
+        out = {
+            "ops": len(self.samples),
+            "ops_per_sec": round(len(self.samples) / self.seconds, 2) if self.seconds else 0.0,
+            **percentiles(self.samples),
+        }
+        if self.units:
+            out["units_per_sec"] = round(self.units / self.seconds, 2) if self.seconds else 0.0
+        return out
+
+
+SCENARIOS = {}
+
+
+def scenario(name: str):
+    def register_scenario(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register_scenario
+
+
+async def repeat(n: int, concurrency: int, call) -> Result:
+    """Run ``call(i)`` for i in range(n), ``concurrency`` at a time, timing each."""
+    gate = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+
+    async def one(i: int):
+        async with gate:
+            started = time.perf_counter()
+            await call(i)
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return Result(samples, time.perf_counter() - started)
+
+
+class Context:
+    def __init__(self, c, scale: float):
+        self.c = c
+        self.scale = scale
+        self.users = 0
+
+    def n(self, base: int) -> int:
+        return max(1, int(base * self.scale))
+
+    async def user(self) -> dict:
+        self.users += 1
+        token = await register(self.c, f"bench{self.users}@example.com")
+        return {"Authorization": f"Bearer {token}"}
+
+
+@scenario("auth.register")
+async def auth_register(ctx: Context) -> Result:
+    offset = ctx.users
+    ctx.users += ctx.n(100)
+    return await repeat(ctx.n(100), 10, lambda i: register(ctx.c, f"bench{offset + i + 1}@example.com"))
+
+
+@scenario("auth.login")
+async def auth_login(ctx: Context) -> Result:
+    await ctx.user()
+    form = {"username": f"bench{ctx.users}@example.com", "password": "password123"}
+    return await repeat(ctx.n(200), 10, lambda i: _post_ok(ctx.c, "/api/v1/auth/login", data=form))
+
+
+async def _post_ok(c, url: str, **kwargs):
+    response = await c.post(url, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+async def _get_ok(c, url: str, **kwargs):
+    response = await c.get(url, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+@scenario("metrics.write")
+async def metrics_write(ctx: Context) -> Result:
+    headers = await ctx.user()
+    body = {"metric_type": "glucose", "value": 104.0, "unit": "mg/dL"}
+    return await repeat(ctx.n(500), 10, lambda i: _post_ok(ctx.c, "/api/v1/metrics/", json=body, headers=headers))
+
+
+@scenario("metrics.batch")
+async def metrics_batch(ctx: Context) -> Result:
+    headers = await ctx.user()
+    batches, size = ctx.n(20), 1000
+    end = datetime.utcnow()
+    payloads = [readings(size, days=1, seed=i, end=end - timedelta(days=i)) for i in range(batches)]
+    await _post_ok(ctx.c, "/api/v1/metrics/batch", json=readings(1, end=end - timedelta(days=batches)), headers=headers)
+    result = await repeat(batches, 2, lambda i: _post_ok(ctx.c, "/api/v1/metrics/batch", json=payloads[i], headers=headers))
+    result.units = batches * size
+    return result
+
+
+async def _history(ctx: Context, size: int, params: dict) -> Result:
+    headers = await ctx.user()
+    async with SessionLocal() as db:
+        await MetricIngestionService.write_stream(db, ctx.users, _chunks(readings(size, days=29), 5000))
+    query = {"metric_type": "glucose", "days": 30, **params}
+    return await repeat(ctx.n(50), 4, lambda i: _get_ok(ctx.c, "/api/v1/metrics/history", params=query, headers=headers))
+
+
+async def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+for _size in (1_000, 10_000, 100_000):
+    scenario(f"metrics.history_{_size}")(lambda ctx, size=_size: _history(ctx, size, {}))
+    scenario(f"metrics.history_{_size}_max500")(
+        lambda ctx, size=_size: _history(ctx, size, {"max_points": 500, "resolution": "lttb"})
+    )
+
+
+@scenario("sessions.create")
+async def sessions_create(ctx: Context) -> Result:
+    headers = await ctx.user()
+    start = datetime.utcnow()
+
+    def body(i):
+        return {"title": f"Consultation {i}", "scheduled_at": (start + timedelta(hours=1 + i)).isoformat()}
+    return await repeat(ctx.n(200), 10, lambda i: _post_ok(ctx.c, "/api/v1/sessions/", json=body(i), headers=headers))
+
+
+@scenario("sessions.reminders")
+async def sessions_reminders(ctx: Context) -> Result:
+    headers = await ctx.user()
+    start = datetime.utcnow()
+    for i in range(20):
+        body = {"title": f"Consultation {i}", "scheduled_at": (start + timedelta(hours=1 + 3 * i)).isoformat()}
+        await _post_ok(ctx.c, "/api/v1/sessions/", json=body, headers=headers)
+    return await repeat(ctx.n(300), 10, lambda i: _get_ok(ctx.c, "/api/v1/sessions/reminders", headers=headers))
+
+
+async def _dashboard_user(ctx: Context) -> dict:
+    headers = await ctx.user()
+    for metric_type in ("glucose", "weight"):
+        await _post_ok(ctx.c, "/api/v1/metrics/batch", json=readings(ctx.n(2000), metric_type=metric_type), headers=headers)
+    start = datetime.utcnow()
+    for i in range(5):
+        body = {"title": f"Consultation {i}", "scheduled_at": (start + timedelta(hours=6 + 12 * i)).isoformat()}
+        await _post_ok(ctx.c, "/api/v1/sessions/", json=body, headers=headers)
+    return headers
+
+
+@scenario("dashboard.separate")
+async def dashboard_separate(ctx: Context) -> Result:
+    """The calls the app made on launch before /dashboard, one after another."""
+    headers = await _dashboard_user(ctx)
+
+    async def launch(i):
+        await _get_ok(ctx.c, "/api/v1/users/me", headers=headers)
+        for metric_type in ("glucose", "weight"):
+            await _get_ok(ctx.c, "/api/v1/metrics/history", params={"metric_type": metric_type}, headers=headers)
+        await _get_ok(ctx.c, "/api/v1/sessions/", headers=headers)
+        await _get_ok(ctx.c, "/api/v1/sessions/reminders", headers=headers)
+    return await repeat(ctx.n(50), 5, launch)
+
+
+@scenario("dashboard.combined")
+async def dashboard_combined(ctx: Context) -> Result:
+    headers = await _dashboard_user(ctx)
+    return await repeat(ctx.n(100), 5, lambda i: _get_ok(ctx.c, "/api/v1/dashboard/", headers=headers))
+
+
+@scenario("dashboard.not_modified")
+async def dashboard_not_modified(ctx: Context) -> Result:
+    headers = await _dashboard_user(ctx)
+    r = await _get_ok(ctx.c, "/api/v1/dashboard/", headers=headers)
+    revalidate = {**headers, "If-None-Match": r.headers["etag"]}
+
+    async def call(i):
+        r = await ctx.c.get("/api/v1/dashboard/", headers=revalidate)
+        if r.status_code != 304:
+            raise RuntimeError(f"expected 304, got {r.status_code}")
+    return await repeat(ctx.n(200), 5, call)
+
+
+@scenario("ingest.pdf")
+async def ingest_pdf(ctx: Context) -> Result:
+    """Upload to finished job, polling the status URL the way a client would."""
+    uploads, pages = ctx.n(5), 20
+    pdfs = [make_pdf(pages, seed=i + 1) for i in range(uploads)]
+    workers = JobWorkerPool(SessionLocal, async_workers=2, process_workers=0, poll_seconds=0.05)
+    headers = await ctx.user()
+
+    async def upload(i):
+        files = {"file": (f"guideline{i}.pdf", pdfs[i], "application/pdf")}
+        status_url = (await _post_ok(ctx.c, "/api/v1/ingest/pdf", files=files, headers=headers)).json()["status_url"]
+        while (await _get_ok(ctx.c, status_url, headers=headers)).json()["status"] not in ("succeeded", "failed"):
+            await asyncio.sleep(0.01)
+    workers.start()
+    try:
+        result = await repeat(uploads, 1, upload)
+    finally:
+        await workers.stop()
+    result.units = uploads * pages
+    return result
+
+
+@scenario("retrieval.hybrid")
+async def retrieval_hybrid(ctx: Context) -> Result:
+    """Hybrid search over whatever ``ingest.pdf`` stored plus a small text corpus."""
+    async with SessionLocal() as db:
+        await IngestionService.ingest_texts([guideline_text(2000, seed=i) for i in range(10)], db, source="bench")
+    with tempfile.TemporaryDirectory() as path:
+        async with SessionLocal() as db:
+            await build_local_index(db, path, nlist=16)
+        service = RetrievalService(backend=LocalBackend(path), hybrid=True)
+        queries = [guideline_text(6, seed=1000 + i) for i in range(ctx.n(200))]
+        return await repeat(len(queries), 4, lambda i: service.search_clinical_guidelines(queries[i], top_k=5))
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            limit = before[key] * (1 + threshold)
+            if current[key] > limit and current[key] - before[key] > NOISE_FLOOR_MS:
+                regressions.append(f"{name}: {key} {before[key]} -> {current[key]}")
+        if current["ops_per_sec"] < before["ops_per_sec"] * (1 - threshold):
+            regressions.append(f"{name}: ops_per_sec {before['ops_per_sec']} -> {current['ops_per_sec']}")
+    return regressions
+
+
+async def run(args) -> dict:
+    await reset_schema()
+    results = {}
+    async with client() as c:
+        ctx = Context(c, args.scale)
+        for name, fn in SCENARIOS.items():
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            results[name] = (await fn(ctx)).as_dict()
+            print(f"{name:32} {json.dumps(results[name])}", flush=True)
+    return results
+
+
+def main(args) -> int:
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "created": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "scale": args.scale,
+        },
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"saved baseline to {args.save}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("scale") != args.scale:
+            print(f"warning: baseline was recorded at scale {baseline.get('meta', {}).get('scale')}")
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="*", help="scenario name prefixes, e.g. metrics auth.login")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the number of operations")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--baseline", help="compare against this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed fractional slowdown")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import argparse
+import asyncio
+import time
+from sqlalchemy import select
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models import ReactedDocument
+from app.services.retrieval import RetrievalService
+from app.services.vector_index import LocalBackend, PgVectorBackend, build_local_index
+
+# Builds the ANN indexes for retrieval and reports recall@k against exact search.
+#   python scripts/build_vector_index.py --backend local
+#   python scripts/build_vector_index.py --backend pgvector --kind ivfflat
+#   python scripts/build_vector_index.py --backend local --storage int8 --reduced-dim 256
+#   python scripts/build_vector_index.py --backend pgvector --storage float16 --reduced-dim 512
+
+
+async def sample_queries(n: int) -> list[str]:
+    async with SessionLocal() as db:
+        rows = await db.execute(select(ReactedDocument.content).where(ReactedDocument.content.isnot(None)).limit(n))
+        return [content[:200] for content in rows.scalars()]
+
+
+async def main(args):
+    started = time.perf_counter()
+    if args.backend == "local":
+        async with SessionLocal() as db:
+            index = await build_local_index(db, args.path, nlist=args.nlist, storage=args.storage,
+                                            reduced_dim=args.reduced_dim, reduction=args.reduction)
+        print(f"Built local index: {len(index)} vectors, nlist={index.meta['nlist']}, "
+              f"compact={index.meta['compact']} in {time.perf_counter() - started:.1f}s")
+        backend = LocalBackend(args.path)
+    else:
+        backend = PgVectorBackend(SessionLocal, kind=args.kind, storage=args.storage, reduced_dim=args.reduced_dim)
+        await backend.ensure_index(engine)
+        print(f"Ensured {backend.index_name} in {time.perf_counter() - started:.1f}s")
+
+    queries = await sample_queries(args.queries)
+    if not queries:
+        print("No documents to query.")
+        return
+    service = RetrievalService(backend=backend)
+    recall = await service.measure_recall(queries, top_k=args.k)
+    started = time.perf_counter()
+    await service.search_batch(queries, top_k=args.k)
+    per_query = (time.perf_counter() - started) / len(queries) * 1000
+    print(f"recall@{args.k} = {recall:.3f} over {len(queries)} queries, {per_query:.2f} ms/query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["local", "pgvector"], default=settings.RETRIEVAL_BACKEND)
+    parser.add_argument("--kind", choices=["hnsw", "ivfflat"], default=settings.VECTOR_INDEX_KIND)
+    parser.add_argument("--path", default=settings.LOCAL_INDEX_DIR)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--storage", choices=["float32", "float16", "int8"], default=settings.EMBEDDING_STORAGE)
+    parser.add_argument("--reduced-dim", type=int, default=settings.EMBEDDING_REDUCED_DIM)
+    parser.add_argument("--reduction", choices=["pca", "truncate"], default=settings.EMBEDDING_REDUCTION)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,28 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import argparse
+import asyncio
+import json
+from app.db.session import SessionLocal, engine
+from app.services import job_handlers  # noqa: F401  registers job kinds
+from app.services.jobs import JOB_KINDS, JobQueue
+
+# Queues a background job, e.g. from cron for the nightly analytics.
+#   python scripts/enqueue_job.py rebuild_trends
+#   python scripts/enqueue_job.py screen_journals --payload '{"texts": ["..."]}'
+
+
+async def main(args):
+    async with SessionLocal() as db:
+        job = await JobQueue.enqueue(db, args.kind, json.loads(args.payload), priority=args.priority)
+    print(f"Queued job {job.id} ({job.kind})")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("kind", choices=sorted(JOB_KINDS))
+    parser.add_argument("--payload", default="{}", help="JSON object passed to the handler")
+    parser.add_argument("--priority", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
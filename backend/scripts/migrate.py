@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import argparse
+import asyncio
+from app.db.session import engine
+from app.db.migrations import LATEST_VERSION, current_version, explain_hot_queries, migrate
+
+# Applies pending schema migrations.
+#   python scripts/migrate.py            # migrate to latest
+#   python scripts/migrate.py --status   # print current/latest version only
+#   python scripts/migrate.py --explain  # also check hot queries use index scans
+
+
+async def main(args):
+    version = await current_version(engine)
+    print(f"Schema version {version}, latest {LATEST_VERSION}")
+    if not args.status:
+        applied = await migrate(engine)
+        print(f"Applied: {applied}" if applied else "Nothing to apply.")
+    if args.explain:
+        failed = False
+        for name, (uses_index, plan) in (await explain_hot_queries(engine)).items():
+            print(f"[{'ok' if uses_index else 'NO INDEX'}] {name}\n{plan}\n")
+            failed |= not uses_index
+        await engine.dispose()
+        sys.exit(1 if failed else 0)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--status", action="store_true")
+    parser.add_argument("--explain", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,21 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import asyncio
+import time
+from app.db.session import SessionLocal
+from app.services.metabolic import MetabolicService
+
+# Recomputes every user's metric trend state from raw readings, e.g. after
+# migration 3 or a change to TREND_HALF_LIFE_HOURS.
+
+
+async def main():
+    started = time.perf_counter()
+    async with SessionLocal() as db:
+        groups = await MetabolicService.rebuild_trends(db)
+    print(f"Rebuilt {groups} trend states in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
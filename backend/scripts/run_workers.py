@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.append(os.getcwd())
+import argparse
+import asyncio
+import signal
+from app.core.config import settings
+from app.core.log import configure_logging, shutdown_logging
+from app.db.session import engine
+from app.services import job_handlers  # noqa: F401  registers job kinds
+from app.services.jobs import JobWorkerPool
+
+# Runs background job workers outside the API process. Start as many of
+# these as needed, on any host that shares the database (and JOB_SPOOL_DIR);
+# set JOB_RUN_IN_APP=false on the API servers to keep them request-only.
+#   python scripts/run_workers.py --async-workers 4 --process-workers 2
+
+
+async def main(args):
+    configure_logging()
+    pool = JobWorkerPool(async_workers=args.async_workers, process_workers=args.process_workers)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    pool.start()
+    print(f"Worker {pool.worker_id}: {args.async_workers} async, {args.process_workers} process slots")
+    await stop.wait()
+    # Running jobs are handed back to the queue for another worker
+    await pool.stop()
+    await engine.dispose()
+    shutdown_logging()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--async-workers", type=int, default=settings.JOB_ASYNC_WORKERS)
+    parser.add_argument("--process-workers", type=int, default=settings.JOB_PROCESS_WORKERS)
+    asyncio.run(main(parser.parse_args()))
@@ -2,9 +2,10 @@ import sys
 import os
 sys.path.append(os.getcwd())
 import asyncio
-from app.api.v1.endpoints.ingest import IngestionService
-# In a real app, we would direct insert into Vector DB here.
-# For now, we print what we would insert.
+from app.db.session import SessionLocal
+from app.services.ingestion import IngestionService
+# Chunks are content-hashed, so re-running the seed only embeds and inserts
+# guidelines that aren't stored yet.
 
 WHO_GUIDELINES = [
     "Infants should be exclusively breastfed for the first six months of life to achieve optimal growth, development and health.",
@@ -13,9 +14,12 @@ WHO_GUIDELINES = [
 
 async def seed():
     print("Seeding Vector DB with WHO Guidelines...")
-    for guideline in WHO_GUIDELINES:
-        print(f"Insertion: {guideline[:30]}... [Mock Embedding generated]")
-    print("Seeding Complete.")
+    async with SessionLocal() as db:
+        report = await IngestionService.ingest_texts(WHO_GUIDELINES, db, source="WHO")
+    print(
+        f"Seeding Complete. {report.inserted} inserted, {report.duplicates} already stored, "
+        f"{report.embedding_calls} embedding calls in {report.seconds:.2f}s."
+    )
 
 if __name__ == "__main__":
     asyncio.run(seed())
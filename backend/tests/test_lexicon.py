@@ -0,0 +1,81 @@
+import pytest
+
+from app.services.lexicon import LexiconScreener, PhraseMatcher, tokenize
+
+
+@pytest.fixture(scope="module")
+def screener():
+    return LexiconScreener.load()
+
+
+def test_tokenize_keeps_contractions_and_clause_marks():
+    assert tokenize("I Don’t want it, really.") == ["i", "don't", "want", "it", ",", "really", "."]
+
+
+def test_matcher_is_leftmost_longest():
+    phrases = [("no",), ("no", "hope"), ("so",), ("so", "sad"), ("hope",)]
+    matcher = PhraseMatcher(phrases)
+    hits = matcher.find(tokenize("there is no hope and so sad"))
+    assert [(phrases[pid], start, end) for start, end, pid in hits] == [
+        (("no", "hope"), 2, 4),
+        (("so", "sad"), 5, 7),
+    ]
+
+
+def test_matcher_finds_overlapping_suffixes():
+    phrases = [("a", "b", "c"), ("b", "c", "d")]
+    hits = PhraseMatcher(phrases).find(["x", "b", "c", "d"])
+    assert hits == [(1, 4, 1)]
+
+
+@pytest.mark.parametrize("text, level", [
+    ("I am not sad", "stable"),
+    ("not so sad today", "stable"),
+    ("I feel a bit sad", "stable"),  # below the monitor score
+    ("I feel so worthless", "monitor"),
+    ("not sad or hopeless", "monitor"),  # a cue negates only the first term
+    ("I'm not anxious and I'm hopeless", "monitor"),
+    ("I'm not worried, but I feel hopeless", "monitor"),
+])
+def test_negation_scope(screener, text, level):
+    assert screener.screen(text).level == level
+
+
+@pytest.mark.parametrize("text", [
+    "I did not sleep and want to die",
+    "I did not sleep so I want to die",
+    "didn't eat then I wanted to end it all",
+    "I'm not saying I won't, I want to die",
+    "no one came over to see me, I just want to die",
+    "I haven't slept I want to die",
+])
+def test_distant_negation_never_hides_self_harm(screener, text):
+    assert screener.screen(text).level == "urgent"
+
+
+@pytest.mark.parametrize("text", ["I don't want to die", "I'm not suicidal", "I would never hurt myself"])
+def test_negated_self_harm_is_still_followed_up(screener, text):
+    result = screener.screen(text)
+    assert result.level == "monitor"
+    assert result.matches and all(m.negated for m in result.matches)
+
+
+@pytest.mark.parametrize("text", [
+    "I don't want to wake up",
+    "I do not want to wake up",
+    "I never want to wake up",
+    "I don't want to live anymore",
+    "I do not want to live",
+    "I no longer want to live",
+    "I don't want to be alive",
+    "there's no reason to live",
+    "I have nothing to live for",
+    "life is not worth living",
+    "life isn't worth living",
+    "it's not worth living",
+    "there's no point in living",
+])
+def test_self_harm_phrases_with_their_own_negation(screener, text):
+    result = screener.screen(text)
+    assert result.level == "urgent", result.matches
+    assert result.categories["self_harm"] > 0
@@ -0,0 +1,43 @@
+import pytest
+from pydantic import ValidationError
+
+from app.api.v1.endpoints.pediatric import GrowthCheck
+from app.services.pediatric import PediatricService, normalise_sex
+
+
+@pytest.mark.parametrize("age_months, weight_kg, gender, expected", [
+    (6, 7.9, "male", "Normal growth"),
+    (6, 5.0, "male", "Below expected range"),
+    (6, 11.0, "female", "Above expected range"),
+    (0, 3.3, "female", "Normal growth"),
+    (12, 9.6, "male", "Normal growth"),  # last row of the 0-12 month table
+])
+def test_check_growth_in_range(age_months, weight_kg, gender, expected):
+    assert PediatricService.check_growth(age_months, weight_kg, gender) == expected
+
+
+@pytest.mark.parametrize("age_months", [13, 24, -1])
+def test_check_growth_outside_reference_range(age_months):
+    assert PediatricService.check_growth(age_months, 10.0, "male") == "Outside reference range"
+
+
+@pytest.mark.parametrize("gender, expected", [
+    ("Female", "female"), (" MALE ", "male"), ("m", "male"), ("girl", "female"),
+])
+def test_sex_is_normalised(gender, expected):
+    assert normalise_sex(gender) == expected
+    assert PediatricService.check_growth(6, 7.5, gender) == PediatricService.check_growth(6, 7.5, expected)
+
+
+@pytest.mark.parametrize("gender", ["other", "", "unknown"])
+def test_bad_sex(gender):
+    with pytest.raises(ValueError):
+        PediatricService.check_growth(6, 7.5, gender)
+    with pytest.raises(ValidationError):
+        GrowthCheck(age_months=6, weight_kg=7.5, gender=gender)
+
+
+def test_request_normalises_sex_and_rejects_negative_age():
+    assert GrowthCheck(age_months=6, weight_kg=7.5, gender=" F").gender == "female"
+    with pytest.raises(ValidationError):
+        GrowthCheck(age_months=-1, weight_kg=7.5, gender="male")
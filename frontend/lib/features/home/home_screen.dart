@@ -140,8 +140,9 @@ class HomeScreen extends ConsumerWidget {
                 children: [
                   _FeatureCard(
                     title: 'Metabolic',
-                    subtitle: dashboard.glucoseHistory.isNotEmpty
-                        ? '${dashboard.glucoseHistory.last.value.toStringAsFixed(0)} mg/dL'
+                    subtitle: dashboard.latestGlucose != null
+                        ? '${dashboard.latestGlucose!.value.toStringAsFixed(0)} mg/dL'
+                            '${dashboard.latestGlucose!.trend != null ? ' · ${dashboard.latestGlucose!.trend!.split(' - ').first}' : ''}'
                         : 'Log your first reading',
                     icon: Icons.monitor_heart_rounded,
                     gradientColors: const [
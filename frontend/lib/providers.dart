@@ -3,13 +3,18 @@ import 'services/api_service.dart';
 
 // Dashboard data holder
 class DashboardData {
+  // Bucketed means, for the charts only; latest* hold the newest reading
   final List<MetricData> glucoseHistory;
   final List<MetricData> weightHistory;
+  final MetricLatest? latestGlucose;
+  final MetricLatest? latestWeight;
   final List<TeleSessionData> upcomingSessions;
 
   const DashboardData({
     this.glucoseHistory = const [],
     this.weightHistory = const [],
+    this.latestGlucose,
+    this.latestWeight,
     this.upcomingSessions = const [],
   });
 }
@@ -18,15 +23,13 @@ class DashboardData {
 final dashboardProvider = FutureProvider<DashboardData>((ref) async {
   final api = ref.read(apiServiceProvider);
   try {
-    final results = await Future.wait([
-      api.getMetricHistory('glucose', days: 30),
-      api.getMetricHistory('weight', days: 30),
-      api.getUpcomingSessions(),
-    ]);
+    final dashboard = await api.getDashboard();
     return DashboardData(
-      glucoseHistory: results[0] as List<MetricData>,
-      weightHistory: results[1] as List<MetricData>,
-      upcomingSessions: results[2] as List<TeleSessionData>,
+      glucoseHistory: dashboard.series['glucose'] ?? const [],
+      weightHistory: dashboard.series['weight'] ?? const [],
+      latestGlucose: dashboard.latest['glucose'],
+      latestWeight: dashboard.latest['weight'],
+      upcomingSessions: dashboard.sessions,
     );
   } catch (_) {
     // Return empty data if API calls fail (e.g., first-time user)
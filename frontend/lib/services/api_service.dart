@@ -56,11 +56,101 @@ class TeleSessionData {
   }
 }
 
+/// The newest reading of a metric and its trend label, as of the dashboard.
+class MetricLatest {
+  final double value;
+  final DateTime timestamp;
+  final String? trend; // null for metric types the backend has no thresholds for
+
+  MetricLatest({
+    required this.value,
+    required this.timestamp,
+    this.trend,
+  });
+}
+
+class DashboardPayload {
+  final Map<String, List<MetricData>> series;
+  final Map<String, MetricLatest> latest;
+  final List<TeleSessionData> sessions;
+  final List<TeleSessionData> reminders;
+
+  DashboardPayload({
+    required this.series,
+    required this.latest,
+    required this.sessions,
+    required this.reminders,
+  });
+
+  factory DashboardPayload.fromJson(Map<String, dynamic> json) {
+    List<TeleSessionData> sessions(String key) => (json[key] as List)
+        .map((e) => TeleSessionData.fromJson(e))
+        .toList();
+    final series = <String, List<MetricData>>{};
+    final latest = <String, MetricLatest>{};
+    for (final metric in json['metrics'] as List) {
+      final type = metric['metric_type'] as String;
+      // The series only covers the chart window; the last reading may be older
+      if (metric['last_value'] != null) {
+        latest[type] = MetricLatest(
+          value: (metric['last_value'] as num).toDouble(),
+          timestamp: DateTime.parse(metric['last_timestamp']),
+          trend: metric['trend'],
+        );
+      }
+      final starts = metric['series']['start'] as List;
+      final means = metric['series']['mean'] as List;
+      // Bucket means stand in for readings; they carry no id or unit
+      series[type] = [
+        for (var i = 0; i < starts.length; i++)
+          MetricData(
+            id: 0,
+            metricType: type,
+            value: (means[i] as num).toDouble(),
+            unit: '',
+            timestamp: DateTime.parse(starts[i]),
+          ),
+      ];
+    }
+    return DashboardPayload(
+      series: series,
+      latest: latest,
+      sessions: sessions('sessions'),
+      reminders: sessions('reminders'),
+    );
+  }
+}
+
 class ApiService {
   final Dio _dio;
+  String? _dashboardEtag;
+  DashboardPayload? _dashboard;
 
   ApiService(this._dio);
 
+  // --- Dashboard ---
+  /// Everything the home screen needs in one request. The last response is
+  /// kept and revalidated with its ETag, so an unchanged dashboard is a 304.
+  Future<DashboardPayload> getDashboard() async {
+    final response = await _dio.get(
+      '/dashboard/',
+      options: Options(
+        headers: {
+          if (_dashboardEtag != null && _dashboard != null)
+            'If-None-Match': _dashboardEtag,
+        },
+        validateStatus: (status) =>
+            status != null && (status == 304 || status < 300),
+      ),
+    );
+    if (response.statusCode == 304) {
+      return _dashboard!;
+    }
+    _dashboard = DashboardPayload.fromJson(response.data);
+    _dashboardEtag = response.headers.value('etag');
+    return _dashboard!;
+  }
+
   // --- Onboarding ---
   Future<void> submitOnboarding({
     required int age,